@@ -1 +1,9 @@
-from .app import App
\ No newline at end of file
+# The GUI is imported on first use of `app.App`, so that headless code
+# (app.cli, app.core) doesn't load NiceGUI.
+
+
+def __getattr__(name):
+    if name == 'App':
+        from .app import App
+        return App
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
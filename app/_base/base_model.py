@@ -1,20 +1,14 @@
 # base_model.py
 
-from base_class import BaseClass
+from .log_views_mixin import LogViewsMixin
 from app.utils.logger import Logger
 
 log = Logger(__name__)
 
-class BaseModel(BaseClass):
+class BaseModel(LogViewsMixin):
     def __init__(self):
         super().__init__()
         """
-        Base Model class that all models inherit from.
+        Base Model class that all models inherit from. Flights opened with
+        `open_log` are released on destroy.
         """
-
-    def destroy(self) -> None:
-        """
-        Called when the Model is no longer needed.
-        Override this method in subclasses to perform cleanup.
-        """
-        return
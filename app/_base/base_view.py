@@ -1,21 +1,37 @@
 
-from base_gui_element import BaseGUIElement
+from typing import TYPE_CHECKING
+from .base_gui_element import BaseGUIElement
 from app.utils.logger import Logger
+if TYPE_CHECKING:
+    from .base_view_model import BaseViewModel
 
 log = Logger(__name__)
 
 class BaseView(BaseGUIElement):
-    def __init__(self, parent):
+    def __init__(self, parent, view_model: 'BaseViewModel | None' = None):
         """
         Base View class that all views inherit from.
+
+        Parameters:
+            parent: Parent GUI element.
+            view_model (BaseViewModel | None): ViewModel of the View,
+                destroyed with it.
         """
         super().__init__(parent=parent)
         log.d(f"{self.tag()} initialising...")
+        self.__view_model = view_model
+
+    @property
+    def view_model(self) -> 'BaseViewModel | None':
+        return self.__view_model
 
     def destroy(self) -> None:
         """
-        Called when the user navigates away from the View.
-        Override this method in subclasses to perform cleanup.
+        Called when the user navigates away from the View. Destroys the
+        ViewModel, which releases the flights it opened.
+        Override this method in subclasses to perform cleanup, calling
+        super().destroy().
         """
         log.d(f"{self.tag()} destroying...")
-        return
+        if self.__view_model is not None:
+            self.__view_model.destroy()
@@ -0,0 +1,38 @@
+# log_views_mixin.py
+
+from typing import TYPE_CHECKING
+from .base_class import BaseClass
+if TYPE_CHECKING:
+    from app.core.log.registry import LogView
+
+
+class LogViewsMixin(BaseClass):
+    def __init__(self):
+        """
+        Opens flights from the process-wide LogRegistry on behalf of a Model
+        or ViewModel, and releases them when it is destroyed.
+        """
+        super().__init__()
+        # Flights opened from the shared registry, released on destroy
+        self.__log_views = []
+
+    async def open_log(self, file_path, on_progress=None, **log_kwargs) -> 'LogView':
+        """
+        Opens the flight of `file_path` from the process-wide LogRegistry,
+        sharing it with the other sessions that opened the same file. The
+        view is released on destroy.
+        """
+        from app.core.log.registry import get_log_registry
+        view = await get_log_registry().load(file_path, on_progress=on_progress, **log_kwargs)
+        self.__log_views.append(view)
+        return view
+
+    def destroy(self) -> None:
+        """
+        Called when the object is no longer needed.
+        Override this method in subclasses to perform cleanup, calling
+        super().destroy() to release the opened flights.
+        """
+        for view in self.__log_views:
+            view.release()
+        self.__log_views.clear()
@@ -0,0 +1 @@
+from .frames import register_frame_routes
@@ -0,0 +1,109 @@
+# app/api/frames.py
+
+import os
+import itertools
+import pandas as pd
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from app.core.log import get_log_registry
+from app.core.log.transport import (
+    ARROW_MEDIA_TYPE, RAW_MEDIA_TYPE, iter_arrow_stream, iter_raw_frame, pa, raw_columns
+)
+from app.utils.logger import Logger
+
+log = Logger(__name__)
+
+FRAME_ROUTE = '/api/logs/frame'
+JS_ROUTE = '/static/js'
+JS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'resources', 'js')
+
+
+def parse_time(value: str | None):
+    """
+    Returns a query time as the Log accepts it: an ISO timestamp, or seconds
+    from the start of the log.
+    """
+    if value is None or value == '':
+        return None
+    try:
+        return pd.Timedelta(seconds=float(value))
+    except ValueError:
+        pass
+    try:
+        return pd.Timestamp(value)
+    except ValueError:
+        raise HTTPException(400, f"Invalid time '{value}'.")
+
+
+def _release_after(chunks, view):
+    try:
+        yield from chunks
+    finally:
+        view.release()
+
+
+async def get_frame(path: str,
+                    log_type: str = 'MISSION_INFO',
+                    columns: str | None = Query(None, description="Comma-separated columns, default all "
+                                                                  "(the numeric and datetime ones for raw)."),
+                    start: str | None = Query(None, description="ISO timestamp or seconds from the start."),
+                    end: str | None = Query(None, description="ISO timestamp or seconds from the start."),
+                    format: str = Query('raw', pattern='^(raw|arrow)$')):
+    """
+    Streams columns of a loaded flight as binary buffers, without going
+    through JSON. Only flights held by the log registry are served, so
+    that a request can't make the server parse arbitrary files; the flight
+    is looked up by path, whatever options it was loaded with.
+
+    The shared Log memoizes its frames without locking, so it is only used
+    on the event loop, like in the UI handlers; the columns are converted
+    in the threadpool, from the rows selected.
+    """
+    view = get_log_registry().find(path)
+    if view is None:
+        raise HTTPException(404, f"{path} isn't loaded.")
+    try:
+        if log_type not in view.log_types:
+            raise HTTPException(404, f"{path} has no {log_type} rows.")
+        df = view.between(parse_time(start), parse_time(end), log_type)
+        if columns:
+            selected = [column.strip() for column in columns.split(',')]
+        else:
+            selected = list(df.columns) if format == 'arrow' else raw_columns(df)
+        missing = [column for column in selected if column not in df.columns]
+        if missing:
+            raise HTTPException(400, f"Unknown columns: {', '.join(missing)}.")
+
+        if format == 'arrow':
+            if pa is None:
+                raise HTTPException(501, "pyarrow isn't installed.")
+            chunks, media_type = iter_arrow_stream(df, selected), ARROW_MEDIA_TYPE
+        else:
+            chunks, media_type = iter_raw_frame(df, selected), RAW_MEDIA_TYPE
+        # Convert the columns now, so that unsupported ones fail the request
+        # instead of the stream
+        chunks = itertools.chain([await run_in_threadpool(next, chunks)], chunks)
+    except HTTPException:
+        view.release()
+        raise
+    except (TypeError, ValueError) as e:
+        view.release()
+        raise HTTPException(400, str(e))
+
+    log.d("Streaming %d %s rows of %s (%s).", len(df), log_type, path, format)
+    return StreamingResponse(
+        _release_after(chunks, view),
+        media_type=media_type,
+        headers={'X-Rows': str(len(df))}
+    )
+
+
+def register_frame_routes(fastapi_app: FastAPI) -> None:
+    """
+    Adds the frame endpoint and the client-side decoder to the app.
+    """
+    fastapi_app.add_api_route(FRAME_ROUTE, get_frame, methods=['GET'])
+    if hasattr(fastapi_app, 'add_static_files'):
+        # NiceGUI app
+        fastapi_app.add_static_files(JS_ROUTE, JS_DIR)
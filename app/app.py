@@ -1,6 +1,7 @@
 from nicegui import ui, app
 
 from app._base.base_class import BaseClass
+from app.api import register_frame_routes
 from app.view_manager import ViewManager
 from app.utils.logger import Logger
 
@@ -14,7 +15,9 @@ class App:
         --nicegui-default-padding: 0rem;
         --nicegui-default-gap: 1rem;
         }</style>
-        """)    
+        """)
+        # Binary frame endpoint for the charts
+        register_frame_routes(app)
         with ui.element() as self.__main_element:
             self.__view_manager = ViewManager(self)
         
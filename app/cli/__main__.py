@@ -0,0 +1,11 @@
+# app/cli/__main__.py
+#
+# Usage: python -m app.cli summarize LOGS... [-o summaries.parquet]
+#        python -m app.cli analyse LOG [-o analysis.json] [--swath-width 5] [--cell-size 0.5]
+#        python -m app.cli export LOG -o DIR [--types MISSION_INFO SPRAY_INFO] [--format parquet]
+
+import sys
+from .cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+# app/cli/cli.py
+#
+# Headless commands for scripts and cron jobs. Only the standard library is
+# imported at start-up; pandas and the Log pipeline are imported by the
+# commands that need them, and NiceGUI never is.
+
+import os
+import sys
+import json
+import math
+import logging
+import argparse
+import datetime
+
+EXPORT_FORMATS = ('parquet', 'csv', 'json')
+
+
+def to_jsonable(value):
+    """
+    Converts `value` to plain JSON types: timestamps become ISO strings,
+    NumPy scalars Python numbers and missing values null.
+    """
+    if isinstance(value, dict):
+        return {str(key): to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(item) for item in value]
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        # Also pandas Timestamps; NaT is a datetime too
+        return None if value != value else value.isoformat()
+    if isinstance(value, datetime.timedelta):
+        return None if value != value else value.total_seconds()
+    if hasattr(value, 'item') and getattr(value, 'ndim', None) == 0 and value.dtype.kind not in ('m', 'M'):
+        # NumPy scalars
+        value = value.item()
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, int):
+        return value
+    # pd.NA and anything else; pandas is loaded if a frame produced them
+    pandas = sys.modules.get('pandas')
+    if pandas is not None and pandas.isna(value):
+        return None
+    return str(value)
+
+
+def write_json(data, output: str | None) -> None:
+    text = json.dumps(to_jsonable(data), indent=2)
+    if output is None:
+        print(text)
+    else:
+        with open(output, 'w') as file:
+            file.write(text + "\n")
+
+
+def open_log(file_path, args):
+    """
+    Loads `file_path` with the options shared by the commands.
+    """
+    from app.core.log import Log
+    from app.utils.database import LogCache
+
+    if not os.path.isfile(file_path):
+        raise FileNotFoundError(f"No such log file: {file_path}")
+    cache = LogCache(args.cache) if args.cache else None
+    chunk_bytes = int(args.chunk_mb * 1024 ** 2) if args.chunk_mb else None
+    return Log(file_path, parser=args.parser, parse_workers=args.workers, compact=args.compact, cache=cache,
+               chunk_bytes=chunk_bytes)
+
+
+def summarize(args) -> int:
+    """
+    Prints the summary of every log, one JSON object per line, or writes
+    them as a table to a .parquet or .csv file.
+    """
+    summaries = []
+    status = 0
+    for file_path in args.logs:
+        try:
+            summaries.append(open_log(file_path, args).summary())
+        except Exception as e:
+            print(f"{file_path}: {e}", file=sys.stderr)
+            summaries.append({'file_path': file_path, 'error': str(e)})
+            status = 1
+
+    if args.output is not None and args.output.endswith(('.parquet', '.csv')):
+        import pandas as pd
+        df = pd.DataFrame(summaries)
+        if args.output.endswith('.parquet'):
+            df.to_parquet(args.output, index=False)
+        else:
+            df.to_csv(args.output, index=False)
+        return status
+
+    lines = "\n".join(json.dumps(to_jsonable(summary)) for summary in summaries)
+    if args.output is None:
+        print(lines)
+    else:
+        with open(args.output, 'w') as file:
+            file.write(lines + "\n")
+    return status
+
+
+def analyse(args) -> int:
+    """
+    Writes the full analysis of one log as JSON: the summary, the log types,
+    the flight segments, the spray coverage, the anomaly events and the stage
+    timings.
+    """
+    log_obj = open_log(args.log, args)
+    coverage = log_obj.coverage(swath_width=args.swath_width, cell_size=args.cell_size)
+    analysis = {
+        'summary': log_obj.summary(),
+        'log_types': log_obj.log_types,
+        'segments': log_obj.segments.to_dict('records'),
+        'coverage': coverage.stats(dosage_target=args.dosage_target),
+        'anomalies': log_obj.anomalies.to_dict('records'),
+    }
+    if args.profile:
+        analysis['profile'] = log_obj.profile.to_dict('records')
+    write_json(analysis, args.output)
+    return 0
+
+
+def export(args) -> int:
+    """
+    Writes the processed frames of one log to `output`, one file per log
+    type, and optionally the segment table.
+    """
+    log_obj = open_log(args.log, args)
+    os.makedirs(args.output, exist_ok=True)
+
+    frames = {log_type.lower(): log_obj.get_logs(log_type) for log_type in args.types or log_obj.log_types}
+    if args.segments:
+        frames['segments'] = log_obj.segments
+    for name, df in frames.items():
+        path = os.path.join(args.output, f"{name}.{args.format}")
+        if args.format == 'parquet':
+            df.to_parquet(path, index=False)
+        elif args.format == 'csv':
+            df.to_csv(path, index=False)
+        else:
+            df.to_json(path, orient='records', lines=True, date_format='iso')
+        print(path)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli",
+        description="Analyse flight logs without the GUI."
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log debug messages to stderr.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    # Options of the Log pipeline, shared by the commands
+    loading = argparse.ArgumentParser(add_help=False)
+    loading.add_argument("--parser", default="auto", help="Parser backend: auto, pyarrow or python.")
+    loading.add_argument("-w", "--workers", type=int, default=1, help="Parse the log in this many processes.")
+    loading.add_argument("--compact", action="store_true", help="Use the compact dtypes.")
+    loading.add_argument("--cache", default=None, help="Directory of the parsed frame cache.")
+    loading.add_argument("--chunk-mb", type=float, default=None,
+                         help="Process the log out of core in chunks of this many MiB, for logs larger than RAM.")
+
+    command = commands.add_parser("summarize", parents=[loading], help="Print the headline figures of logs.")
+    command.add_argument("logs", nargs="+", help="Log files.")
+    command.add_argument("-o", "--output", default=None,
+                         help="Write to this file: .parquet or .csv for a table, else JSON lines.")
+    command.set_defaults(run=summarize)
+
+    command = commands.add_parser("analyse", parents=[loading], help="Write the full analysis of a log as JSON.")
+    command.add_argument("log", help="Log file.")
+    command.add_argument("-o", "--output", default=None, help="Write the JSON to this file.")
+    command.add_argument("--swath-width", type=float, default=5.0, help="Spray swath width in metres.")
+    command.add_argument("--cell-size", type=float, default=0.5, help="Coverage cell size in metres.")
+    command.add_argument("--dosage-target", type=float, default=None, help="Target dosage, e.g. in L/ha.")
+    command.add_argument("--profile", action="store_true", help="Include the stage timings.")
+    command.set_defaults(run=analyse)
+
+    command = commands.add_parser("export", parents=[loading], help="Write the processed frames of a log.")
+    command.add_argument("log", help="Log file.")
+    command.add_argument("-o", "--output", required=True, help="Output directory.")
+    command.add_argument("-t", "--types", nargs="+", default=None, help="Log types (default: all).")
+    command.add_argument("-f", "--format", choices=EXPORT_FORMATS, default="parquet", help="File format.")
+    command.add_argument("--segments", action="store_true", help="Also write the flight segments.")
+    command.set_defaults(run=export)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    from app.utils.logger.log_queue import set_stream_level
+    set_stream_level(logging.DEBUG if args.verbose else logging.WARNING)
+    try:
+        return args.run(args)
+    except Exception as e:
+        print(f"{args.command} failed: {e}", file=sys.stderr)
+        return 1
@@ -0,0 +1 @@
+from .fleet import FleetResult, analyse_fleet, analyse_flight, expand_log_paths
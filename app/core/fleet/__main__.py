@@ -0,0 +1,47 @@
+# app/core/fleet/__main__.py
+#
+# Usage: python -m app.core.fleet LOGS... [--workers N] [--output fleet.csv] [--database flights.db]
+
+import argparse
+import pandas as pd
+from .fleet import FLEET_FRAMES, analyse_fleet
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m app.core.fleet",
+        description="Summarise many flight logs in parallel."
+    )
+    parser.add_argument("sources", nargs="+", help="Log files, directories or globs.")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parser.add_argument("-p", "--pattern", default="*.log*", help="File pattern used to search directories.")
+    parser.add_argument("-o", "--output", default=None, help="Write the fleet table to a .csv or .parquet file.")
+    parser.add_argument("-d", "--database", default=None, help="Store the flights in this SQLite database.")
+    args = parser.parse_args(argv)
+
+    result = analyse_fleet(
+        args.sources, max_workers=args.workers, pattern=args.pattern, return_frames=args.database is not None
+    )
+
+    if args.database is not None:
+        from app.utils.database import FlightDatabase
+        with FlightDatabase(args.database) as database:
+            for summary in result.summary_df.to_dict('records'):
+                if pd.notna(summary.get('error')):
+                    continue
+                frames = {name.upper(): result.frame(summary['file_path'], name) for name in FLEET_FRAMES}
+                database.ingest_frames(summary, frames)
+
+    if args.output is None:
+        print(result.summary_df.to_string())
+    elif args.output.endswith(".parquet"):
+        result.summary_df.to_parquet(args.output, index=False)
+    else:
+        result.summary_df.to_csv(args.output, index=False)
+
+    for key, value in result.totals().items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# app/core/fleet/fleet.py
+
+import io
+import os
+import glob
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import pandas as pd
+from app._base.base_class import BaseClass
+from app.core.log import Log
+from app.utils.logger import Logger
+
+log = Logger(__name__)
+
+# Frames a worker can send back with the flight summary
+FLEET_FRAMES = ('mission_info', 'spray_info')
+
+# Columns of the fleet table: the fields of `Log.summary()` and the error
+SUMMARY_COLUMNS = [
+    'file_path', 'start', 'end', 'flight_time_s', 'lines', 'mission_samples', 'spray_samples',
+    'area_sprayed', 'payload_used', 'dosage_error_pct', 'error'
+]
+
+
+def expand_log_paths(sources, pattern: str = "*.log*") -> list:
+    """
+    Returns the sorted log file paths of `sources`, a path or list of paths
+    to log files, directories (searched recursively for `pattern`) or globs.
+    Explicit file paths are kept even if they don't exist, so that
+    `analyse_fleet` reports them as failed.
+    """
+    if isinstance(sources, (str, os.PathLike)):
+        sources = [sources]
+
+    paths = set()
+    for source in sources:
+        source = os.fspath(source)
+        if os.path.isdir(source):
+            matches = glob.glob(os.path.join(source, "**", pattern), recursive=True)
+        elif glob.has_magic(source):
+            matches = glob.glob(source, recursive=True)
+        else:
+            if not os.path.isfile(source):
+                log.w(f"{source} isn't a log file.")
+            paths.add(source)
+            continue
+        paths.update(path for path in matches if os.path.isfile(path))
+    return sorted(paths)
+
+
+def frame_to_ipc(df: pd.DataFrame) -> bytes:
+    """
+    Serialises `df` to Arrow IPC (Feather) bytes.
+    """
+    buffer = io.BytesIO()
+    df.to_feather(buffer)
+    return buffer.getvalue()
+
+
+def frame_from_ipc(data: bytes) -> pd.DataFrame:
+    """
+    Reads a frame serialised by `frame_to_ipc`.
+    """
+    return pd.read_feather(io.BytesIO(data))
+
+
+def analyse_flight(file_path, return_frames: bool = False, log_kwargs: dict | None = None):
+    """
+    Worker of `analyse_fleet`: loads one log and returns its summary and,
+    if `return_frames` is True, its processed frames as Arrow IPC bytes.
+    Missing files and logs without MISSION_INFO samples, e.g. because they
+    failed to parse, are returned with an `error`.
+    """
+    try:
+        if not os.path.isfile(file_path):
+            raise FileNotFoundError(f"No such log file: {file_path}")
+        flight = Log(file_path, **(log_kwargs or {}))
+        summary = flight.summary()
+        if summary['lines'] == 0:
+            summary['error'] = "No log lines could be parsed."
+            return summary, None
+        if summary['mission_samples'] == 0:
+            summary['error'] = "No MISSION_INFO samples."
+            return summary, None
+        summary['error'] = None
+        frames = None
+        if return_frames:
+            frames = {
+                name: frame_to_ipc(getattr(flight, f"{name}_df"))
+                for name in FLEET_FRAMES
+            }
+        return summary, frames
+    except Exception as e:
+        log.e(f"Error analysing {file_path}", e)
+        return {'file_path': str(file_path), 'error': str(e)}, None
+
+
+class FleetResult(BaseClass):
+
+    def __init__(self, summary_df: pd.DataFrame, frames: dict):
+        """
+        Result of `analyse_fleet`.
+
+        Parameters:
+            summary_df (pd.DataFrame): One row of figures per flight.
+            frames (dict): file path -> {frame name -> Arrow IPC bytes} of the
+                flights, empty unless the frames were requested.
+        """
+        super().__init__()
+        self.__summary_df = summary_df
+        self.__frames = frames
+
+    @property
+    def summary_df(self) -> pd.DataFrame:
+        return self.__summary_df
+
+    def frame(self, file_path, name: str) -> pd.DataFrame:
+        """
+        Returns the frame `name` ('mission_info' or 'spray_info') of the
+        flight `file_path`.
+        """
+        return frame_from_ipc(self.__frames[str(file_path)][name])
+
+    def totals(self) -> dict:
+        """
+        Returns the fleet-level totals of the flights analysed without errors.
+        """
+        ok = self.__summary_df[self.__summary_df['error'].isna()]
+        return {
+            'flights': len(ok),
+            'failed': len(self.__summary_df) - len(ok),
+            'flight_time_s': ok['flight_time_s'].sum(),
+            'area_sprayed': ok['area_sprayed'].sum(),
+            'payload_used': ok['payload_used'].sum(),
+            'dosage_error_pct': ok['dosage_error_pct'].mean()
+        }
+
+
+def analyse_fleet(sources,
+                  max_workers: int | None = None,
+                  return_frames: bool = False,
+                  pattern: str = "*.log*",
+                  **log_kwargs) -> FleetResult:
+    """
+    Analyses many flight logs in parallel, one log per worker process.
+
+    Parameters:
+        sources: Log file, directory or glob, or a list of them.
+        max_workers (int | None): Worker processes, defaults to the CPU count.
+        return_frames (bool): If True, the processed frames are sent back as
+            Arrow IPC bytes in addition to the summaries.
+        pattern (str): File pattern used to search directories, which also
+            matches compressed logs such as `.log.gz`.
+        **log_kwargs: Passed to `Log` in the workers.
+    """
+    paths = expand_log_paths(sources, pattern)
+    max_workers = max_workers or os.cpu_count() or 1
+    log.i(f"Analysing {len(paths)} logs with {max_workers} workers...")
+
+    summaries = []
+    frames = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending = set()
+        remaining = iter(paths)
+
+        # Keep at most two tasks per worker in flight to bound memory use
+        while True:
+            for path in remaining:
+                pending.add(executor.submit(analyse_flight, path, return_frames, log_kwargs))
+                if len(pending) >= 2 * max_workers:
+                    break
+            if not pending:
+                break
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                summary, flight_frames = future.result()
+                summaries.append(summary)
+                if flight_frames is not None:
+                    frames[summary['file_path']] = flight_frames
+
+    # Without flights the table still has its columns, so totals() works
+    summary_df = pd.DataFrame(summaries) if summaries else pd.DataFrame(columns=SUMMARY_COLUMNS)
+    if not summary_df.empty:
+        if 'start' in summary_df.columns:
+            summary_df = summary_df.sort_values(['start', 'file_path'], na_position='last')
+        summary_df = summary_df.reset_index(drop=True)
+    log.i(f"Analysed {len(paths)} logs.")
+    return FleetResult(summary_df, frames)
@@ -1 +1,10 @@
-from .log import Log
\ No newline at end of file
+from .log import Log
+from .follower import LogFollower
+from .schema import LogTypeSchema, register_schema, get_schema
+from .loader import LogLoader, LoadCancelled
+from .alignment import AlignStream
+from .segments import PHASES, segment_flight
+from .coverage import CoverageGrid
+from .anomaly import AnomalyDetector, AnomalyRule, detect_anomalies
+from .registry import LogRegistry, LogView, get_log_registry
+from .transport import iter_raw_frame, iter_arrow_stream
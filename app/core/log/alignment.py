@@ -0,0 +1,195 @@
+# app/core/log/alignment.py
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype, is_bool_dtype
+from app._base.base_class import BaseClass
+from app.utils.logger import Logger
+
+log = Logger(__name__)
+
+ALIGN_METHODS = ('nearest', 'backward', 'forward', 'linear')
+
+_NAT = np.iinfo(np.int64).min
+
+
+def to_nanoseconds(timestamps) -> np.ndarray:
+    """
+    Returns timestamps as int64 nanoseconds, NaT as the minimum int64.
+    """
+    return np.asarray(timestamps).astype('datetime64[ns]').view(np.int64)
+
+
+def sorted_times(timestamps) -> np.ndarray:
+    """
+    Returns the valid timestamps of a sorted timestamp column as int64
+    nanoseconds. Frames are sorted with missing timestamps last, so these
+    are the leading values of the column; nothing is sorted here.
+    """
+    times = to_nanoseconds(timestamps)
+    return times[:np.count_nonzero(times != _NAT)]
+
+
+class AlignStream(BaseClass):
+
+    def __init__(self,
+                 log_type: str,
+                 columns: list,
+                 method: str = 'nearest',
+                 tolerance=None,
+                 prefix: str | None = None):
+        """
+        A stream to put on a timeline: the `columns` of the frame of
+        `log_type`, matched to every timeline timestamp with `method`:
+
+            nearest: the closest row, the earlier one on ties.
+            backward: the last row at or before the timestamp.
+            forward: the first row at or after the timestamp.
+            linear: numeric columns are interpolated between the rows before
+                and after the timestamp, other columns use nearest.
+
+        Parameters:
+            log_type (str): The log type of the stream.
+            columns (list): The columns to align.
+            method (str): One of ALIGN_METHODS.
+            tolerance: Timedelta; rows further than this from the timestamp
+                are not matched (for linear, both rows must be within it).
+                None matches rows at any distance.
+            prefix (str | None): Prefix of the aligned column names, by
+                default the lowercase log type and an underscore.
+        """
+        super().__init__()
+        if method not in ALIGN_METHODS:
+            raise ValueError(f"Unknown alignment method '{method}'. Available: {', '.join(ALIGN_METHODS)}")
+        self.__log_type = log_type
+        self.__columns = list(columns)
+        self.__method = method
+        self.__tolerance = None if tolerance is None else pd.Timedelta(tolerance)
+        self.__prefix = f"{log_type.lower()}_" if prefix is None else prefix
+
+    @property
+    def log_type(self) -> str:
+        return self.__log_type
+
+    @property
+    def columns(self) -> list:
+        return self.__columns
+
+    @property
+    def method(self) -> str:
+        return self.__method
+
+    @property
+    def tolerance(self) -> pd.Timedelta | None:
+        return self.__tolerance
+
+    @property
+    def prefix(self) -> str:
+        return self.__prefix
+
+    @property
+    def key(self) -> tuple:
+        """
+        Hashable description of the stream, used to memoize alignments.
+        """
+        return (self.__log_type, tuple(self.__columns), self.__method, self.__tolerance, self.__prefix)
+
+
+def match(timeline: np.ndarray, times: np.ndarray, method: str, tolerance=None) -> tuple:
+    """
+    Matches every timestamp of `timeline` to the sorted source `times` (both
+    int64 nanoseconds) by binary search.
+
+    Returns `(positions, weights)`: the source positions, -1 where nothing
+    matches, and for 'linear' the interpolation weights of the row after the
+    timestamp, with `positions` holding the row before it (else None).
+    """
+    n = len(times)
+    valid = timeline != _NAT
+    limit = np.inf if tolerance is None else pd.Timedelta(tolerance).value
+
+    backward = np.searchsorted(times, timeline, side='right') - 1
+    forward = np.searchsorted(times, timeline, side='left')
+    has_backward = valid & (backward >= 0)
+    has_forward = valid & (forward < n)
+    if n:
+        backward_distance = timeline - times[np.clip(backward, 0, n - 1)]
+        forward_distance = times[np.clip(forward, 0, n - 1)] - timeline
+    else:
+        backward_distance = forward_distance = np.zeros(len(timeline), dtype=np.int64)
+    has_backward &= backward_distance <= limit
+    has_forward &= forward_distance <= limit
+
+    if method == 'backward':
+        return np.where(has_backward, backward, -1), None
+    if method == 'forward':
+        return np.where(has_forward, forward, -1), None
+
+    use_backward = has_backward & (~has_forward | (backward_distance <= forward_distance))
+    nearest = np.where(use_backward, backward, np.where(has_forward, forward, -1))
+    if method == 'nearest':
+        return nearest, None
+
+    # Linear: interpolate between both neighbours, exact matches weigh 0
+    both = has_backward & has_forward & (forward > backward)
+    span = np.where(both, forward_distance + backward_distance, 1)
+    weights = np.where(both, backward_distance / span, 0.0)
+    positions = np.where(both, backward, nearest)
+    return positions, weights
+
+
+def take(values: pd.Series, positions: np.ndarray, weights: np.ndarray | None = None):
+    """
+    Returns the values at `positions`, missing where the position is -1. With
+    `weights`, numeric values are interpolated towards the next row.
+    """
+    taken = pd.api.extensions.take(values.array, positions, allow_fill=True)
+    if weights is None or not is_numeric_dtype(values) or is_bool_dtype(values):
+        return taken
+
+    interpolate = weights > 0
+    if not interpolate.any():
+        return taken
+    numbers = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    result = np.where(positions >= 0, numbers[positions], np.nan)
+    before = numbers[positions[interpolate]]
+    after = numbers[positions[interpolate] + 1]
+    result[interpolate] = before + weights[interpolate] * (after - before)
+    return result
+
+
+def align(timeline, frames: dict, streams: list, times: dict | None = None) -> pd.DataFrame:
+    """
+    Puts several streams on one timeline in a single pass. Every source is
+    matched by binary search on its already sorted timestamps, and only the
+    aligned columns are gathered into the result.
+
+    Parameters:
+        timeline: Timestamps of the result rows.
+        frames (dict): Log type -> frame sorted by timestamp.
+        streams (list): The `AlignStream`s to put on the timeline.
+        times (dict | None): Log type -> `sorted_times` of the frame, if
+            already known.
+
+    Returns a DataFrame with a `timestamp` column and the aligned columns.
+    """
+    timeline = np.asarray(timeline)
+    timeline_ns = to_nanoseconds(timeline)
+    times = dict(times or {})
+    matches = {}
+
+    columns = {'timestamp': timeline}
+    for stream in streams:
+        df = frames[stream.log_type]
+        if stream.log_type not in times:
+            times[stream.log_type] = sorted_times(df['timestamp'])
+        # Streams of the same log type and matching share the search
+        match_key = (stream.log_type, stream.method, stream.tolerance)
+        if match_key not in matches:
+            matches[match_key] = match(timeline_ns, times[stream.log_type], stream.method, stream.tolerance)
+        positions, weights = matches[match_key]
+
+        for column in stream.columns:
+            columns[f"{stream.prefix}{column}"] = take(df[column], positions, weights)
+
+    return pd.DataFrame(columns)
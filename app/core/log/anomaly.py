@@ -0,0 +1,638 @@
+# app/core/log/anomaly.py
+
+import numpy as np
+import pandas as pd
+from app._base.base_class import BaseClass
+from app.utils.logger import Logger
+
+log = Logger(__name__)
+
+# Samples further apart than this start a new segment: the statistics are
+# reset and open events are closed
+MAX_GAP = pd.Timedelta('5s')
+
+# Pump PWM at or below which the pump is off
+PUMP_PWM_IDLE = 1100
+
+EVENT_DTYPES = {
+    'kind': 'str',
+    'log_type': 'str',
+    'start': 'datetime64[ns]',
+    'end': 'datetime64[ns]',
+    'duration_s': 'float64',
+    'samples': 'int64',
+    'peak': 'float64',
+    'latitude': 'float64',
+    'longitude': 'float64'
+}
+EVENT_COLUMNS = list(EVENT_DTYPES)
+
+
+class Ewma(BaseClass):
+
+    def __init__(self, alpha: float):
+        """
+        Exponentially weighted moving average `y[t] = alpha * x[t] +
+        (1 - alpha) * y[t - 1]`, started at the first value.
+
+        A batch is computed in closed form, `y[t] = d^(t+1) * (y[-1] + alpha *
+        cumsum(x[i] / d^(i+1)))` with `d = 1 - alpha`, in blocks short enough
+        for `d^-t` to stay finite, so a batch costs a few NumPy passes and
+        gives the same values as feeding its samples one at a time.
+
+        Parameters:
+            alpha (float): Weight of the new value, in (0, 1].
+        """
+        super().__init__()
+        if not 0 < alpha <= 1:
+            raise ValueError(f"EWMA alpha must be in (0, 1], not {alpha}.")
+        self.__alpha = alpha
+        self.__decay = 1.0 - alpha
+        # Samples per block, so that decay^-block stays below 1e100
+        self.__block = max(1, int(100 * np.log(10) / -np.log(self.__decay))) if self.__decay > 0 else 1
+        self.__value = np.nan
+
+    @property
+    def value(self) -> float:
+        return self.__value
+
+    def reset(self) -> None:
+        self.__value = np.nan
+
+    def update(self, values: np.ndarray) -> np.ndarray:
+        """
+        Returns the average after each of `values`, which must be finite.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return values.copy()
+        if self.__decay == 0:
+            self.__value = values[-1]
+            return values.copy()
+
+        result = np.empty_like(values)
+        previous = values[0] if np.isnan(self.__value) else self.__value
+        for start in range(0, len(values), self.__block):
+            x = values[start:start + self.__block]
+            powers = self.__decay ** np.arange(1, len(x) + 1)
+            y = powers * (previous + self.__alpha * np.cumsum(x / powers))
+            result[start:start + len(x)] = y
+            previous = y[-1]
+        self.__value = previous
+        return result
+
+
+def window_extremes(values: np.ndarray, size: int, function) -> np.ndarray:
+    """
+    Returns `function` (np.maximum or np.minimum) over every window of `size`
+    consecutive `values`, `len(values) - size + 1` results, in O(n) with the
+    van Herk/Gil-Werman algorithm: the running extremes from the start and
+    from the end of blocks of `size` values give any window's extreme from
+    two lookups. This is the vectorized form of the monotonic deque.
+    """
+    n = len(values)
+    n_windows = n - size + 1
+    if n_windows <= 0:
+        return np.empty(0, dtype=values.dtype)
+    if size == 1:
+        return values.copy()
+
+    neutral = -np.inf if function is np.maximum else np.inf
+    padded = np.append(values, np.full(-n % size, neutral)).reshape(-1, size)
+    forward = function.accumulate(padded, axis=1).ravel()
+    backward = function.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    starts = np.arange(n_windows)
+    return function(backward[starts], forward[starts + size - 1])
+
+
+class RollingWindow(BaseClass):
+
+    def __init__(self, size: int, exclusive: bool = False):
+        """
+        Mean, standard deviation, minimum and maximum over the last `size`
+        samples of a stream fed in batches of any length, down to single
+        rows of a live log.
+
+        Only the last `size` samples are kept between batches. The moments
+        are differences of cumulative sums of the values shifted by a value
+        of the window, which keeps them as accurate as Welford's recurrence
+        while computing a whole batch at once; the extremes use
+        `window_extremes`. A batch of `n` samples costs O(n + size).
+
+        Parameters:
+            size (int): Samples per window.
+            exclusive (bool): If True, the window of a sample holds the
+                `size` samples before it, so that a spike doesn't widen the
+                statistics it is compared with.
+        """
+        super().__init__()
+        self.__size = size
+        self.__exclusive = exclusive
+        self.__tail = np.empty(0, dtype=np.float64)
+
+    @property
+    def size(self) -> int:
+        return self.__size
+
+    def reset(self) -> None:
+        self.__tail = np.empty(0, dtype=np.float64)
+
+    def update(self, values: np.ndarray) -> dict:
+        """
+        Returns the `count`, `mean`, `std` (ddof=1), `min` and `max` of the
+        window of each of `values`, which must be finite. Windows at the
+        start of the stream hold fewer samples; statistics of empty windows
+        are NaN.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        size = self.__size
+        held = len(self.__tail)
+        extended = np.concatenate([self.__tail, values])
+        self.__tail = extended[-size:].copy()
+
+        # Window of new value i: extended[low:high]
+        high = held + np.arange(len(values)) + (0 if self.__exclusive else 1)
+        low = np.maximum(high - size, 0)
+        count = high - low
+
+        shift = extended[0] if len(extended) else 0.0
+        shifted = extended - shift
+        sums = np.concatenate([[0.0], np.cumsum(shifted)])
+        squares = np.concatenate([[0.0], np.cumsum(shifted * shifted)])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            window_sum = sums[high] - sums[low]
+            mean = window_sum / count
+            variance = (squares[high] - squares[low] - window_sum * mean) / (count - 1)
+            std = np.sqrt(np.maximum(variance, 0.0))
+        std[count < 2] = np.nan
+
+        # Pad the front so that every window has `size` values
+        maximum = window_extremes(np.concatenate([np.full(size, -np.inf), extended]), size, np.maximum)
+        minimum = window_extremes(np.concatenate([np.full(size, np.inf), extended]), size, np.minimum)
+        empty = count == 0
+        result = {
+            'count': count,
+            'mean': mean + shift,
+            'std': std,
+            'min': minimum[high],
+            'max': maximum[high]
+        }
+        for name in ('mean', 'min', 'max'):
+            result[name][empty] = np.nan
+        return result
+
+
+class RunningMoments(BaseClass):
+
+    def __init__(self):
+        """
+        Mean and standard deviation of all the samples of a stream so far,
+        kept as Welford's count, mean and sum of squared deviations. A batch
+        is merged with Chan's parallel form of the recurrence, which also
+        gives the moments before each of its samples in a few NumPy passes.
+        """
+        super().__init__()
+        self.__count = 0
+        self.__mean = 0.0
+        self.__m2 = 0.0
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    @property
+    def mean(self) -> float:
+        return self.__mean if self.__count else np.nan
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.__m2 / (self.__count - 1))) if self.__count > 1 else np.nan
+
+    def reset(self) -> None:
+        self.__count, self.__mean, self.__m2 = 0, 0.0, 0.0
+
+    def update(self, values: np.ndarray) -> dict:
+        """
+        Merges `values`, which must be finite, and returns the `count`,
+        `mean` and `std` of the samples before each of them.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        n = len(values)
+        if n == 0:
+            return {'count': np.empty(0, dtype=np.int64), 'mean': values.copy(), 'std': values.copy()}
+
+        # Moments of the first i values of the batch, for i = 0..n
+        taken = np.arange(n + 1)
+        shift = self.__mean if self.__count else values[0]
+        shifted = values - shift
+        sums = np.concatenate([[0.0], np.cumsum(shifted)])
+        squares = np.concatenate([[0.0], np.cumsum(shifted * shifted)])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            batch_mean = sums / taken + shift
+            batch_m2 = squares - sums * sums / taken
+        batch_mean[0], batch_m2[0] = 0.0, 0.0
+
+        # Chan et al.: merge (count, mean, m2) with each prefix of the batch
+        count = self.__count + taken
+        delta = batch_mean - self.__mean
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = self.__mean + delta * taken / count
+            m2 = self.__m2 + np.maximum(batch_m2, 0.0) + delta * delta * self.__count * taken / count
+            std = np.sqrt(m2 / (count - 1))
+        mean[count == 0] = np.nan
+        std[count < 2] = np.nan
+
+        self.__count, self.__mean, self.__m2 = int(count[-1]), float(mean[-1]), float(m2[-1])
+        return {'count': count[:-1], 'mean': mean[:-1], 'std': std[:-1]}
+
+
+class AnomalyRule(BaseClass):
+
+    def __init__(self, kind: str, log_type: str, columns: list, min_samples: int = 3, max_gap=MAX_GAP):
+        """
+        Flags samples of one log type and groups consecutive flagged samples
+        into events. Subclasses implement `gate` (the rows the rule applies
+        to) and `evaluate`, keeping their statistics in the streaming
+        primitives above so that rows can be fed in batches of any size.
+
+        Rows missing one of `columns` are skipped. Samples more than
+        `max_gap` apart split the stream into segments: the statistics are
+        reset and open events are closed.
+
+        Parameters:
+            kind (str): Name of the events, e.g. 'flow_mismatch'.
+            log_type (str): Log type of the rows the rule reads.
+            columns (list): Columns the rule reads.
+            min_samples (int): Consecutive flagged samples making an event.
+            max_gap (pd.Timedelta): Largest gap within a segment.
+        """
+        super().__init__()
+        self.__kind = kind
+        self.__log_type = log_type
+        self.__columns = list(columns)
+        self.__min_samples = min_samples
+        self.__max_gap = np.timedelta64(pd.Timedelta(max_gap).value, 'ns')
+        self.__last_time = None
+        # Event still open at the end of the last batch
+        self.__open = None
+
+    @property
+    def kind(self) -> str:
+        return self.__kind
+
+    @property
+    def log_type(self) -> str:
+        return self.__log_type
+
+    @property
+    def columns(self) -> list:
+        return self.__columns
+
+    def gate(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Returns the mask of the rows the rule applies to.
+        """
+        return np.ones(len(df), dtype=bool)
+
+    def reset(self) -> None:
+        """
+        Resets the statistics at the start of a segment.
+        """
+
+    def evaluate(self, values: dict) -> tuple:
+        """
+        Returns the score of each sample of a segment and the mask of the
+        anomalous ones, from the rule's columns as float64 arrays. The
+        event peak is the sample of largest |score|.
+        """
+        raise NotImplementedError
+
+    def update(self, df: pd.DataFrame) -> list:
+        """
+        Feeds new rows, in time order, and returns the events closed by them
+        as dicts of EVENT_COLUMNS. The event running at the end of the rows
+        stays open until later rows or `flush()` close it.
+        """
+        if df is None or df.empty or any(column not in df.columns for column in self.__columns):
+            return []
+
+        mask = self.gate(df) & df['timestamp'].notna().to_numpy()
+        values = {column: df[column].to_numpy(dtype=np.float64, na_value=np.nan) for column in self.__columns}
+        for column_values in values.values():
+            mask &= np.isfinite(column_values)
+        if not mask.any():
+            return []
+
+        values = {column: column_values[mask] for column, column_values in values.items()}
+        times = df['timestamp'].to_numpy(dtype='datetime64[ns]')[mask]
+        locations = [
+            df[column].to_numpy(dtype=np.float64, na_value=np.nan)[mask] if column in df.columns
+            else np.full(len(times), np.nan)
+            for column in ('latitude', 'longitude')
+        ]
+
+        # Segment starts, including the first sample if it follows a gap
+        breaks = np.flatnonzero(np.diff(times) > self.__max_gap) + 1
+        if self.__last_time is None or times[0] - self.__last_time > self.__max_gap:
+            breaks = np.append(0, breaks)
+        bounds = np.append(np.append(0, breaks[breaks > 0]), len(times))
+        new_segment = set(breaks.tolist())
+
+        events = []
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            if start in new_segment:
+                events.extend(self.flush())
+                self.reset()
+            segment = {column: column_values[start:end] for column, column_values in values.items()}
+            score, flags = self.evaluate(segment)
+            events.extend(self.__events(
+                flags, score, times[start:end], locations[0][start:end], locations[1][start:end]
+            ))
+        self.__last_time = times[-1]
+        return events
+
+    def flush(self) -> list:
+        """
+        Closes the open event, returning it if it is long enough.
+        """
+        event, self.__open = self.__open, None
+        if event is None or event['samples'] < self.__min_samples:
+            return []
+        event['duration_s'] = (event['end'] - event['start']) / pd.Timedelta('1s')
+        return [event]
+
+    def __events(self, flags, score, times, latitudes, longitudes) -> list:
+        """
+        Groups the flagged samples of a segment into runs, merging the first
+        one with the open event and keeping the last one open if it reaches
+        the end of the segment.
+        """
+        if not flags.any():
+            return self.flush()
+
+        edges = np.flatnonzero(np.diff(np.concatenate([[0], flags.view(np.int8), [0]])))
+        starts, ends = edges[0::2], edges[1::2]
+        lengths = ends - starts
+
+        # Sample of the largest |score| of every run
+        flagged = np.flatnonzero(flags)
+        runs = np.repeat(np.arange(len(starts)), lengths)
+        order = np.lexsort((-np.abs(score[flagged]), runs))
+        peaks = flagged[order[np.concatenate([[0], np.cumsum(lengths)[:-1]])]]
+
+        events = []
+        for i, (start, end, peak) in enumerate(zip(starts, ends, peaks)):
+            event = {
+                'kind': self.__kind,
+                'log_type': self.__log_type,
+                'start': pd.Timestamp(times[start]),
+                'end': pd.Timestamp(times[end - 1]),
+                'duration_s': np.nan,
+                'samples': int(end - start),
+                'peak': float(score[peak]),
+                'latitude': float(latitudes[peak]),
+                'longitude': float(longitudes[peak])
+            }
+            if i == 0 and self.__open is not None:
+                if start == 0:
+                    event = self.__merge(self.__open, event)
+                    self.__open = None
+                else:
+                    events.extend(self.flush())
+            self.__open = event
+            if end < len(flags):
+                events.extend(self.flush())
+        return events
+
+    @staticmethod
+    def __merge(first: dict, second: dict) -> dict:
+        merged = dict(second, start=first['start'], samples=first['samples'] + second['samples'])
+        if abs(first['peak']) >= abs(second['peak']):
+            merged.update(peak=first['peak'], latitude=first['latitude'], longitude=first['longitude'])
+        return merged
+
+
+def spraying(df: pd.DataFrame) -> np.ndarray:
+    return df['spray_status'].fillna(0).to_numpy(dtype=np.int64) > 0
+
+
+class RelativeErrorRule(AnomalyRule):
+
+    def __init__(self, kind: str, actual: str, requested: str, threshold: float, alpha: float, **kwargs):
+        """
+        Flags spraying samples where the EWMA of `(actual - requested) /
+        requested` exceeds `threshold` in either direction, e.g. a pump or
+        nozzle fault for the flow rate, or dosage drift.
+
+        Parameters:
+            kind (str): Name of the events.
+            actual (str): Column of the measured value.
+            requested (str): Column of the requested value.
+            threshold (float): Largest relative error, e.g. 0.2 for 20%.
+            alpha (float): EWMA weight, smaller values react to slower drift.
+        """
+        super().__init__(kind, 'SPRAY_INFO', [actual, requested, 'spray_status'], **kwargs)
+        self.__actual = actual
+        self.__requested = requested
+        self.__threshold = threshold
+        self.__ewma = Ewma(alpha)
+
+    def gate(self, df: pd.DataFrame) -> np.ndarray:
+        return spraying(df) & (df[self.__requested].to_numpy(dtype=np.float64, na_value=np.nan) > 0)
+
+    def reset(self) -> None:
+        self.__ewma.reset()
+
+    def evaluate(self, values: dict) -> tuple:
+        requested = values[self.__requested]
+        score = self.__ewma.update((values[self.__actual] - requested) / requested)
+        return score, np.abs(score) > self.__threshold
+
+
+class PumpStallRule(AnomalyRule):
+
+    def __init__(self, window: int = 10, **kwargs):
+        """
+        Flags samples where the pump has been driven above idle for the last
+        `window` samples without a single flowmeter pulse: a dry tank, an
+        air lock or a blocked line.
+        """
+        super().__init__('pump_stall', 'SPRAY_INFO', ['pump_pwm', 'flowmeter_pulse'], **kwargs)
+        self.__pulses = RollingWindow(window)
+
+    def gate(self, df: pd.DataFrame) -> np.ndarray:
+        return df['pump_pwm'].to_numpy(dtype=np.float64, na_value=np.nan) > PUMP_PWM_IDLE
+
+    def reset(self) -> None:
+        self.__pulses.reset()
+
+    def evaluate(self, values: dict) -> tuple:
+        pulses = self.__pulses.update(values['flowmeter_pulse'])
+        return values['pump_pwm'], (pulses['count'] >= self.__pulses.size) & (pulses['max'] <= 0)
+
+
+class PumpFlowRule(AnomalyRule):
+
+    def __init__(self, threshold: float = 4.0, min_relative: float = 0.15, warmup: int = 100, **kwargs):
+        """
+        Flags samples whose flowmeter pulses per unit of pump PWM above idle
+        deviate from the flight's running mean by more than `threshold`
+        standard deviations and `min_relative` of the mean: a partly blocked
+        nozzle or a worn pump delivers less flow for the same drive. The
+        baseline spans the segments, so it isn't reset.
+
+        Parameters:
+            threshold (float): Smallest |z-score| flagged.
+            min_relative (float): Smallest deviation flagged, relative to the
+                running mean.
+            warmup (int): Samples of the baseline before anything is flagged.
+        """
+        super().__init__('pump_flow', 'SPRAY_INFO', ['pump_pwm', 'flowmeter_pulse'], **kwargs)
+        self.__threshold = threshold
+        self.__min_relative = min_relative
+        self.__warmup = warmup
+        self.__baseline = RunningMoments()
+
+    def gate(self, df: pd.DataFrame) -> np.ndarray:
+        return ((df['pump_pwm'].to_numpy(dtype=np.float64, na_value=np.nan) > PUMP_PWM_IDLE)
+                & (df['flowmeter_pulse'].to_numpy(dtype=np.float64, na_value=np.nan) > 0))
+
+    def evaluate(self, values: dict) -> tuple:
+        ratio = values['flowmeter_pulse'] / (values['pump_pwm'] - PUMP_PWM_IDLE)
+        baseline = self.__baseline.update(ratio)
+        # With the deviation floor folded into the scale, |score| > threshold
+        # means both limits are exceeded, and steady baselines give finite scores
+        scale = np.fmax(baseline['std'], self.__min_relative * np.abs(baseline['mean']) / self.__threshold)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            score = (ratio - baseline['mean']) / scale
+            flags = (baseline['count'] >= self.__warmup) & (np.abs(score) > self.__threshold)
+        return score, flags
+
+
+class ExcursionRule(AnomalyRule):
+
+    def __init__(self, kind: str, column: str, min_delta: float,
+                 threshold: float = 4.0, window: int = 50, **kwargs):
+        """
+        Flags airborne samples of MISSION_INFO that lie more than `threshold`
+        standard deviations and `min_delta` away from the mean of the
+        `window` samples before them. Steady climbs and accelerations stay
+        within about two standard deviations of their trailing window.
+
+        Parameters:
+            kind (str): Name of the events.
+            column (str): Column of mission_info_df, e.g. 'height'.
+            min_delta (float): Smallest deviation flagged, in the column's
+                unit, so that the noise of a steady window isn't flagged.
+            threshold (float): Smallest |z-score| flagged.
+            window (int): Samples of the trailing window.
+        """
+        super().__init__(kind, 'MISSION_INFO', [column], **kwargs)
+        self.__column = column
+        self.__min_delta = min_delta
+        self.__threshold = threshold
+        self.__window = RollingWindow(window, exclusive=True)
+
+    def gate(self, df: pd.DataFrame) -> np.ndarray:
+        if 'flight_status' not in df.columns:
+            return np.ones(len(df), dtype=bool)
+        return (df['flight_status'] == 'IN_AIR').to_numpy(dtype=bool, na_value=False)
+
+    def reset(self) -> None:
+        self.__window.reset()
+
+    def evaluate(self, values: dict) -> tuple:
+        window = self.__window.update(values[self.__column])
+        # As in PumpFlowRule, |score| > threshold means both limits are exceeded
+        scale = np.fmax(window['std'], self.__min_delta / self.__threshold)
+        with np.errstate(invalid='ignore'):
+            score = (values[self.__column] - window['mean']) / scale
+            flags = (window['count'] >= self.__window.size // 2) & (np.abs(score) > self.__threshold)
+        return score, flags
+
+
+def default_rules() -> list:
+    """
+    Returns new instances of the default rules.
+    """
+    return [
+        RelativeErrorRule('flow_mismatch', 'actual_flowrate', 'req_flowrate', threshold=0.2, alpha=0.1),
+        PumpStallRule(),
+        PumpFlowRule(),
+        RelativeErrorRule('dosage_drift', 'actual_dosage', 'req_dosage', threshold=0.15, alpha=0.02),
+        ExcursionRule('height_excursion', 'height', min_delta=1.5),
+        ExcursionRule('speed_excursion', 'speed', min_delta=2.0)
+    ]
+
+
+def events_frame(events: list) -> pd.DataFrame:
+    df = pd.DataFrame(events, columns=EVENT_COLUMNS).astype(EVENT_DTYPES)
+    return df.sort_values(['start', 'kind'], kind='stable').reset_index(drop=True)
+
+
+class AnomalyDetector(BaseClass):
+
+    def __init__(self, rules: list | None = None):
+        """
+        Runs anomaly rules over mission_info_df and spray_info_df rows. The
+        rules keep streaming statistics (EWMA, rolling windows, Welford
+        moments), so a whole flight is processed in one vectorized pass per
+        rule and a live log can feed the rows returned by `Log.update()`,
+        with the same events as a batch run.
+
+        Parameters:
+            rules (list | None): AnomalyRule instances, by default
+                `default_rules()`. Rules are stateful and can't be shared
+                between detectors.
+        """
+        super().__init__()
+        self.__rules = default_rules() if rules is None else list(rules)
+
+    @property
+    def rules(self) -> list:
+        return self.__rules
+
+    def update(self,
+               mission_df: pd.DataFrame | None = None,
+               spray_df: pd.DataFrame | None = None,
+               flush: bool = False) -> pd.DataFrame:
+        """
+        Feeds new rows and returns the events they closed, as a frame of
+        EVENT_COLUMNS.
+
+        Parameters:
+            mission_df (pd.DataFrame | None): New mission_info_df rows.
+            spray_df (pd.DataFrame | None): New spray_info_df rows.
+            flush (bool): If True, also closes the events still open, at the
+                end of an archived log.
+        """
+        frames = {'MISSION_INFO': mission_df, 'SPRAY_INFO': spray_df}
+        events = []
+        for rule in self.__rules:
+            events.extend(rule.update(frames.get(rule.log_type)))
+            if flush:
+                events.extend(rule.flush())
+        return events_frame(events)
+
+    def on_update(self, updates: dict) -> pd.DataFrame:
+        """
+        Feeds the dict returned by `Log.update()`, e.g. as a `LogFollower`
+        subscriber.
+        """
+        return self.update(updates.get('MISSION_INFO'), updates.get('SPRAY_INFO'))
+
+    def flush(self) -> pd.DataFrame:
+        """
+        Closes the events still open, at the end of the log.
+        """
+        events = []
+        for rule in self.__rules:
+            events.extend(rule.flush())
+        return events_frame(events)
+
+
+def detect_anomalies(mission_df: pd.DataFrame, spray_df: pd.DataFrame, rules: list | None = None) -> pd.DataFrame:
+    """
+    Returns the anomaly events of a whole flight, see `AnomalyDetector`.
+    """
+    return AnomalyDetector(rules).update(mission_df, spray_df, flush=True)
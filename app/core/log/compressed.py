@@ -0,0 +1,227 @@
+# app/core/log/compressed.py
+
+import io
+import os
+import bz2
+import gzip
+import lzma
+import struct
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from app.utils.logger import Logger
+from .parallel import available_cpus
+from .parsers import TIMESTAMP_FORMAT, empty_log_frame, get_parser
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+log = Logger(__name__)
+
+# Magic bytes at the start of the supported compressed formats
+COMPRESSION_MAGIC = {
+    'gzip': b'\x1f\x8b',
+    'bz2': b'BZh',
+    'xz': b'\xfd7zXZ\x00',
+    'zstd': b'\x28\xb5\x2f\xfd'
+}
+
+# Zstandard skippable frames (magic 0x184D2A50-0x184D2A5F) may start a file
+ZSTD_SKIPPABLE_MAGIC = range(0x184D2A50, 0x184D2A60)
+
+# Seek table of the zstd seekable format, stored in a skippable frame at the
+# end of the file and followed by a footer of the frame count, a descriptor
+# byte and this magic number
+ZSTD_SEEKABLE_MAGIC = 0x8F92EAB1
+ZSTD_SEEK_TABLE_MAGIC = 0x184D2A5E
+ZSTD_SEEKABLE_FOOTER = struct.Struct('<IBI')
+
+# Decompressed bytes parsed at a time
+CHUNK_BYTES = 32 * 1024 * 1024
+
+
+def detect_compression(file_path) -> str | None:
+    """
+    Returns the compression of the file ('gzip', 'bz2', 'xz' or 'zstd')
+    from its magic bytes, or None for an uncompressed file.
+    """
+    with open(file_path, 'rb') as file:
+        head = file.read(8)
+    for compression, magic in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    if len(head) >= 4 and struct.unpack('<I', head[:4])[0] in ZSTD_SKIPPABLE_MAGIC:
+        return 'zstd'
+    return None
+
+
+def open_decompressed(file_path, compression: str):
+    """
+    Returns a binary file object reading the decompressed contents of the
+    file. Multi-member gzip/bz2/xz files and multi-frame zstd files are read
+    through to the end.
+    """
+    if compression == 'gzip':
+        return gzip.open(file_path, 'rb')
+    if compression == 'bz2':
+        return bz2.open(file_path, 'rb')
+    if compression == 'xz':
+        return lzma.open(file_path, 'rb')
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ImportError("zstandard is required to read zstd compressed logs")
+        file = open(file_path, 'rb')
+        return zstandard.ZstdDecompressor().stream_reader(file, read_across_frames=True, closefd=True)
+    raise ValueError(f"Unknown compression '{compression}'.")
+
+
+def read_line_chunks(stream, chunk_bytes: int = CHUNK_BYTES):
+    """
+    Yields the contents of `stream` in chunks of about `chunk_bytes` that
+    end on a line boundary (the last one may lack the final newline).
+    """
+    rest = b''
+    while True:
+        data = stream.read(chunk_bytes)
+        if not data:
+            break
+        data = rest + data
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            rest = data
+            continue
+        rest = data[end:]
+        yield data[:end]
+    if rest:
+        yield rest
+
+
+def parse_compressed(file_path, compression: str, parse, chunk_bytes: int = CHUNK_BYTES) -> pd.DataFrame:
+    """
+    Parses a compressed log straight from the decompressor, `chunk_bytes` of
+    text at a time, so the decompressed file is never held as a whole.
+
+    Parameters:
+        file_path (str): Path of the compressed log.
+        compression (str): Its compression, see `detect_compression`.
+        parse: Function parsing a chunk of complete lines (bytes) into a
+            master DataFrame.
+        chunk_bytes (int): Decompressed bytes parsed at a time.
+    """
+    with open_decompressed(file_path, compression) as stream:
+        chunks = [parse(chunk) for chunk in read_line_chunks(stream, chunk_bytes)]
+    log.d("Parsed %s (%s) in %d chunks.", file_path, compression, len(chunks))
+    chunks = [chunk for chunk in chunks if not chunk.empty]
+    if not chunks:
+        return empty_log_frame()
+    return pd.concat(chunks, ignore_index=True)
+
+
+def seekable_zstd_frames(file_path) -> list | None:
+    """
+    Returns the `(offset, compressed_size)` of every frame of a file in the
+    zstd seekable format, read from its seek table, or None if the file
+    has no seek table.
+    """
+    size = os.path.getsize(file_path)
+    if size < ZSTD_SEEKABLE_FOOTER.size + 8:
+        return None
+    with open(file_path, 'rb') as file:
+        file.seek(size - ZSTD_SEEKABLE_FOOTER.size)
+        n_frames, descriptor, magic = ZSTD_SEEKABLE_FOOTER.unpack(file.read(ZSTD_SEEKABLE_FOOTER.size))
+        if magic != ZSTD_SEEKABLE_MAGIC:
+            return None
+        entry_size = 12 if descriptor & 0x80 else 8
+        table_size = n_frames * entry_size + ZSTD_SEEKABLE_FOOTER.size
+        if table_size + 8 > size:
+            return None
+        file.seek(size - table_size - 8)
+        table_magic, frame_size = struct.unpack('<II', file.read(8))
+        if table_magic != ZSTD_SEEK_TABLE_MAGIC or frame_size != table_size:
+            return None
+        table = file.read(n_frames * entry_size)
+
+    frames = []
+    offset = 0
+    for i in range(n_frames):
+        compressed_size, _ = struct.unpack_from('<II', table, i * entry_size)
+        frames.append((offset, compressed_size))
+        offset += compressed_size
+    return frames
+
+
+def parse_zstd_frames(file_path, start: int, end: int,
+                      parser: str = 'auto',
+                      timestamp_format: str | None = TIMESTAMP_FORMAT) -> tuple:
+    """
+    Decompresses and parses the zstd frames in the byte range `[start, end)`.
+    The frames need not end on a line boundary, so the text before the
+    first and after the last newline is returned unparsed, to be joined with
+    the neighbouring ranges.
+
+    Returns `(head, df, tail)`.
+    """
+    with open(file_path, 'rb') as file:
+        file.seek(start)
+        data = zstandard.ZstdDecompressor().stream_reader(
+            io.BytesIO(file.read(end - start)), read_across_frames=True
+        ).read()
+
+    first = data.find(b'\n') + 1
+    last = data.rfind(b'\n') + 1
+    if first == 0:
+        # No complete line in the range
+        return data, None, b''
+    body = data[first:last]
+    df = get_parser(parser, timestamp_format).parse(io.BytesIO(body)) if body else None
+    return data[:first], df, data[last:]
+
+
+def parse_compressed_parallel(file_path,
+                              workers: int,
+                              parser: str = 'auto',
+                              timestamp_format: str | None = TIMESTAMP_FORMAT) -> pd.DataFrame | None:
+    """
+    Parses a seekable zstd log in `workers` processes, each one decompressing
+    and parsing a run of frames. The lines split between two runs are
+    joined and parsed here, and the rows come out in file order.
+
+    Returns None if the file has no seek table.
+    """
+    frames = seekable_zstd_frames(file_path)
+    if not frames or zstandard is None:
+        return None
+
+    n_ranges = min(workers, available_cpus(), len(frames))
+    boundaries = [frames[len(frames) * i // n_ranges][0] for i in range(n_ranges)]
+    ranges = list(zip(boundaries, boundaries[1:] + [frames[-1][0] + frames[-1][1]]))
+
+    log.d("Parsing %s (seekable zstd, %d frames) in %d ranges.", file_path, len(frames), len(ranges))
+    tasks = list(zip(*[(file_path, start, end, parser, timestamp_format) for start, end in ranges]))
+    if len(ranges) == 1:
+        parts = list(map(parse_zstd_frames, *tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+            parts = list(executor.map(parse_zstd_frames, *tasks))
+
+    log_parser = get_parser(parser, timestamp_format)
+    chunks = []
+    carry = b''
+    for head, df, tail in parts:
+        carry += head
+        if df is None and not tail:
+            # The range holds part of a single line
+            continue
+        if carry.strip():
+            chunks.append(log_parser.parse(io.BytesIO(carry)))
+        if df is not None:
+            chunks.append(df)
+        carry = tail
+    if carry.strip():
+        chunks.append(log_parser.parse(io.BytesIO(carry)))
+
+    chunks = [chunk for chunk in chunks if not chunk.empty]
+    if not chunks:
+        return empty_log_frame()
+    return pd.concat(chunks, ignore_index=True)
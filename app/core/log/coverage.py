@@ -0,0 +1,349 @@
+# app/core/log/coverage.py
+
+import numpy as np
+import pandas as pd
+from app._base.base_class import BaseClass
+from app.utils.logger import Logger
+from .spatial import EARTH_RADIUS_M, project, points_in_polygon
+
+log = Logger(__name__)
+
+DEFAULT_SWATH_WIDTH = 5.0
+DEFAULT_CELL_SIZE = 0.5
+
+# Steps between spray samples further apart than this are not rasterized,
+# the drone may have flown anywhere in between
+MAX_STEP_S = 5.0
+
+# Steps stamped per batch, bounds the memory of the footprint samples
+BATCH_STEPS = 50_000
+
+# Largest grid returned as dense arrays by `counts` and `dosage`
+MAX_DENSE_CELLS = 50_000_000
+
+
+def spray_steps(x, y, times, spraying, max_step_s: float = MAX_STEP_S):
+    """
+    Returns the steps of the track flown while spraying, as the positions of
+    their first sample, and the pass of every step. A pass is a run of
+    consecutive steps; it ends where the spraying stops or the drone turns
+    back (by more than 90 degrees), so that a pass never covers a cell twice.
+    """
+    seconds = np.diff(times.astype('datetime64[ns]').view(np.int64)) / 1e9
+    dx, dy = np.diff(x), np.diff(y)
+    valid = (spraying[:-1] & spraying[1:]
+             & np.isfinite(dx) & np.isfinite(dy)
+             & (seconds >= 0) & (seconds <= max_step_s))
+    steps = np.flatnonzero(valid)
+    if len(steps) == 0:
+        return steps, steps
+
+    # A new pass starts after a gap or where the direction reverses
+    consecutive = np.diff(steps) == 1
+    turned_back = dx[steps[1:]] * dx[steps[:-1]] + dy[steps[1:]] * dy[steps[:-1]] < 0
+    new_pass = np.concatenate(([True], ~consecutive | turned_back))
+    return steps, np.cumsum(new_pass) - 1
+
+
+class CoverageGrid(BaseClass):
+
+    def __init__(self,
+                 latitude,
+                 longitude,
+                 times,
+                 spraying,
+                 dosage,
+                 swath_width: float = DEFAULT_SWATH_WIDTH,
+                 cell_size: float = DEFAULT_CELL_SIZE,
+                 field=None):
+        """
+        Raster of the area covered by a spray track. The track is projected
+        to metres and every step flown while spraying sweeps a rectangle of
+        `swath_width`; cells whose centre lies in the rectangle are covered.
+        The footprints are stamped with vectorized NumPy: every step is
+        sampled along and across the swath at half a cell, the sampled cells
+        are kept once per pass and accumulated with `bincount`. Only the
+        covered cells are stored.
+
+        Parameters:
+            latitude, longitude: Location of the spray samples, in degrees.
+            times: Timestamps of the samples (datetime64), sorted.
+            spraying: Whether the nozzles were open at each sample.
+            dosage: Dosage applied at each sample (e.g. L/ha); every pass adds
+                the dosage of its step to the cells it covers.
+            swath_width (float): Width sprayed across the track, in metres.
+            cell_size (float): Size of the square cells, in metres.
+            field: Optional boundary of the field as `(latitude, longitude)`
+                vertices. Without it, the field of a grid row spans from its
+                first to its last covered cell.
+        """
+        super().__init__()
+        if swath_width <= 0 or cell_size <= 0:
+            raise ValueError("swath_width and cell_size must be positive.")
+        latitude = np.asarray(latitude, dtype=np.float64)
+        longitude = np.asarray(longitude, dtype=np.float64)
+        spraying = np.asarray(spraying, dtype=bool)
+        dosage = np.nan_to_num(np.asarray(dosage, dtype=np.float64))
+        self.__swath_width = float(swath_width)
+        self.__cell_size = float(cell_size)
+
+        located = np.isfinite(latitude) & np.isfinite(longitude)
+        if field is not None:
+            field = np.asarray(field, dtype=np.float64)
+            self.__origin = (float(field[:, 0].mean()), float(field[:, 1].mean()))
+        elif located.any():
+            self.__origin = (float(latitude[located].mean()), float(longitude[located].mean()))
+        else:
+            self.__origin = (0.0, 0.0)
+        x, y = project(latitude, longitude, *self.__origin)
+
+        # Grid over the track and the field, with half a swath of margin
+        margin = self.__swath_width / 2 + self.__cell_size
+        bounds_x = [x[located].min() - margin, x[located].max() + margin] if located.any() else []
+        bounds_y = [y[located].min() - margin, y[located].max() + margin] if located.any() else []
+        if field is not None:
+            field_x, field_y = project(field[:, 0], field[:, 1], *self.__origin)
+            bounds_x += [field_x.min(), field_x.max()]
+            bounds_y += [field_y.min(), field_y.max()]
+        if not bounds_x:
+            bounds_x = bounds_y = [0.0, 0.0]
+        self.__x0, self.__y0 = min(bounds_x), min(bounds_y)
+        self.__n_columns = int((max(bounds_x) - self.__x0) // self.__cell_size) + 1
+        self.__n_rows = int((max(bounds_y) - self.__y0) // self.__cell_size) + 1
+        n_cells = self.__n_rows * self.__n_columns
+
+        steps, passes = spray_steps(x, y, np.asarray(times), spraying)
+        self.__passes = int(passes[-1]) + 1 if len(passes) else 0
+
+        # Batches hold whole passes, so a cell is counted once per pass
+        boundaries = np.flatnonzero(np.diff(passes)) + 1
+        batch_cells, batch_dosage = [], []
+        first = 0
+        while first < len(steps):
+            last = min(first + BATCH_STEPS, len(steps))
+            if last < len(steps):
+                # Extend the batch to the end of its last pass
+                later = boundaries[boundaries >= last]
+                last = later[0] if len(later) else len(steps)
+            batch = steps[first:last]
+            cells, batch_passes, weights = self.__stamp(
+                x[batch], y[batch], x[batch + 1], y[batch + 1], passes[first:last], dosage[batch]
+            )
+            # Keep one sample per cell and pass
+            _, unique = np.unique(batch_passes * n_cells + cells, return_index=True)
+            batch_cells.append(cells[unique])
+            batch_dosage.append(weights[unique])
+            first = last
+
+        # Only the covered cells are stored, a long flight spans a large grid
+        if batch_cells:
+            self.__cells, inverse = np.unique(np.concatenate(batch_cells), return_inverse=True)
+            self.__cell_counts = np.bincount(inverse, minlength=len(self.__cells))
+            self.__cell_dosage = np.bincount(inverse, weights=np.concatenate(batch_dosage),
+                                             minlength=len(self.__cells))
+        else:
+            self.__cells = np.empty(0, dtype=np.int64)
+            self.__cell_counts = np.empty(0, dtype=np.int64)
+            self.__cell_dosage = np.empty(0, dtype=np.float64)
+        self.__field_cells = self.__get_field_cells(field)
+        log.d("Rasterized %d spray steps in %d passes into %d cells of %s m.",
+              len(steps), self.__passes, len(self.__cells), self.__cell_size)
+
+    def __stamp(self, x0, y0, x1, y1, passes, dosage):
+        """
+        Returns the cells whose centre lies in the swath rectangle of each
+        step, with the pass and the dosage of the step, one entry per
+        footprint sample (a cell may appear more than once).
+        """
+        dx, dy = x1 - x0, y1 - y0
+        length = np.hypot(dx, dy)
+        moving = length > 0
+        # Unit vector along the step; hovering steps have no length and
+        # only keep the cells centred on their point
+        ux = np.where(moving, dx / np.where(moving, length, 1), 1.0)
+        uy = np.where(moving, dy / np.where(moving, length, 1), 0.0)
+
+        spacing = self.__cell_size / 2
+        half_swath = self.__swath_width / 2
+        across = np.linspace(-half_swath, half_swath, int(np.ceil(self.__swath_width / spacing)) + 1)
+
+        # Samples along every step, from its start to its end; the samples
+        # across the swath are the second axis
+        n_along = np.ceil(length / spacing).astype(np.int64) + 1
+        step = np.repeat(np.arange(len(x0)), n_along)
+        index = np.arange(len(step)) - np.repeat(np.cumsum(n_along) - n_along, n_along)
+        along = index * (length / np.maximum(n_along - 1, 1))[step]
+        start_x, start_y = x0[step][:, None], y0[step][:, None]
+        ux, uy = ux[step][:, None], uy[step][:, None]
+
+        column = np.floor((start_x + along[:, None] * ux - across * uy - self.__x0) / self.__cell_size)
+        row = np.floor((start_y + along[:, None] * uy + across * ux - self.__y0) / self.__cell_size)
+
+        # Keep the cells whose centre is in the rectangle of the step
+        centre_x = self.__x0 + (column + 0.5) * self.__cell_size - start_x
+        centre_y = self.__y0 + (row + 0.5) * self.__cell_size - start_y
+        centre_along = centre_x * ux + centre_y * uy
+        inside = ((centre_along >= 0) & (centre_along <= length[step][:, None])
+                  & (np.abs(centre_y * ux - centre_x * uy) <= half_swath)
+                  & (column >= 0) & (column < self.__n_columns) & (row >= 0) & (row < self.__n_rows))
+
+        step = np.broadcast_to(step[:, None], inside.shape)[inside]
+        cells = row[inside].astype(np.int64) * self.__n_columns + column[inside].astype(np.int64)
+        return cells, passes[step], dosage[step]
+
+    def __get_field_cells(self, field) -> np.ndarray | None:
+        """
+        Returns the sorted ids of the cells whose centre is inside the field
+        polygon, or None without a field.
+        """
+        if field is None:
+            return None
+        field_x, field_y = project(field[:, 0], field[:, 1], *self.__origin)
+        columns = np.arange(
+            max(int((field_x.min() - self.__x0) // self.__cell_size), 0),
+            min(int((field_x.max() - self.__x0) // self.__cell_size) + 1, self.__n_columns)
+        )
+        rows = np.arange(
+            max(int((field_y.min() - self.__y0) // self.__cell_size), 0),
+            min(int((field_y.max() - self.__y0) // self.__cell_size) + 1, self.__n_rows)
+        )
+        grid_columns, grid_rows = np.meshgrid(columns, rows)
+        inside = points_in_polygon(
+            self.__x0 + (grid_columns + 0.5) * self.__cell_size,
+            self.__y0 + (grid_rows + 0.5) * self.__cell_size,
+            field_x, field_y
+        )
+        return np.sort(grid_rows[inside] * self.__n_columns + grid_columns[inside])
+
+    def __in_field(self) -> tuple:
+        """
+        Returns the mask of the covered cells inside the field and the number
+        of field cells. Without a field polygon, the field of a grid row spans
+        from its first to its last covered cell.
+        """
+        if self.__field_cells is not None:
+            positions = np.searchsorted(self.__field_cells, self.__cells)
+            in_field = positions < len(self.__field_cells)
+            in_field[in_field] = self.__field_cells[positions[in_field]] == self.__cells[in_field]
+            return in_field, len(self.__field_cells)
+
+        if len(self.__cells) == 0:
+            return np.empty(0, dtype=bool), 0
+        rows, columns = np.divmod(self.__cells, self.__n_columns)
+        # The cells are sorted, so every grid row is a run of them
+        row_starts = np.flatnonzero(np.diff(rows, prepend=-1))
+        spans = np.maximum.reduceat(columns, row_starts) - np.minimum.reduceat(columns, row_starts) + 1
+        return np.ones(len(self.__cells), dtype=bool), int(spans.sum())
+
+    def __len__(self) -> int:
+        """
+        Returns the number of covered cells.
+        """
+        return len(self.__cells)
+
+    def __dense(self, values, fill=0) -> np.ndarray:
+        if self.__n_rows * self.__n_columns > MAX_DENSE_CELLS:
+            raise ValueError(
+                f"The {self.__n_columns}x{self.__n_rows} coverage grid is too large to return as an "
+                f"array; use a larger cell size or to_frame()."
+            )
+        grid = np.full(self.__n_rows * self.__n_columns, fill, dtype=np.asarray(values).dtype)
+        grid[self.__cells] = values
+        return grid.reshape(self.__n_rows, self.__n_columns)
+
+    @property
+    def counts(self) -> np.ndarray:
+        """
+        Returns the number of passes covering every cell, as a
+        (rows, columns) array with row 0 in the south and column 0 in the west.
+        """
+        return self.__dense(self.__cell_counts)
+
+    @property
+    def dosage(self) -> np.ndarray:
+        """
+        Returns the dosage applied to every cell, summed over its passes.
+        """
+        return self.__dense(self.__cell_dosage)
+
+    @property
+    def cell_size(self) -> float:
+        return self.__cell_size
+
+    @property
+    def swath_width(self) -> float:
+        return self.__swath_width
+
+    @property
+    def passes(self) -> int:
+        return self.__passes
+
+    @property
+    def shape(self) -> tuple:
+        return self.__n_rows, self.__n_columns
+
+    @property
+    def origin(self) -> tuple:
+        return self.__origin
+
+    def cell_centres(self, cells=None) -> tuple:
+        """
+        Returns the latitude and longitude of the centres of `cells` (cell
+        ids), by default of the covered cells.
+        """
+        rows, columns = np.divmod(self.__cells if cells is None else np.asarray(cells), self.__n_columns)
+        x = self.__x0 + (columns + 0.5) * self.__cell_size
+        y = self.__y0 + (rows + 0.5) * self.__cell_size
+        origin_latitude, origin_longitude = self.__origin
+        latitude = origin_latitude + np.degrees(y / EARTH_RADIUS_M)
+        longitude = origin_longitude + np.degrees(x / (EARTH_RADIUS_M * np.cos(np.radians(origin_latitude))))
+        return latitude, longitude
+
+    def stats(self, dosage_target: float | None = None) -> dict:
+        """
+        Returns the covered and overlapped areas in square metres, the shares
+        of the field covered, overlapped and missed, and the dosage applied
+        to the covered cells. With `dosage_target`, also the share of the
+        field dosed more than 10% off the target.
+        """
+        cell_area = self.__cell_size ** 2
+        counts = self.__cell_counts
+        in_field, field_cells = self.__in_field()
+        covered_in_field = int(np.count_nonzero(in_field))
+        missed = field_cells - covered_in_field
+
+        def share(cells: int) -> float:
+            return cells / field_cells * 100 if field_cells else np.nan
+
+        stats = {
+            'cell_size': self.__cell_size,
+            'swath_width': self.__swath_width,
+            'passes': self.__passes,
+            'field_area_m2': field_cells * cell_area,
+            'covered_area_m2': len(counts) * cell_area,
+            'overlap_area_m2': int(np.count_nonzero(counts > 1)) * cell_area,
+            'missed_area_m2': missed * cell_area,
+            'coverage_pct': share(covered_in_field),
+            'overlap_pct': share(int(np.count_nonzero(in_field & (counts > 1)))),
+            'missed_pct': share(missed),
+            'mean_dosage': float(self.__cell_dosage.mean()) if len(counts) else np.nan,
+            'max_dosage': float(self.__cell_dosage.max()) if len(counts) else np.nan
+        }
+        if dosage_target is not None:
+            # Missed cells got no dosage at all
+            off_target = np.abs(self.__cell_dosage - dosage_target) > 0.1 * dosage_target
+            stats['off_target_pct'] = share(int(np.count_nonzero(in_field & off_target)) + missed)
+        return stats
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Returns the covered cells as rows of their centre location, pass
+        count and applied dosage, e.g. for a heat map.
+        """
+        latitude, longitude = self.cell_centres()
+        return pd.DataFrame({
+            'latitude': latitude,
+            'longitude': longitude,
+            'count': self.__cell_counts,
+            'dosage': self.__cell_dosage
+        })
@@ -0,0 +1,189 @@
+# app/core/log/decimation.py
+
+import numpy as np
+from app._base.base_class import BaseClass
+from app.utils.logger import Logger
+
+log = Logger(__name__)
+
+# Points returned per visible window by default
+DEFAULT_POINTS = 2000
+
+# Each level keeps about 1 / LEVEL_FACTOR of the points of the level below
+LEVEL_FACTOR = 4
+
+DECIMATION_METHODS = ('lttb', 'minmax')
+
+
+def min_max(y, n_buckets: int) -> np.ndarray:
+    """
+    Splits `y` into `n_buckets` buckets of consecutive points and returns the
+    sorted positions of the minimum and maximum of every bucket, the envelope
+    a line plot of `y` would draw.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_buckets <= 0 or n <= 2 * n_buckets:
+        return np.arange(n)
+
+    size = -(-n // n_buckets)
+    n_buckets = -(-n // size)
+    # Pad the last bucket with its last value, arg{min,max} return the first
+    # occurrence so the padding is never selected
+    buckets = np.pad(y, (0, n_buckets * size - n), mode='edge').reshape(n_buckets, size)
+    if np.isnan(y).any():
+        buckets = np.where(np.isnan(buckets), np.nanmean(y), buckets)
+
+    offsets = np.arange(n_buckets) * size
+    minimums = offsets + np.argmin(buckets, axis=1)
+    maximums = offsets + np.argmax(buckets, axis=1)
+    # Interleave the two points of every bucket in order
+    positions = np.column_stack([np.minimum(minimums, maximums), np.maximum(minimums, maximums)]).ravel()
+    return positions[np.append(True, positions[1:] != positions[:-1])]
+
+
+def lttb(x, y, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: returns the sorted positions of the
+    `n_out` points of (x, y) that best keep the visual shape of the line.
+    The first and last points are always kept.
+
+    The bucket averages are computed for all buckets at once; the selection
+    itself walks the buckets in order, because every bucket depends on the
+    point selected in the previous one.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        # No interior bucket: only the first and last points are kept
+        return np.array([0, n - 1], dtype=np.intp)[:max(n_out, 0)]
+
+    # Interior buckets, the first and last points are buckets of their own
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    starts, ends = edges[:-1], edges[1:]
+    counts = ends - starts
+    mean_x = np.add.reduceat(x[1:n - 1], starts - 1) / counts
+    mean_y = np.add.reduceat(y[1:n - 1], starts - 1) / counts
+    # The last bucket is followed by the last point
+    next_x = np.append(mean_x[1:], x[-1])
+    next_y = np.append(mean_y[1:], y[-1])
+
+    selected = np.empty(n_out, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        bx = x[starts[i]:ends[i]]
+        by = y[starts[i]:ends[i]]
+        # Twice the area of the triangles (a, b, next bucket average)
+        areas = np.abs((x[a] - next_x[i]) * (by - y[a]) - (x[a] - bx) * (next_y[i] - y[a]))
+        a = starts[i] + np.argmax(areas)
+        selected[i + 1] = a
+    return selected
+
+
+class DecimatedSeries(BaseClass):
+
+    def __init__(self, x, y, points: int = DEFAULT_POINTS):
+        """
+        Multi-resolution view of a line series for plotting. Level 0 holds all
+        the points; each level above is the min-max envelope of the level
+        below with about 1 / LEVEL_FACTOR of its points, up to a level of at
+        most `points` points. A window query reads the finest level with few
+        enough points in the window and decimates only that slice, so its
+        cost depends on `points`, not on the length of the series.
+
+        Positions returned by the queries index the original series, e.g. the
+        frame the series comes from with `iloc`.
+
+        Parameters:
+            x: Sorted x values (numbers or datetime64), e.g. the timestamps.
+            y: Values of the series. Points with a missing x or y are left out.
+            points (int): Number of points of the coarsest level, at least 2.
+        """
+        super().__init__()
+        if points < 2:
+            # A level of fewer points would never get below `points`
+            raise ValueError(f"A decimated series needs at least 2 points, not {points}.")
+        x = np.asarray(x)
+        if np.issubdtype(x.dtype, np.datetime64):
+            x = x.astype('datetime64[ns]')
+            valid = ~np.isnat(x)
+            x = x.view(np.int64)
+        else:
+            x = x.astype(np.float64)
+            valid = ~np.isnan(x)
+        y = np.asarray(y, dtype=np.float64)
+        valid &= ~np.isnan(y)
+
+        self.__positions = np.flatnonzero(valid)
+        self.__x = x[valid]
+        self.__y = y[valid]
+
+        # Level positions index the valid points
+        self.__levels = [np.arange(len(self.__positions))]
+        while len(self.__levels[-1]) > points:
+            level = self.__levels[-1]
+            n_buckets = max(len(level) // (2 * LEVEL_FACTOR), points // 2)
+            self.__levels.append(level[min_max(self.__y[level], n_buckets)])
+        log.d("Built %d decimation levels of %s points.", len(self.__levels), self.levels)
+
+    def __len__(self) -> int:
+        return len(self.__positions)
+
+    @property
+    def levels(self) -> list:
+        """
+        Returns the number of points of every level, finest first.
+        """
+        return [len(level) for level in self.__levels]
+
+    def __to_x(self, value):
+        if isinstance(value, np.datetime64):
+            return value.astype('datetime64[ns]').view(np.int64)
+        return value
+
+    def window(self,
+               start=None,
+               end=None,
+               points: int = DEFAULT_POINTS,
+               method: str = 'lttb') -> np.ndarray:
+        """
+        Returns the sorted positions of at most about `points` points of the
+        series with `start <= x <= end`.
+
+        Parameters:
+            start, end: Bounds of the visible window, None for open ends.
+                For datetime series they are `np.datetime64` values.
+            points (int): Number of points to return, at least 2.
+            method (str): 'lttb' keeps the shape of the line, 'minmax' keeps
+                the minimum and maximum of every bucket (about `points`
+                points), so no peak is lost.
+        """
+        if method not in DECIMATION_METHODS:
+            raise ValueError(f"Unknown decimation method {method}, expected one of {DECIMATION_METHODS}")
+        if points < 2:
+            raise ValueError(f"A decimated window needs at least 2 points, not {points}.")
+
+        first = 0 if start is None else np.searchsorted(self.__x, self.__to_x(start), side='left')
+        last = len(self.__x) if end is None else np.searchsorted(self.__x, self.__to_x(end), side='right')
+        if last <= first:
+            return np.empty(0, dtype=np.intp)
+
+        # Finest level with at most LEVEL_FACTOR * points points in the window
+        for level in self.__levels:
+            low = np.searchsorted(level, first, side='left')
+            high = np.searchsorted(level, last, side='left')
+            if high - low <= LEVEL_FACTOR * points:
+                break
+        candidates = level[low:high]
+
+        if len(candidates) > points:
+            if method == 'lttb':
+                x = self.__x[candidates]
+                candidates = candidates[lttb((x - x[0]).astype(np.float64), self.__y[candidates], points)]
+            else:
+                candidates = candidates[min_max(self.__y[candidates], points // 2)]
+        return self.__positions[candidates]
@@ -0,0 +1,114 @@
+# app/core/log/follower.py
+
+import os
+import threading
+from typing import Callable
+from app._base.base_class import BaseClass
+from app.utils.logger import Logger
+from .log import Log
+
+log = Logger(__name__)
+
+
+class LogFollower(BaseClass):
+
+    def __init__(self, log_obj: Log, interval: float = 1.0):
+        """
+        Polls a live `Log` for appended lines and notifies the subscribers
+        with the new rows returned by `Log.update()`.
+
+        The follower can run its own polling thread (`start()`/`stop()`), or
+        `poll()` can be called periodically by the caller, e.g. from a NiceGUI
+        view with `ui.timer(follower.interval, follower.poll)` so that the
+        subscribers run on the event loop.
+
+        Parameters:
+            log_obj (Log): The Log to follow, created with `live=True`.
+            interval (float): Polling interval in seconds.
+        """
+        super().__init__()
+        if not log_obj.live:
+            raise ValueError("LogFollower needs a Log created with live=True.")
+
+        self.__log = log_obj
+        self.__interval = interval
+        self.__subscribers = []
+        self.__last_size = None
+        self.__lock = threading.Lock()
+        self.__stop_event = threading.Event()
+        self.__thread = None
+
+    @property
+    def log(self) -> Log:
+        return self.__log
+
+    @property
+    def interval(self) -> float:
+        return self.__interval
+
+    @property
+    def running(self) -> bool:
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def subscribe(self, callback: Callable[[dict], None]) -> None:
+        """
+        Registers `callback`, called with the dict returned by `Log.update()`
+        whenever new lines have been parsed.
+        """
+        self.__subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[dict], None]) -> None:
+        """
+        Removes a callback registered with `subscribe`.
+        """
+        if callback in self.__subscribers:
+            self.__subscribers.remove(callback)
+
+    def poll(self) -> dict:
+        """
+        Checks the file for appended data and parses it. The file is only
+        read when its size has changed, so an idle poll costs one `stat`.
+        """
+        with self.__lock:
+            try:
+                size = os.path.getsize(self.__log.file_path)
+            except OSError as e:
+                log.w(f"Cannot stat followed log file: {e}")
+                return {}
+            if size == self.__last_size:
+                return {}
+            self.__last_size = size
+
+            updates = self.__log.update()
+
+        if updates:
+            for callback in list(self.__subscribers):
+                try:
+                    callback(updates)
+                except Exception as e:
+                    log.e("Error in log follower subscriber", e)
+        return updates
+
+    def start(self) -> None:
+        """
+        Starts polling in a background thread.
+        """
+        if self.running:
+            return
+        self.__stop_event.clear()
+        self.__thread = threading.Thread(target=self.__run, name=self.tag(), daemon=True)
+        self.__thread.start()
+        log.d("Following %s.", self.__log.file_path)
+
+    def stop(self) -> None:
+        """
+        Stops the background polling thread.
+        """
+        self.__stop_event.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+    def __run(self):
+        while not self.__stop_event.wait(self.__interval):
+            self.poll()
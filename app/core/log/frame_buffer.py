@@ -0,0 +1,96 @@
+# app/core/log/frame_buffer.py
+
+import pandas as pd
+from app._base.base_class import BaseClass
+
+
+class FrameBuffer(BaseClass):
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Append-only DataFrame made of chunks. Appending a chunk costs O(chunk)
+        and the chunks are only concatenated when the whole frame is read.
+        """
+        super().__init__()
+        self.__chunks = [df]
+        self.__length = len(df)
+        self.__categorical_columns = [
+            column for column, dtype in df.dtypes.items()
+            if isinstance(dtype, pd.CategoricalDtype)
+        ]
+
+    def __len__(self) -> int:
+        return self.__length
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """
+        Returns the whole frame, concatenating the pending chunks.
+        """
+        if len(self.__chunks) > 1:
+            self.__chunks = [pd.concat(self.__chunks, ignore_index=True)]
+
+        # Categoricals with different categories are concatenated as objects
+        df = self.__chunks[0]
+        for column in self.__categorical_columns:
+            if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+                df[column] = df[column].astype('category')
+        return df
+
+    def append(self, df: pd.DataFrame) -> None:
+        """
+        Appends the rows of `df`.
+        """
+        if df.empty:
+            return
+        if self.__length == 0:
+            self.__chunks = [df.reset_index(drop=True)]
+        else:
+            self.__chunks.append(df)
+        self.__length += len(df)
+
+    def last(self, column: str):
+        """
+        Returns the value of `column` in the last row, or None if empty.
+        """
+        for chunk in reversed(self.__chunks):
+            if not chunk.empty:
+                return chunk[column].iloc[-1]
+        return None
+
+    def tail(self, column: str, value) -> pd.DataFrame:
+        """
+        Returns the rows at the end of the frame where the sorted `column` is
+        greater than or equal to `value`. Only the chunks holding these rows
+        are read.
+        """
+        parts = []
+        for chunk in reversed(self.__chunks):
+            if chunk.empty:
+                continue
+            start = chunk[column].searchsorted(value, side='left')
+            parts.append(chunk.iloc[start:])
+            if start > 0:
+                break
+        if not parts:
+            return self.__chunks[0].iloc[0:0]
+        return pd.concat(parts[::-1], ignore_index=True)
+
+    def pop_tail(self, column: str, value) -> pd.DataFrame:
+        """
+        Removes and returns the rows that `tail` would return.
+        """
+        popped = self.tail(column, value)
+        remaining = len(popped)
+        while remaining and self.__chunks:
+            chunk = self.__chunks[-1]
+            if len(chunk) <= remaining:
+                remaining -= len(chunk)
+                self.__chunks.pop()
+            else:
+                self.__chunks[-1] = chunk.iloc[:len(chunk) - remaining]
+                remaining = 0
+        if not self.__chunks:
+            self.__chunks = [popped.iloc[0:0]]
+        self.__length -= len(popped)
+        return popped
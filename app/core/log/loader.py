@@ -0,0 +1,200 @@
+# app/core/log/loader.py
+
+import os
+import time
+import queue
+import asyncio
+import functools
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable
+from app._base.base_class import BaseClass
+from app.utils.logger import Logger
+from .log import Log
+
+log = Logger(__name__)
+
+# Stages reported while loading, in order
+LOAD_STAGES = ('read', 'split', 'decode', 'join', 'done')
+
+# Worker processes shared by all the loaders of the process
+LOAD_WORKERS = min(4, os.cpu_count() or 1)
+
+# Interval in seconds at which the event loop checks the progress queue
+PROGRESS_INTERVAL = 0.1
+
+# Log options that can't cross the process boundary: the spill directory of
+# an out-of-core Log is deleted with the Log of the worker
+WORKER_REJECTED_OPTIONS = ('chunk_bytes', 'spill_dir')
+
+_executor = None
+_manager = None
+_lock = threading.Lock()
+
+
+class LoadCancelled(Exception):
+    """
+    Raised when a log load is cancelled.
+    """
+
+
+def get_load_executor() -> tuple:
+    """
+    Returns the process pool and the multiprocessing manager shared by the
+    loaders, creating them on first use. The manager provides the progress
+    queues and cancel events, which can be passed to pool workers.
+    """
+    global _executor, _manager
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=LOAD_WORKERS)
+            _manager = multiprocessing.Manager()
+            log.d("Started log loading pool of %d workers.", LOAD_WORKERS)
+        return _executor, _manager
+
+
+def shutdown_load_executor() -> None:
+    """
+    Stops the shared process pool and manager. Pending loads are cancelled
+    and running ones are waited for, as they still use the manager.
+    """
+    global _executor, _manager
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _manager.shutdown()
+            _executor = _manager = None
+
+
+def load_log(file_path, progress_queue=None, cancel_event=None, **log_kwargs) -> Log:
+    """
+    Loads and preloads the Log of `file_path`. Runs in a pool worker: the
+    stages are put on `progress_queue` as `(stage, log_type)` tuples, and
+    `cancel_event` is checked at the start of every stage, raising
+    `LoadCancelled` once it is set. A stage already running isn't
+    interrupted.
+    """
+    def report(stage, log_type=None):
+        if cancel_event is not None and cancel_event.is_set():
+            raise LoadCancelled(f"Loading of {file_path} cancelled before the {stage} stage.")
+        if progress_queue is not None:
+            progress_queue.put((stage, log_type))
+
+    report('read')
+    log_obj = Log(file_path, **log_kwargs)
+    log_obj.preload(progress=report)
+    report('done')
+    return log_obj
+
+
+class LogLoader(BaseClass):
+
+    def __init__(self, file_path, on_progress: Callable[[dict], None] | None = None, **log_kwargs):
+        """
+        Loads a Log in a worker process of a shared pool without blocking the
+        event loop, e.g. from a NiceGUI handler:
+
+        loader = LogLoader(path, on_progress=lambda p: bar.set_value(p['fraction']))
+        log_obj = await loader.load()
+
+        Parameters:
+            file_path (str): Path of the log file.
+            on_progress: Called on the event loop with a dict of `stage` (one
+                of LOAD_STAGES), `log_type`, `fraction` (0 to 1) and
+                `elapsed` (seconds) when a stage starts.
+            **log_kwargs: Passed to `Log`. Out-of-core options
+                (WORKER_REJECTED_OPTIONS) raise ValueError, as the spilled
+                frames wouldn't outlive the worker; load those logs with
+                `Log` in the calling process.
+        """
+        super().__init__()
+        rejected = [option for option in WORKER_REJECTED_OPTIONS if log_kwargs.get(option) is not None]
+        if rejected:
+            raise ValueError(f"LogLoader can't load out-of-core logs ({', '.join(rejected)}).")
+        self.__file_path = file_path
+        self.__on_progress = on_progress
+        self.__log_kwargs = log_kwargs
+        self.__stage = None
+        self.__cancel_event = None
+        self.__cancelled = False
+
+    @property
+    def file_path(self):
+        return self.__file_path
+
+    @property
+    def stage(self) -> str | None:
+        return self.__stage
+
+    @property
+    def cancelled(self) -> bool:
+        return self.__cancelled
+
+    def cancel(self) -> None:
+        """
+        Cancels the load. `load()` raises `LoadCancelled` right away, but the
+        worker only stops at the start of its next stage (see LOAD_STAGES):
+        a stage already running, e.g. reading a large file, runs to its end
+        and keeps its pool worker busy meanwhile.
+        """
+        self.__cancelled = True
+        if self.__cancel_event is not None:
+            self.__cancel_event.set()
+
+    def __report(self, stage: str, log_type: str | None, started: float) -> None:
+        self.__stage = stage
+        if self.__on_progress is None:
+            return
+        try:
+            self.__on_progress({
+                'stage': stage,
+                'log_type': log_type,
+                'fraction': LOAD_STAGES.index(stage) / (len(LOAD_STAGES) - 1),
+                'elapsed': time.monotonic() - started
+            })
+        except Exception as e:
+            log.e(f"Error in the progress callback of {self.__file_path}", e)
+
+    def __drain(self, progress_queue, started: float) -> None:
+        while True:
+            try:
+                stage, log_type = progress_queue.get_nowait()
+            except queue.Empty:
+                return
+            self.__report(stage, log_type, started)
+
+    async def load(self) -> Log:
+        """
+        Loads the log in the shared pool and returns it once the frames are
+        built. Raises `LoadCancelled` if `cancel()` is called. Cancelling the
+        awaiting task cancels the worker too.
+        """
+        if self.__cancelled:
+            raise LoadCancelled(f"Loading of {self.__file_path} cancelled.")
+
+        executor, manager = get_load_executor()
+        progress_queue = manager.Queue()
+        self.__cancel_event = manager.Event()
+        started = time.monotonic()
+
+        log.i(f"Loading {self.__file_path} in the background...")
+        future = asyncio.get_running_loop().run_in_executor(executor, functools.partial(
+            load_log, self.__file_path, progress_queue, self.__cancel_event, **self.__log_kwargs
+        ))
+        try:
+            while not future.done():
+                await asyncio.wait({future}, timeout=PROGRESS_INTERVAL)
+                self.__drain(progress_queue, started)
+                if self.__cancelled:
+                    raise LoadCancelled(f"Loading of {self.__file_path} cancelled.")
+            log_obj = future.result()
+        except (LoadCancelled, asyncio.CancelledError):
+            self.cancel()
+            future.cancel()
+            log.i(f"Cancelled loading {self.__file_path}.")
+            raise
+        self.__drain(progress_queue, started)
+        log.i(f"Loaded {self.__file_path} in {time.monotonic() - started:.2f} s.")
+        return log_obj
+
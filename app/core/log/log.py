@@ -1,236 +1,1168 @@
 # app/models/log.py
 
+import io
+from datetime import timedelta
+from typing import Callable
+import numpy as np
 import pandas as pd
 from app._base.base_class import BaseClass
 from app.utils.logger import Logger
+from app.utils.database import LogCache
+from app.utils.profiling import Profiler
+from .parsers import TIMESTAMP_FORMAT, PythonLogParser, empty_log_frame, get_parser
+from .schema import get_schema
+from .frame_buffer import FrameBuffer
+from .parallel import parse_parallel
+from .compressed import (
+    detect_compression, open_decompressed, parse_compressed, parse_compressed_parallel, read_line_chunks
+)
+from .spatial import SpatialIndex
+from .alignment import AlignStream, align, to_nanoseconds
+from .decimation import DEFAULT_POINTS, DecimatedSeries
+from .segments import decrements, segment_flight
+from .coverage import DEFAULT_CELL_SIZE, DEFAULT_SWATH_WIDTH, CoverageGrid
+from .anomaly import AnomalyDetector, events_frame
+from .spill import SpillDirectory, SpilledFrame
 
 log = Logger(__name__)
 
+# Columns added to spray_info_df from the closest mission_info entry
+LOCATION_COLUMNS = ['latitude', 'longitude', 'height']
+LOCATION_TOLERANCE = pd.Timedelta('1s')
+
+
+def group_positions(log_types: pd.Series) -> dict:
+    """
+    Returns a dict mapping each log type to the positions of its rows in
+    `log_types`, computed with a single stable argsort of the category codes.
+    """
+    if not isinstance(log_types.dtype, pd.CategoricalDtype):
+        log_types = log_types.astype('category')
+
+    codes = log_types.cat.codes.to_numpy()
+    order = np.argsort(codes, kind='stable')
+    counts = np.bincount(codes + 1, minlength=len(log_types.cat.categories) + 1)
+    boundaries = np.cumsum(counts)
+
+    # Code -1 (missing log type) comes first and is skipped
+    return {
+        category: order[boundaries[i]:boundaries[i + 1]]
+        for i, category in enumerate(log_types.cat.categories)
+        if counts[i + 1] > 0
+    }
+
+
 class Log(BaseClass):
 
-    def __init__(self, file_path):
+    # Low-cardinality master_df columns stored as categoricals in compact mode
+    COMPACT_COLUMNS = ['module', 'severity', 'log_type']
+
+    def __init__(self,
+                 file_path,
+                 parser: str = 'auto',
+                 timestamp_format: str | None = TIMESTAMP_FORMAT,
+                 cache: LogCache | None = None,
+                 live: bool = False,
+                 parse_workers: int = 1,
+                 compact: bool = False,
+                 deep_profile: bool = False,
+                 chunk_bytes: int | None = None,
+                 spill_dir=None):
         super().__init__()  # Initialize BaseClass
         """
         Initializes the Log object by loading and parsing the log file.
+
+        Parameters:
+            file_path (str): Path of the log file, plain text or gzip, bz2,
+                xz or zstd compressed.
+            parser (str): Parser backend, one of 'auto', 'pyarrow' or
+                'python'.
+            timestamp_format (str | None): Expected timestamp format. Values
+                that don't match it are parsed with format inference.
+            cache (LogCache | None): Cache of parsed frames. When the file
+                has been parsed before, the frames are loaded from it.
+            live (bool): If True, the file is still being written. Only
+                complete lines are parsed and `update()` parses the lines
+                appended since. The cache is not used in live mode.
+            parse_workers (int): If greater than 1, the file is memory mapped
+                and split into byte ranges that are parsed by this many
+                worker processes, at most one per available CPU. Compressed
+                files are only split when they are in the seekable zstd
+                format.
+            compact (bool): If True, low-cardinality columns are stored as
+                categoricals and numeric fields use the smaller dtypes of
+                their schema. Once every log type has been built, `log_info`
+                is dropped from master_df.
+            deep_profile (bool): If True, the stages also run under cProfile
+                and tracemalloc, see `profile` and `profile_stats`.
+            chunk_bytes (int | None): If set, the log is processed out of
+                core: the file is streamed in chunks of about this many bytes
+                of text through parse, type split, decode and join, and
+                master_df and the per-type frames are spilled to Arrow IPC
+                files, so memory is bounded by the chunk size (see
+                SPILL_CHUNK_BYTES) rather than the file size. The frames are
+                materialized on first access; `between()` and `anomalies`
+                read them from the memory mapped files instead. Not available
+                in live mode; the cache is not used.
+            spill_dir (str | None): Directory of the spilled frames in
+                out-of-core mode. Defaults to a temporary directory deleted
+                with the Log.
         """
         self.__file_path = file_path
-        self.__master_df = self.__load_log_file()
-        self.__mission_info_df = self.__get_logs_by_type('MISSION_INFO', drop_first_row=True).reset_index(drop=True)
-        self.__spray_info_df = self.__get_logs_by_type('SPRAY_INFO', drop_first_row=True).reset_index(drop=True)
+        self.__parser = parser
+        self.__timestamp_format = timestamp_format
+        self.__live = live
+        self.__parse_workers = parse_workers
+        self.__compact = compact
+        if chunk_bytes is not None and live:
+            raise ValueError("Live logs can't be processed out of core.")
+        self.__chunk_bytes = chunk_bytes
+        self.__spill = None if chunk_bytes is None else SpillDirectory(spill_dir)
+        self.__cache = None if live or chunk_bytes is not None else cache
+        self.__cache_key = self.__get_cache_key()
+
+        # Byte offset of the first unparsed line (live mode)
+        self.__offset = 0
+
+        # Group index of master_df (log type -> row positions), built on first
+        # use and covering the first `__indexed_rows` rows
+        self.__type_index = {}
+        self.__indexed_rows = 0
+
+        # Per-type frames, built on first access, and the number of raw rows
+        # each of them was built from
+        self.__frames = {}
+        self.__raw_counts = {}
+
+        # Sorted timestamps of the per-type frames used by `between` and `at`,
+        # and the first timestamp of the log
+        self.__time_indexes = {}
+        self.__start_time = None
+
+        # Spatial indexes of the per-type frames, built on first use
+        self.__spatial_indexes = {}
+
+        # Multi-resolution levels of the plotted series, built on first use
+        self.__decimated = {}
+
+        # Results of `align`, keyed by the timeline and the streams
+        self.__alignments = {}
+
+        # Flight segment table, built on first use
+        self.__segments = None
+
+        # Coverage rasters, keyed by their parameters
+        self.__coverage = {}
+
+        # Anomaly events, and in live mode the detector fed with the new rows
+        self.__anomalies = None
+        self.__anomaly_detector = None
+
+        # Stage callback of `preload`
+        self.__progress = None
+
+        # Called whenever a frame is built or materialized, see `on_frames_built`
+        self.__on_frames_built = None
+
+        # Timing spans of the pipeline stages, see `profile`
+        self.__profiler = Profiler(str(file_path), deep=deep_profile)
+
+        if self.__spill is not None:
+            with self.__profiler.span('read') as record:
+                self.__process_out_of_core()
+                record.rows_out = len(self.__master)
+        else:
+            with self.__profiler.span('read') as record:
+                master_df = self.__load_from_cache('master')
+                if master_df is None:
+                    master_df = self.__categorize(self.__load_log_file())
+                    if not master_df.empty:
+                        self.__save_to_cache('master', master_df)
+                record.rows_out = len(master_df)
+            self.__master = FrameBuffer(master_df)
+
+    def __categorize(self, master_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Stores the low-cardinality columns of `master_df` as categoricals.
+        """
+        for column in (Log.COMPACT_COLUMNS if self.__compact else ['log_type']):
+            master_df[column] = master_df[column].astype('category')
+        return master_df
+
+    def __get_cache_key(self):
+        """
+        Returns the cache key of the log file, or None if there is no cache or
+        the file can't be read.
+        """
+        if self.__cache is None:
+            return None
+        try:
+            return self.__cache.key(self.__file_path, self.__timestamp_format, self.__compact)
+        except OSError as e:
+            log.w(f"Cannot fingerprint log file for the cache: {e}")
+            return None
 
-        # Process data frames
-        self.__process_mission_info()
-        self.__process_spray_info()
+    def __load_from_cache(self, name: str):
+        """
+        Returns the frame `name` from the cache, or None on a cache miss.
+        """
+        if self.__cache_key is None:
+            return None
+
+        df = self.__cache.load(self.__cache_key, name)
+        if df is not None:
+            log.i(f"Loaded {name} of {self.__file_path} from the log cache.")
+        return df
 
-        # Add location info to spray_info_df
-        self.__add_location_info_to_spray_dataframe()
+    def __save_to_cache(self, name: str, df: pd.DataFrame):
+        """
+        Stores the frame `name` in the cache.
+        """
+        if self.__cache_key is not None:
+            self.__cache.save(self.__cache_key, name, df)
 
     def __load_log_file(self):
         """
-        Reads and parses the log file into a master DataFrame.
+        Reads and parses the log file into a master DataFrame using the
+        configured parser backend, falling back to the pure-Python parser if
+        the backend fails. Compressed files are detected by their magic bytes
+        and parsed while they are decompressed.
         """
         try:
-            # Read the file line by line
-            with open(self.__file_path, 'r') as file:
-                lines = file.readlines()
-
-            # Prepare lists to store each column
-            timestamps = []
-            modules = []
-            severities = []
-            log_types = []
-            log_infos = []
-
-            for line in lines:
-                # Skip empty lines
-                if not line.strip():
-                    continue
-
-                # Split the line into at most 5 parts
-                parts = line.strip().split(',', 4)
-
-                # Ensure the line has at least 4 commas
-                if len(parts) >= 4:
-                    timestamp = parts[0].strip()
-                    module = parts[1].strip()
-                    severity = parts[2].strip()
-                    log_type = parts[3].strip()
-                    log_info = parts[4].strip() if len(parts) > 4 else ''
-
-                    timestamps.append(timestamp)
-                    modules.append(module)
-                    severities.append(severity)
-                    log_types.append(log_type)
-                    log_infos.append(log_info)
-                else:
-                    # Handle lines that don't match the expected format
-                    continue
-
-            # Create the DataFrame
-            data = {
-                'timestamp': timestamps,
-                'module': modules,
-                'severity': severities,
-                'log_type': log_types,
-                'log_info': log_infos
-            }
-
-            df = pd.DataFrame(data)
-            # Convert timestamp to datetime
-            df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
-            return df.reset_index(drop=True)
+            compression = detect_compression(self.__file_path)
+            if compression is not None:
+                if self.__live:
+                    raise ValueError(f"Live mode needs an uncompressed log, the file is {compression} compressed.")
+                return self.__parse_compressed(compression)
+            if self.__live:
+                return self.__parse(self.__read_complete_lines())
+            if self.__parse_workers > 1:
+                try:
+                    return parse_parallel(
+                        self.__file_path, self.__parse_workers, self.__parser, self.__timestamp_format
+                    )
+                except Exception as e:
+                    log.w(f"Parallel parsing failed ({e}), parsing serially.")
+            return self.__parse(self.__file_path)
 
         except Exception as e:
             log.e(f"Error loading log file: {e}")
-            return pd.DataFrame(columns=['timestamp', 'module', 'severity', 'log_type', 'log_info'])
+            return empty_log_frame()
 
-    def __get_logs_by_type(self, log_type: str, drop_first_row: bool = False):
+    def __parse_compressed(self, compression: str) -> pd.DataFrame:
         """
-        Returns a DataFrame filtered by log_type.
-
-        Parameters:
-            log_type (str): The type of log to filter.
-            drop_first_row (bool): If True, drops the first row of the DataFrame.
+        Parses a compressed log in chunks straight from the decompressor.
+        Seekable zstd files are decompressed and parsed by `parse_workers`
+        processes.
         """
-        if self.__master_df is not None:
-            df = self.__master_df[self.__master_df['log_type'] == log_type].copy()
-            if drop_first_row and not df.empty:
-                # Drop the first row
-                df = df.iloc[1:].reset_index(drop=True)
-            return df.reset_index(drop=True)
-        else:
-            return pd.DataFrame()
+        if self.__parse_workers > 1 and compression == 'zstd':
+            try:
+                df = parse_compressed_parallel(
+                    self.__file_path, self.__parse_workers, self.__parser, self.__timestamp_format
+                )
+                if df is not None:
+                    return df
+                log.d("The zstd file has no seek table, decompressing serially.")
+            except Exception as e:
+                log.w(f"Parallel parsing failed ({e}), parsing serially.")
+        return parse_compressed(self.__file_path, compression, self.__parse)
 
-    def __process_mission_info(self):
+    def __process_out_of_core(self) -> None:
         """
-        Processes the `MISSION_INFO` logs by splitting `log_info` into separate
-        columns and retaining only rows that meet specified conditions.
+        Streams the log file in chunks of `chunk_bytes` through parse, type
+        split, decode and join, spilling master_df and the per-type frames
+        chunk by chunk. Spray rows are joined once the log has moved past
+        the join tolerance, with the mission rows of the current chunk and
+        the tail of the previous ones, which gives the same locations as
+        joining the whole frames.
         """
-        if not self.__mission_info_df.empty:
-            mission_info_columns = [
-                'flight_mode', 'arm_status', 'flight_status',
-                'height', 'speed', 'climb_rate', 'heading', 'latitude',
-                'longitude'
-            ]
+        self.__master = SpilledFrame(self.__spill.file('master'), sort_column=None)
+        mission_tail = None
+        pending_spray = None
+        log_end = None
 
-            # Split 'log_info' into columns
-            self.__mission_info_df[mission_info_columns] = \
-                self.__mission_info_df['log_info'].str.split(',', expand=True)
+        def spill(log_type: str, df: pd.DataFrame) -> None:
+            if log_type not in self.__frames:
+                self.__frames[log_type] = SpilledFrame(self.__spill.file(log_type.lower()))
+            self.__frames[log_type].append(df)
 
-            # Strip whitespace from new columns
-            for col in mission_info_columns:
-                self.__mission_info_df[col] = \
-                    self.__mission_info_df[col].str.strip()
+        def join(spray_df: pd.DataFrame) -> None:
+            if not spray_df.empty:
+                mission_df = mission_tail if mission_tail is not None else self.__master.template
+                spill('SPRAY_INFO', self.__add_location_info_to_spray_dataframe(spray_df, mission_df))
 
-            # Convert numeric columns
-            numeric_columns = [
-                'height', 'speed', 'climb_rate', 'heading', 'latitude',
-                'longitude'
-            ]
-            for col in numeric_columns:
-                self.__mission_info_df[col] = pd.to_numeric(self.__mission_info_df[col], errors='coerce')
-
-            # Apply filtering conditions
-            self.__mission_info_df = self.__mission_info_df[
-                (self.__mission_info_df['height'] != -100.0) &
-                (self.__mission_info_df['speed'] != -100.0) &
-                (self.__mission_info_df['climb_rate'] != -100.0) &
-                (self.__mission_info_df['heading'] != -100.0) &
-                (self.__mission_info_df['latitude'] != -200) &
-                (self.__mission_info_df['longitude'] != -200)
-            ]
+        try:
+            compression = detect_compression(self.__file_path)
+            stream = open_decompressed(self.__file_path, compression) if compression else open(self.__file_path, 'rb')
+            with stream:
+                for data in read_line_chunks(stream, self.__chunk_bytes):
+                    master_df = self.__categorize(self.__parse(data))
+                    if master_df.empty:
+                        continue
+                    timestamps = master_df['timestamp']
+                    if timestamps.notna().any():
+                        start, end = timestamps.min(), timestamps.max()
+                        self.__start_time = start if self.__start_time is None else min(self.__start_time, start)
+                        log_end = end if log_end is None else max(log_end, end)
 
-            # Drop 'log_info' column after parsing and reset index
-            self.__mission_info_df = self.__mission_info_df.drop(columns=['log_info']).reset_index(drop=True)
-        else:
-            log.w("No MISSION_INFO logs to process.")
+                    for log_type, positions in group_positions(master_df['log_type']).items():
+                        schema = get_schema(log_type)
+                        raw_count = self.__raw_counts.get(log_type, 0)
+                        self.__raw_counts[log_type] = raw_count + len(positions)
+                        if schema is not None and schema.drop_first_row and raw_count == 0:
+                            # Drop the first row
+                            positions = positions[1:]
+                        df = self.__select_rows(master_df, positions)
+                        if schema is None:
+                            df = df.sort_values('timestamp', kind='stable').reset_index(drop=True)
+                        else:
+                            df = schema.decode(df, compact=self.__compact)
+
+                        if log_type == 'MISSION_INFO':
+                            mission_tail = df if mission_tail is None else pd.concat([mission_tail, df], ignore_index=True)
+                            spill(log_type, df)
+                        elif log_type == 'SPRAY_INFO':
+                            pending_spray = df if pending_spray is None else pd.concat([pending_spray, df], ignore_index=True)
+                        else:
+                            spill(log_type, df)
+
+                    if self.__compact:
+                        master_df = master_df.drop(columns=['log_info'])
+                    self.__master.append(master_df)
+
+                    if log_end is None:
+                        continue
+                    # Spray rows further than the tolerance from the end of the
+                    # log can't match later mission rows
+                    if pending_spray is not None:
+                        ready = (pending_spray['timestamp'] <= log_end - LOCATION_TOLERANCE).to_numpy(dtype=bool)
+                        join(pending_spray[ready])
+                        pending_spray = pending_spray[~ready].reset_index(drop=True)
+                    # Keep the mission rows the waiting spray rows may match
+                    cutoff = log_end
+                    if pending_spray is not None and pending_spray['timestamp'].notna().any():
+                        cutoff = min(cutoff, pending_spray['timestamp'].min())
+                    if mission_tail is not None:
+                        mission_tail = mission_tail[
+                            (mission_tail['timestamp'] >= cutoff - LOCATION_TOLERANCE).to_numpy(dtype=bool)
+                        ].reset_index(drop=True)
+
+            if pending_spray is not None:
+                join(pending_spray)
+        except Exception as e:
+            log.e(f"Error processing the log file out of core, keeping the rows spilled so far: {e}")
+        finally:
+            self.__master.close()
+            for frame in self.__frames.values():
+                frame.close()
+
+        if self.__master.template is None:
+            master_df = self.__categorize(empty_log_frame())
+            self.__master.append(master_df.drop(columns=['log_info']) if self.__compact else master_df)
+        # Like the frames built in memory, the per-type frames get the
+        # categories of the whole of master_df
+        for frame in self.__frames.values():
+            frame.add_categories(self.__master.template)
+        log.d("Spilled %d lines of %s to %s.", len(self.__master), self.__file_path, self.__spill.path)
 
-    def __process_spray_info(self):
+    def __parse(self, source) -> pd.DataFrame:
         """
-        Processes the `SPRAY_INFO` logs by splitting `log_info` into separate columns.
+        Parses `source` (a path or bytes) with the configured parser backend.
         """
-        if not self.__spray_info_df.empty:
-            spray_columns = [
-                'spray_status', 'pump_pwm', 'nozzle_pwm', 'req_flowrate',
-                'actual_flowrate', 'flowmeter_pulse', 'payload_rem',
-                'area_sprayed', 'req_dosage', 'actual_dosage', 'prv_wp',
-                'next_wp'
-            ]
+        def open_source():
+            return io.BytesIO(source) if isinstance(source, bytes) else source
 
-            # Split 'log_info' into columns
-            self.__spray_info_df[spray_columns] = \
-                self.__spray_info_df['log_info'].str.split(',', expand=True)
+        parser = get_parser(self.__parser, self.__timestamp_format)
+        try:
+            return parser.parse(open_source())
+        except Exception as e:
+            if parser.name == PythonLogParser.name:
+                raise
+            log.w(f"'{parser.name}' parser failed ({e}), falling back to the Python parser.")
+            return PythonLogParser(self.__timestamp_format).parse(open_source())
 
-            # Strip whitespace from new columns
-            for col in spray_columns:
-                self.__spray_info_df[col] = self.__spray_info_df[col].str.strip()
+    def __read_complete_lines(self) -> bytes:
+        """
+        Returns the complete lines appended after the current offset and moves
+        the offset past them. A trailing partial line is left for later.
+        """
+        with open(self.__file_path, 'rb') as file:
+            file.seek(self.__offset)
+            data = file.read()
 
-            # Convert numeric columns
-            for col in spray_columns:
-                self.__spray_info_df[col] = pd.to_numeric(self.__spray_info_df[col], errors='coerce')
+        end = data.rfind(b'\n') + 1
+        self.__offset += end
+        return data[:end]
 
-            # Drop 'log_info' column after parsing and reset index
-            self.__spray_info_df = self.__spray_info_df.drop(columns=['log_info']).reset_index(drop=True)
-        else:
-            log.w("No SPRAY_INFO logs to process.")
+    def __get_type_index(self) -> dict:
+        """
+        Returns a dict mapping each log type to the positions of its rows in
+        master_df. Rows appended since the last call are indexed on demand.
+        """
+        if self.__indexed_rows < len(self.__master):
+            start = self.__indexed_rows
+            with self.__profiler.span('index', len(self.__master) - start):
+                new_index = group_positions(self.master_df['log_type'].iloc[start:])
+            for log_type, positions in new_index.items():
+                positions = positions + start
+                if log_type in self.__type_index:
+                    positions = np.concatenate([self.__type_index[log_type], positions])
+                self.__type_index[log_type] = positions
+            self.__indexed_rows = len(self.__master)
+        return self.__type_index
+
+    def __get_logs_by_type(self, log_type: str, drop_first_row: bool = False):
+        """
+        Returns a DataFrame filtered by log_type.
+
+        Parameters:
+            log_type (str): The type of log to filter.
+            drop_first_row (bool): If True, drops the first row of the DataFrame.
+        """
+        if self.__spill is not None:
+            # The rows of every log type in the file were spilled while
+            # reading, so `log_type` has none
+            return self.__select_rows(self.__master.template, np.empty(0, dtype=np.intp))
+        positions = self.__get_type_index().get(log_type, np.empty(0, dtype=np.intp))
+        self.__raw_counts[log_type] = len(positions)
+        if drop_first_row:
+            # Drop the first row
+            positions = positions[1:]
+        return self.__select_rows(self.master_df, positions)
+
+    def __select_rows(self, master_df: pd.DataFrame, positions) -> pd.DataFrame:
+        df = master_df.take(positions)
+        if not self.__compact:
+            df['log_type'] = df['log_type'].astype(str)
+        return df.reset_index(drop=True)
 
-    def __add_location_info_to_spray_dataframe(self):
+    def __add_location_info_to_spray_dataframe(self,
+                                               spray_info_df: pd.DataFrame,
+                                               mission_info_df: pd.DataFrame | None = None) -> pd.DataFrame:
         """
         Appends latitude, longitude, and height from the closest mission_info entry to spray_info_df.
         """
+        if mission_info_df is None:
+            mission_info_df = self.mission_info_df
+        # Without a match the location columns are left empty
+        no_location_df = spray_info_df.assign(**{col: np.nan for col in LOCATION_COLUMNS})
         try:
-            if self.__mission_info_df.empty or self.__spray_info_df.empty:
+            if mission_info_df.empty or spray_info_df.empty:
                 log.w("Either mission_info_df or spray_info_df is empty. Cannot add location info.")
-                return
+                return no_location_df
 
             # Ensure required columns are present
-            required_columns = ['timestamp', 'latitude', 'longitude', 'height']
+            required_columns = ['timestamp'] + LOCATION_COLUMNS
             for col in required_columns:
-                if col not in self.__mission_info_df.columns:
+                if col not in mission_info_df.columns:
                     log.w(f"Column '{col}' not found in mission_info_df.")
-                    return
-
-            # Ensure timestamp columns are datetime and data is sorted
-            self.__mission_info_df['timestamp'] = pd.to_datetime(self.__mission_info_df['timestamp'])
-            self.__mission_info_df.sort_values('timestamp', inplace=True)
-
-            self.__spray_info_df['timestamp'] = pd.to_datetime(self.__spray_info_df['timestamp'])
-            self.__spray_info_df.sort_values('timestamp', inplace=True)
-
-            # Use merge_asof to merge on timestamp
-            merged_df = pd.merge_asof(
-                self.__spray_info_df,
-                self.__mission_info_df[['timestamp', 'latitude', 'longitude', 'height']],
-                on='timestamp',
-                direction='nearest',
-                tolerance=pd.Timedelta('1s')  # Adjust tolerance as needed
-            )
+                    return no_location_df
 
-            # Update __spray_info_df with the merged data
-            self.__spray_info_df = merged_df.reset_index(drop=True)
+            # Both frames are already sorted by timestamp when processed
+            with self.__profiler.span('join', len(spray_info_df)) as record:
+                location_df = align(
+                    spray_info_df['timestamp'],
+                    {'MISSION_INFO': mission_info_df},
+                    [AlignStream('MISSION_INFO', LOCATION_COLUMNS, 'nearest', LOCATION_TOLERANCE, prefix='')]
+                )
+                merged_df = spray_info_df.assign(**{col: location_df[col] for col in LOCATION_COLUMNS})
+                record.rows_out = len(merged_df)
 
             log.i("Location info added to spray_info_df successfully.")
+            return merged_df.reset_index(drop=True)
 
         except Exception as e:
             log.e(f"Error adding location info to spray_info_df: {e}")
+            return no_location_df
+
+    def __build_logs(self, log_type: str) -> pd.DataFrame:
+        """
+        Builds the frame of `log_type`, decoding it with its registered schema
+        and applying the post-processing step of the type, if any.
+        """
+        schema = get_schema(log_type)
+        self.__report('decode', log_type)
+        if schema is None:
+            df = self.__get_logs_by_type(log_type)
+            return df.sort_values('timestamp', kind='stable').reset_index(drop=True)
+
+        df = schema.decode(
+            self.__get_logs_by_type(log_type, drop_first_row=schema.drop_first_row),
+            compact=self.__compact
+        )
+
+        if log_type == 'SPRAY_INFO':
+            # Add location info to spray_info_df
+            self.__report('join', log_type)
+            df = self.__add_location_info_to_spray_dataframe(df)
+        return df
+
+    def __get_frame(self, log_type: str) -> FrameBuffer:
+        """
+        Returns the frame of `log_type`, loading it from the cache or building
+        it on first access.
+        """
+        if log_type not in self.__frames:
+            name = log_type.lower()
+            with self.__profiler.span(f"build {log_type}") as record:
+                df = self.__load_from_cache(name)
+                if df is None:
+                    df = self.__build_logs(log_type)
+                    if len(self.__master):
+                        self.__save_to_cache(name, df)
+                record.rows_out = len(df)
+            self.__frames[log_type] = FrameBuffer(df)
+            self.__release_log_info()
+            self.__frames_built()
+        return self.__frames[log_type]
+
+    def __materialize(self, frame) -> pd.DataFrame:
+        """
+        Returns the DataFrame of `frame`, reading it into memory if it is
+        spilled.
+        """
+        on_disk = self.__on_disk(frame)
+        df = frame.frame
+        if on_disk:
+            self.__frames_built()
+        return df
+
+    def __frames_built(self):
+        if self.__on_frames_built is not None:
+            self.__on_frames_built(self)
+
+    def __release_log_info(self):
+        """
+        In compact mode, drops `log_info` from master_df once the frames of
+        all log types are built, as the payloads are not needed any more. In
+        live mode new log types may still appear, so it is kept.
+        """
+        if not self.__compact or self.__live or self.__spill is not None:
+            return
+        if 'log_info' not in self.__master.frame.columns:
+            return
+        if all(log_type in self.__frames for log_type in self.__get_type_index()):
+            self.__master = FrameBuffer(self.__master.frame.drop(columns=['log_info']))
+            log.d("All log types decoded, dropped log_info from master_df.")
+
+    def __report(self, stage: str, log_type: str | None = None):
+        if self.__progress is not None:
+            self.__progress(stage, log_type)
+
+    def preload(self, log_types=None, progress=None) -> None:
+        """
+        Builds the type index and the frames of `log_types` up front instead
+        of on first access, e.g. in a worker process before the Log is handed
+        to the GUI.
+
+        Parameters:
+            log_types (list | None): Log types to build. Defaults to
+                MISSION_INFO and SPRAY_INFO.
+            progress: Called as `progress(stage, log_type)` when a stage
+                starts, with stage one of 'split', 'decode' or 'join'. An
+                exception raised by it aborts the preload.
+        """
+        log_types, _ = self.__select_types(log_types)
+        self.__progress = progress
+        try:
+            self.__report('split')
+            if self.__spill is None:
+                # Out of core, the rows were split by type while reading
+                self.__get_type_index()
+            for log_type in log_types:
+                self.__get_frame(log_type)
+        finally:
+            self.__progress = None
+
+    def get_logs(self, log_type: str) -> pd.DataFrame:
+        """
+        Returns the rows of `log_type`. Log types with a registered schema
+        (see `app.core.log.schema`) are decoded into typed columns, the others
+        are returned with `log_info` unsplit.
+        """
+        return self.__materialize(self.__get_frame(log_type))
+
+    def update(self) -> dict:
+        """
+        Parses the complete lines appended to the file since the last call
+        and appends them to master_df and to the per-type frames built so far.
+        Only the new lines are decoded, and only the tail of spray_info_df
+        that may be closer to new mission_info entries is joined again.
+
+        Returns a dict holding the new master_df rows under 'master' and the
+        new processed rows under each built log type. Once `anomalies` has
+        been read, the anomaly events closed by the new rows are returned
+        under 'anomalies'.
+        """
+        if not self.__live:
+            raise RuntimeError("Log.update() is only available in live mode.")
+
+        with self.__profiler.span('update') as record:
+            updates = self.__update()
+            record.rows_out = len(updates.get('master', ()))
+        return updates
+
+    def __update(self) -> dict:
+        try:
+            data = self.__read_complete_lines()
+            new_master_df = self.__categorize(self.__parse(data)) if data else None
+        except Exception as e:
+            log.e(f"Error reading new lines of the log file: {e}")
+            return {}
+        if new_master_df is None or new_master_df.empty:
+            return {}
+
+        start = len(self.__master)
+        self.__master.append(new_master_df)
+        updates = {'master': new_master_df}
+
+        new_index = group_positions(new_master_df['log_type'])
+        mission_end = None
+        if 'MISSION_INFO' in self.__frames:
+            mission_end = self.__frames['MISSION_INFO'].last('timestamp')
+
+        # SPRAY_INFO is extended last, as its join needs the new mission rows
+        built_types = sorted(self.__frames, key=lambda log_type: log_type == 'SPRAY_INFO')
+        for log_type in built_types:
+            positions = new_index.get(log_type)
+            if positions is None:
+                if log_type == 'SPRAY_INFO' and 'MISSION_INFO' in updates:
+                    # New mission rows may be closer to the last spray rows
+                    self.__extend_spray_info(None, mission_end)
+                continue
+
+            schema = get_schema(log_type)
+            if schema is not None and schema.drop_first_row and self.__raw_counts[log_type] == 0:
+                # Drop the first row
+                positions = positions[1:]
+            self.__raw_counts[log_type] += len(new_index[log_type])
+
+            df = self.__select_rows(new_master_df, positions)
+            if schema is not None:
+                df = schema.decode(df, compact=self.__compact)
+            if df.empty:
+                continue
+
+            if log_type == 'SPRAY_INFO':
+                df = self.__extend_spray_info(df, mission_end)
+            else:
+                self.__append_sorted(log_type, df)
+            updates[log_type] = df
+
+        # The time indexes of the extended frames are rebuilt on next use
+        self.__time_indexes.clear()
+        self.__spatial_indexes.clear()
+        self.__decimated.clear()
+        self.__alignments.clear()
+        self.__segments = None
+        self.__coverage.clear()
+        if self.__anomaly_detector is not None:
+            events = self.__anomaly_detector.on_update(updates)
+            if not events.empty:
+                self.__anomalies = pd.concat([self.__anomalies, events], ignore_index=True)
+                updates['anomalies'] = events
+        if self.__start_time is not None:
+            self.__start_time = min(self.__start_time, new_master_df['timestamp'].min())
+
+        log.d("Appended %d lines after row %d.", len(new_master_df), start)
+        return updates
+
+    def __append_sorted(self, log_type: str, df: pd.DataFrame):
+        """
+        Appends `df` to the frame of `log_type`, re-sorting the whole frame
+        only if the new rows are older than the current last row.
+        """
+        frame = self.__frames[log_type]
+        last = frame.last('timestamp')
+        frame.append(df)
+        if last is not None and (pd.isna(last) or df['timestamp'].iloc[0] < last):
+            sorted_df = frame.frame.sort_values('timestamp', kind='stable').reset_index(drop=True)
+            self.__frames[log_type] = FrameBuffer(sorted_df)
+
+    def __extend_spray_info(self, df: pd.DataFrame, mission_end) -> pd.DataFrame:
+        """
+        Appends the new spray rows `df` to spray_info_df. The spray rows within
+        the join tolerance of the previous end of mission_info_df are joined
+        again together with the new rows. Returns the new rows.
+        """
+        spray = self.__frames['SPRAY_INFO']
+        if df is None:
+            if len(spray) == 0:
+                return None
+            df = spray.frame.iloc[0:0].drop(columns=LOCATION_COLUMNS, errors='ignore')
+
+        if mission_end is None or pd.isna(mission_end) or len(spray) == 0:
+            cutoff = spray.frame['timestamp'].min() if len(spray) else df['timestamp'].iloc[0]
+        else:
+            cutoff = mission_end - LOCATION_TOLERANCE
+        if not df.empty:
+            cutoff = min(cutoff, df['timestamp'].iloc[0])
+
+        tail = spray.pop_tail('timestamp', cutoff)
+        rows = pd.concat(
+            [tail.drop(columns=LOCATION_COLUMNS, errors='ignore'), df],
+            keys=[False, True],
+            names=['is_new', None]
+        ).reset_index(level=0)
+        rows = rows.sort_values('timestamp', kind='stable').reset_index(drop=True)
+        if rows.empty:
+            spray.append(tail)
+            return df
+
+        mission_tail = self.__get_frame('MISSION_INFO').tail(
+            'timestamp', rows['timestamp'].iloc[0] - LOCATION_TOLERANCE
+        )
+        rows = self.__add_location_info_to_spray_dataframe(rows, mission_tail)
+
+        is_new = rows.pop('is_new').to_numpy(dtype=bool)
+        spray.append(rows)
+        return rows[is_new].reset_index(drop=True)
+
+    @staticmethod
+    def __on_disk(frame) -> bool:
+        """
+        Returns True for a spilled frame that hasn't been materialized.
+        """
+        return isinstance(frame, SpilledFrame) and not frame.loaded
+
+    def __get_time_index(self, log_type: str) -> np.ndarray:
+        """
+        Returns the timestamps of the frame of `log_type`. The frames are
+        sorted by timestamp with missing timestamps last, so the array holds
+        the sorted, valid prefix of the column.
+        """
+        if log_type not in self.__time_indexes:
+            frame = self.__get_frame(log_type)
+            if self.__on_disk(frame) and frame.sorted:
+                # Read only the timestamps of a spilled frame
+                timestamps = frame.column('timestamp')
+            else:
+                timestamps = self.get_logs(log_type)['timestamp'].to_numpy()
+            self.__time_indexes[log_type] = timestamps[:np.count_nonzero(~np.isnat(timestamps))]
+        return self.__time_indexes[log_type]
+
+    def __to_timestamp(self, value):
+        """
+        Converts `value` to a timestamp. Timedeltas are offsets from the start
+        of the log.
+        """
+        if isinstance(value, (pd.Timedelta, timedelta)):
+            return self.start_time + pd.Timedelta(value)
+        return pd.Timestamp(value)
+
+    @staticmethod
+    def __select_types(types) -> tuple:
+        if types is None:
+            return ('MISSION_INFO', 'SPRAY_INFO'), False
+        if isinstance(types, str):
+            return (types,), True
+        return tuple(types), False
+
+    def between(self, start=None, end=None, types=None):
+        """
+        Returns the rows with `start <= timestamp <= end`, found by binary
+        search. The results are slices of the per-type frames, not copies;
+        in out-of-core mode only the rows asked for are read from the
+        spilled frames.
+
+        Parameters:
+            start: Timestamp, or Timedelta from the start of the log. None
+                means from the first row.
+            end: Timestamp, or Timedelta from the start of the log. None
+                means up to the last row with a timestamp.
+            types (str | list | None): A log type, which returns a DataFrame,
+                or a list of them, which returns a dict of DataFrames.
+                Defaults to MISSION_INFO and SPRAY_INFO.
+        """
+        log_types, single = self.__select_types(types)
+        result = {}
+        for log_type in log_types:
+            timestamps = self.__get_time_index(log_type)
+            first = 0 if start is None else np.searchsorted(
+                timestamps, self.__to_timestamp(start).to_datetime64(), side='left'
+            )
+            last = len(timestamps) if end is None else np.searchsorted(
+                timestamps, self.__to_timestamp(end).to_datetime64(), side='right'
+            )
+            frame = self.__get_frame(log_type)
+            if self.__on_disk(frame):
+                result[log_type] = frame.slice(first, max(first, last))
+            else:
+                result[log_type] = self.__materialize(frame).iloc[first:max(first, last)]
+        return result[log_types[0]] if single else result
+
+    def at(self, t, types=None, tolerance=None):
+        """
+        Returns the row nearest to `t`, found by binary search.
+
+        Parameters:
+            t: Timestamp, or Timedelta from the start of the log.
+            types (str | list | None): A log type, which returns a Series, or
+                a list of them, which returns a dict of Series. Defaults to
+                MISSION_INFO and SPRAY_INFO.
+            tolerance: If set, rows further than this Timedelta from `t` are
+                not returned (None is returned instead).
+        """
+        log_types, single = self.__select_types(types)
+        t = self.__to_timestamp(t).to_datetime64()
+        result = {}
+        for log_type in log_types:
+            timestamps = self.__get_time_index(log_type)
+            result[log_type] = None
+            if len(timestamps) == 0:
+                continue
+
+            i = np.searchsorted(timestamps, t)
+            # Pick the closer of the two neighbours
+            if i == len(timestamps) or (i > 0 and t - timestamps[i - 1] <= timestamps[i] - t):
+                i -= 1
+            if tolerance is not None and abs(timestamps[i] - t) > pd.Timedelta(tolerance):
+                continue
+            result[log_type] = self.get_logs(log_type).iloc[i]
+        return result[log_types[0]] if single else result
+
+    def align(self, streams, on: str | None = None, freq=None, start=None, end=None) -> pd.DataFrame:
+        """
+        Puts several log-type streams on one timeline in a single pass, e.g.
+        to correlate spray, battery and GPS samples:
+
+        log.align({'MISSION_INFO': ['latitude', 'longitude'],
+                   'BATTERY_INFO': AlignStream('BATTERY_INFO', ['log_info'], 'backward', '5s')},
+                  on='SPRAY_INFO')
+
+        The frames are already sorted, so every stream is matched by binary
+        search without sorting or joining whole frames. Results are memoized
+        until the next `update()`; don't modify them in place.
+
+        Parameters:
+            streams: Log type -> list of columns (matched to the nearest row
+                within 1 s) or `AlignStream`, or a list of `AlignStream`s.
+            on (str | None): Log type whose timestamps are the timeline. The
+                result rows match the rows of its frame.
+            freq: If `on` is None, a regular timeline with this frequency
+                (e.g. '1s') between `start` and `end`.
+            start, end: Timestamps, or Timedeltas from the start of the log,
+                bounding the regular timeline. Default to the whole log.
+        """
+        if isinstance(streams, dict):
+            streams = [
+                stream if isinstance(stream, AlignStream)
+                else AlignStream(log_type, stream, 'nearest', LOCATION_TOLERANCE)
+                for log_type, stream in streams.items()
+            ]
+        if (on is None) == (freq is None):
+            raise ValueError("Log.align() needs either `on` or `freq`.")
+
+        key = (on, freq, start, end, tuple(stream.key for stream in streams))
+        if key not in self.__alignments:
+            with self.__profiler.span('align') as record:
+                if on is not None:
+                    timeline = self.get_logs(on)['timestamp'].to_numpy()
+                else:
+                    timestamps = self.master_df['timestamp']
+                    first = self.start_time if start is None else self.__to_timestamp(start)
+                    last = timestamps.max() if end is None else self.__to_timestamp(end)
+                    timeline = pd.date_range(first, last, freq=freq).to_numpy()
+                record.rows_in = len(timeline)
+
+                log_types = {stream.log_type for stream in streams}
+                self.__alignments[key] = align(
+                    timeline,
+                    {log_type: self.get_logs(log_type) for log_type in log_types},
+                    streams,
+                    {log_type: to_nanoseconds(self.__get_time_index(log_type)) for log_type in log_types}
+                )
+                record.rows_out = len(timeline)
+        return self.__alignments[key]
+
+    def spatial_index(self, log_type: str = 'MISSION_INFO', cell_size: float | None = None) -> SpatialIndex:
+        """
+        Returns the spatial index over the latitude/longitude of `log_type`
+        (MISSION_INFO, or SPRAY_INFO once its location has been added). The
+        positions returned by its bbox/radius/polygon/nearest queries index
+        the frame with `iloc`, e.g.
+
+        log.mission_info_df.iloc[log.spatial_index().polygon(field)]
+        """
+        key = (log_type, cell_size)
+        if key not in self.__spatial_indexes:
+            df = self.get_logs(log_type)
+            self.__spatial_indexes[key] = SpatialIndex(df['latitude'], df['longitude'], cell_size)
+        return self.__spatial_indexes[key]
+
+    def decimate(self,
+                 column: str,
+                 log_type: str = 'MISSION_INFO',
+                 start=None,
+                 end=None,
+                 points: int = DEFAULT_POINTS,
+                 method: str = 'lttb') -> pd.DataFrame:
+        """
+        Returns about `points` rows of `timestamp` and `column` of `log_type`
+        between `start` and `end`, decimated for plotting. The decimation
+        levels of the series are built on first use, so zooming and panning
+        only decimate the rows of the visible window.
+
+        Parameters:
+            column (str): The numeric column to plot, e.g. 'height'.
+            log_type (str): The log type of the column.
+            start, end: Timestamps, or Timedeltas from the start of the log,
+                of the visible window. None means the whole flight.
+            points (int): Number of points to return.
+            method (str): 'lttb' or 'minmax', see `DecimatedSeries.window`.
+        """
+        df = self.get_logs(log_type)
+        key = (log_type, column)
+        if key not in self.__decimated:
+            self.__decimated[key] = DecimatedSeries(
+                df['timestamp'].to_numpy(),
+                df[column].to_numpy(dtype='float64', na_value=np.nan)
+            )
+
+        start = None if start is None else self.__to_timestamp(start).to_datetime64()
+        end = None if end is None else self.__to_timestamp(end).to_datetime64()
+        positions = self.__decimated[key].window(start, end, points, method)
+        return df[['timestamp', column]].iloc[positions]
+
+    def coverage(self,
+                 swath_width: float = DEFAULT_SWATH_WIDTH,
+                 cell_size: float = DEFAULT_CELL_SIZE,
+                 field=None,
+                 start=None,
+                 end=None) -> CoverageGrid:
+        """
+        Returns the coverage raster of the spray track: the passes covering
+        every cell, the dosage applied to it and, with `stats()`, the
+        overlapped and missed areas of the field. Rasters are memoized by
+        their parameters until the next `update()`.
+
+        Parameters:
+            swath_width (float): Width sprayed across the track, in metres.
+            cell_size (float): Size of the cells, in metres.
+            field: Optional boundary of the field as `(latitude, longitude)`
+                vertices, see `CoverageGrid`.
+            start, end: Timestamps, or Timedeltas from the start of the log,
+                bounding the spray samples. None means the whole flight.
+        """
+        field_key = None if field is None else tuple(map(tuple, np.asarray(field, dtype=np.float64)))
+        key = (swath_width, cell_size, field_key, start, end)
+        if key not in self.__coverage:
+            df = self.spray_info_df
+            if start is not None or end is not None:
+                df = self.between(start, end, types='SPRAY_INFO')
+            with self.__profiler.span('coverage', len(df)) as record:
+                grid = CoverageGrid(
+                    df['latitude'].to_numpy(dtype='float64', na_value=np.nan),
+                    df['longitude'].to_numpy(dtype='float64', na_value=np.nan),
+                    df['timestamp'].to_numpy(),
+                    df['spray_status'].fillna(0).to_numpy(dtype='int64') > 0,
+                    df['actual_dosage'].to_numpy(dtype='float64', na_value=np.nan),
+                    swath_width,
+                    cell_size,
+                    field
+                )
+                record.rows_out = len(grid)
+            self.__coverage[key] = grid
+        return self.__coverage[key]
+
+    @property
+    def segments(self) -> pd.DataFrame:
+        """
+        Returns the flight split into segments of one phase (ground, takeoff,
+        spraying, turn, landing), flight mode and waypoint leg, with their
+        start and end times and per-segment distance, mean speed, area
+        sprayed, payload used and dosage error. The mission rows of a segment
+        are `mission_info_df.iloc[start_row:end_row]`.
+
+        The table is built once and stored in the log cache with the frames;
+        it is rebuilt after `update()`.
+        """
+        if self.__segments is None:
+            with self.__profiler.span('segment') as record:
+                segments = self.__load_from_cache('segments')
+                if segments is None:
+                    mission_info_df = self.mission_info_df
+                    record.rows_in = len(mission_info_df)
+                    segments = segment_flight(mission_info_df, self.spray_info_df)
+                    if len(self.__master):
+                        self.__save_to_cache('segments', segments)
+                record.rows_out = len(segments)
+            self.__segments = segments
+        return self.__segments
+
+    @property
+    def anomalies(self) -> pd.DataFrame:
+        """
+        Returns the anomaly events of the flight (pump and nozzle faults,
+        dosage drift, height and speed excursions), one row per event with
+        its kind, start and end times, peak score and location, see
+        `app.core.log.anomaly`.
+
+        In live mode the detector keeps its state and is fed the rows parsed
+        by `update()`, so new events are appended without a full pass; events
+        still running at the end of the parsed rows are not listed yet.
+        """
+        if self.__anomalies is None:
+            frames = {log_type: self.__get_frame(log_type) for log_type in ('MISSION_INFO', 'SPRAY_INFO')}
+            with self.__profiler.span('anomaly', sum(len(frame) for frame in frames.values())) as record:
+                detector = AnomalyDetector()
+                events = []
+                for log_type, frame in frames.items():
+                    # Spilled frames are fed chunk by chunk without materializing them
+                    chunks = frame.iter_frames() if self.__on_disk(frame) and frame.sorted else [self.__materialize(frame)]
+                    for df in chunks:
+                        if log_type == 'MISSION_INFO':
+                            events.extend(detector.update(mission_df=df).to_dict('records'))
+                        else:
+                            events.extend(detector.update(spray_df=df).to_dict('records'))
+                if self.__live:
+                    self.__anomaly_detector = detector
+                else:
+                    events.extend(detector.update(flush=True).to_dict('records'))
+                self.__anomalies = events_frame(events)
+                record.rows_out = len(self.__anomalies)
+        return self.__anomalies
+
+    @property
+    def profile(self) -> pd.DataFrame:
+        """
+        Returns the timing spans of the stages run so far (read, split,
+        to_datetime, index, build, split_fields, numeric, join, update, align,
+        segment, coverage, anomaly), one row per span with its nesting depth,
+        wall time, rows in and out and the growth of the peak memory.
+        """
+        return self.__profiler.report()
+
+    def profile_stats(self, limit: int = 25) -> str | None:
+        """
+        Returns the cProfile statistics of the stages if the Log was created
+        with `deep_profile=True`, else None.
+        """
+        return self.__profiler.stats(limit)
+
+    @property
+    def start_time(self) -> pd.Timestamp:
+        """
+        Returns the first timestamp of the log.
+        """
+        if self.__start_time is None:
+            self.__start_time = self.master_df['timestamp'].min()
+        return self.__start_time
+
+    def memory_usage(self) -> pd.DataFrame:
+        """
+        Returns the memory used by master_df and the frames built so far, with
+        one row per frame and column. In out-of-core mode, only the frames
+        materialized so far are counted.
+        """
+        frames = {}
+        if not self.__on_disk(self.__master):
+            frames['master'] = self.master_df
+        frames.update({
+            # The frames may be built by another thread meanwhile
+            log_type.lower(): buffer.frame for log_type, buffer in list(self.__frames.items())
+            if not self.__on_disk(buffer)
+        })
+
+        rows = []
+        for name, df in frames.items():
+            usage = df.memory_usage(index=True, deep=True)
+            for column, nbytes in usage.items():
+                rows.append({
+                    'frame': name,
+                    'column': column,
+                    'dtype': str(df[column].dtype) if column in df.columns else '',
+                    'bytes': int(nbytes)
+                })
+        return pd.DataFrame(rows, columns=['frame', 'column', 'dtype', 'bytes'])
+
+    @property
+    def file_path(self):
+        return self.__file_path
+
+    @property
+    def live(self) -> bool:
+        return self.__live
+
+    @property
+    def on_frames_built(self) -> Callable[['Log'], None] | None:
+        """
+        Callback called with the Log whenever a per-type frame is built or,
+        out of core, a spilled frame is materialized, i.e. when
+        `memory_usage` grows.
+        """
+        return self.__on_frames_built
+
+    @on_frames_built.setter
+    def on_frames_built(self, callback: Callable[['Log'], None] | None) -> None:
+        self.__on_frames_built = callback
+
+    def summary(self) -> dict:
+        """
+        Returns the headline figures of the flight: flight time, area
+        sprayed, payload used and the mean dosage error.
+        """
+        mission_info_df = self.mission_info_df
+        spray_info_df = self.spray_info_df
+
+        timestamps = mission_info_df['timestamp'].dropna()
+        start = timestamps.iloc[0] if not timestamps.empty else pd.NaT
+        end = timestamps.iloc[-1] if not timestamps.empty else pd.NaT
+
+        area_sprayed = spray_info_df['area_sprayed'].dropna()
+        payload_rem = spray_info_df['payload_rem'].dropna()
+
+        # Relative dosage error of the samples with a requested dosage
+        requested = spray_info_df['req_dosage'] > 0
+        dosage_error = (
+            (spray_info_df['actual_dosage'][requested] - spray_info_df['req_dosage'][requested])
+            / spray_info_df['req_dosage'][requested]
+        )
+
+        return {
+            'file_path': str(self.__file_path),
+            'start': start,
+            'end': end,
+            'flight_time_s': (end - start).total_seconds() if not timestamps.empty else np.nan,
+            'lines': len(self.__master),
+            'mission_samples': len(mission_info_df),
+            'spray_samples': len(spray_info_df),
+            'area_sprayed': area_sprayed.max() - area_sprayed.min() if not area_sprayed.empty else np.nan,
+            # Refills aren't used payload
+            'payload_used': decrements(spray_info_df['payload_rem']).sum() if not payload_rem.empty else np.nan,
+            'dosage_error_pct': float(dosage_error.mean()) * 100 if not dosage_error.empty else np.nan
+        }
+
+    @property
+    def log_types(self) -> list:
+        """
+        Returns the log types present in the log.
+        """
+        if self.__spill is not None:
+            return sorted(self.__raw_counts)
+        return list(self.__get_type_index())
 
     @property
     def master_df(self):
         """
         Returns the master DataFrame containing all logs.
         """
-        return self.__master_df
+        df = self.__materialize(self.__master)
+        if not isinstance(df['log_type'].dtype, pd.CategoricalDtype):
+            # Appended chunks may carry new log types
+            df['log_type'] = df['log_type'].astype('category')
+        return df
 
     @property
     def mission_info_df(self):
         """
         Returns the processed DataFrame containing MISSION_INFO logs.
         """
-        return self.__mission_info_df
+        return self.get_logs('MISSION_INFO')
 
     @property
     def spray_info_df(self):
         """
         Returns the processed DataFrame containing SPRAY_INFO logs.
         """
-        return self.__spray_info_df
+        return self.get_logs('SPRAY_INFO')
@@ -0,0 +1,201 @@
+# app/core/log/parsers.py
+
+import io
+import pandas as pd
+from app._base.base_class import BaseClass
+from app.utils.logger import Logger
+from app.utils.profiling import span
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None
+
+log = Logger(__name__)
+
+LOG_COLUMNS = ['timestamp', 'module', 'severity', 'log_type', 'log_info']
+
+# Timestamp format written by the flight controller. Values that do not match
+# it are parsed again with format inference, so other formats still load.
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+# Character used as the "column delimiter" when the CSV reader loads whole
+# lines into a single column. It never appears in a valid log line.
+_LINE_DELIMITER = '\x1f'
+
+
+def to_timestamps(values: pd.Series, timestamp_format: str | None = TIMESTAMP_FORMAT) -> pd.Series:
+    """
+    Converts timestamp strings to datetime using an explicit format, falling
+    back to format inference only for the values that do not match it.
+    """
+    if timestamp_format is None:
+        return pd.to_datetime(values, errors='coerce')
+
+    timestamps = pd.to_datetime(values, format=timestamp_format, errors='coerce')
+    unmatched = timestamps.isna() & values.notna() & (values != '')
+    if unmatched.any():
+        timestamps = timestamps.copy()
+        timestamps[unmatched] = pd.to_datetime(values[unmatched], errors='coerce')
+    return timestamps
+
+
+def empty_log_frame() -> pd.DataFrame:
+    """
+    Returns a master DataFrame without rows, with the dtypes of a parsed one.
+    """
+    return pd.DataFrame({
+        column: pd.Series(dtype='datetime64[ns]' if column == 'timestamp' else 'str')
+        for column in LOG_COLUMNS
+    })
+
+
+class BaseLogParser(BaseClass):
+
+    name = None
+
+    def __init__(self, timestamp_format: str | None = TIMESTAMP_FORMAT):
+        """
+        Base class of the log parser backends. A backend splits every line into
+        `timestamp, module, severity, log_type, log_info`, where `log_info` is
+        the unsplit tail of the line.
+        """
+        super().__init__()
+        self.__timestamp_format = timestamp_format
+
+    @property
+    def timestamp_format(self):
+        return self.__timestamp_format
+
+    def parse(self, source) -> pd.DataFrame:
+        """
+        Parses `source` (a file path or a binary file object) into the master
+        DataFrame.
+        """
+        with span('split') as record:
+            df = self._split(source)
+            record.rows_out = len(df)
+        with span('to_datetime', len(df)) as record:
+            df['timestamp'] = to_timestamps(df['timestamp'], self.__timestamp_format)
+            record.rows_out = len(df)
+        return df.reset_index(drop=True)
+
+    def _split(self, source) -> pd.DataFrame:
+        """
+        Returns the five string columns of `source`. Implemented by backends.
+        """
+        raise NotImplementedError
+
+
+class PythonLogParser(BaseLogParser):
+
+    name = 'python'
+
+    def _split(self, source) -> pd.DataFrame:
+        """
+        Pure-Python line loop. Slow, but has no requirements beyond pandas.
+        """
+        if isinstance(source, (str, bytes)) or hasattr(source, '__fspath__'):
+            with open(source, 'r') as file:
+                lines = file.readlines()
+        else:
+            lines = io.TextIOWrapper(source, encoding='utf-8').readlines()
+
+        # Prepare lists to store each column
+        timestamps = []
+        modules = []
+        severities = []
+        log_types = []
+        log_infos = []
+
+        for line in lines:
+            # Skip empty lines
+            if not line.strip():
+                continue
+
+            # Split the line into at most 5 parts
+            parts = line.strip().split(',', 4)
+
+            # Ensure the line has at least 4 commas
+            if len(parts) >= 4:
+                timestamps.append(parts[0].strip())
+                modules.append(parts[1].strip())
+                severities.append(parts[2].strip())
+                log_types.append(parts[3].strip())
+                log_infos.append(parts[4].strip() if len(parts) > 4 else '')
+
+        return pd.DataFrame({
+            'timestamp': timestamps,
+            'module': modules,
+            'severity': severities,
+            'log_type': log_types,
+            'log_info': log_infos
+        })
+
+
+class ArrowLogParser(BaseLogParser):
+
+    name = 'pyarrow'
+
+    def _split(self, source) -> pd.DataFrame:
+        """
+        Reads whole lines with the multi-threaded pyarrow CSV reader and splits
+        them into the five columns with pyarrow compute kernels.
+        """
+        if pa is None:
+            raise ImportError("pyarrow is required by the 'pyarrow' parser backend")
+
+        table = pa_csv.read_csv(
+            source,
+            read_options=pa_csv.ReadOptions(column_names=['line']),
+            parse_options=pa_csv.ParseOptions(
+                delimiter=_LINE_DELIMITER,
+                quote_char=False,
+                double_quote=False,
+                escape_char=False,
+                ignore_empty_lines=True
+            ),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={'line': pa.string()},
+                strings_can_be_null=False,
+                quoted_strings_can_be_null=False
+            )
+        )
+        lines = table.column('line')
+
+        # Pad lines with exactly four parts so that every kept line has a tail
+        n_parts = pc.list_value_length(pc.split_pattern(lines, ',', max_splits=4))
+        lines = pc.filter(lines, pc.greater_equal(n_parts, 4))
+        n_parts = pc.filter(n_parts, pc.greater_equal(n_parts, 4))
+        lines = pc.if_else(
+            pc.equal(n_parts, 4),
+            pc.binary_join_element_wise(lines, '', ','),
+            lines
+        )
+        parts = pc.split_pattern(lines, ',', max_splits=4)
+
+        df = pd.DataFrame({
+            column: pc.utf8_trim_whitespace(pc.list_element(parts, i)).to_pandas()
+            for i, column in enumerate(LOG_COLUMNS)
+        })
+        return df.reset_index(drop=True)
+
+
+PARSERS = {
+    parser.name: parser for parser in (PythonLogParser, ArrowLogParser)
+}
+
+
+def get_parser(name: str = 'auto', timestamp_format: str | None = TIMESTAMP_FORMAT) -> BaseLogParser:
+    """
+    Returns the parser backend called `name`. `'auto'` picks pyarrow when it is
+    installed and the Python parser otherwise.
+    """
+    if name == 'auto':
+        name = ArrowLogParser.name if pa is not None else PythonLogParser.name
+    try:
+        return PARSERS[name](timestamp_format=timestamp_format)
+    except KeyError:
+        raise ValueError(f"Unknown log parser '{name}'. Available: {', '.join(PARSERS)}")
@@ -0,0 +1,401 @@
+# app/core/log/registry.py
+
+import os
+import time
+import asyncio
+import weakref
+import threading
+import collections
+from typing import Callable
+import pandas as pd
+from app._base.base_class import BaseClass
+from app.utils.logger import Logger
+from app.utils.database.log_cache import file_fingerprint
+from .log import Log
+from .loader import LogLoader
+from .parsers import TIMESTAMP_FORMAT
+
+log = Logger(__name__)
+
+# Memory the shared flights may use before unused ones are evicted
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+
+class LogView(BaseClass):
+
+    def __init__(self, log_obj: Log, registry: 'LogRegistry', key: str):
+        """
+        Read-only handle on a Log shared by the `LogRegistry`. Frames are
+        handed out as shallow copies: with copy-on-write they share the data
+        of the shared frames, and modifying them copies only what is changed,
+        so one session can't alter the flight seen by the others.
+
+        Release the view when the session is done with it (or use it as a
+        context manager), so that the flight can be evicted.
+        """
+        super().__init__()
+        self.__log = log_obj
+        self.__registry = registry
+        self.__key = key
+        self.__released = False
+
+    @staticmethod
+    def __copy(frames):
+        # `Log.at` gives None for types without a row close enough
+        if isinstance(frames, dict):
+            return {name: None if df is None else df.copy(deep=False) for name, df in frames.items()}
+        return None if frames is None else frames.copy(deep=False)
+
+    @property
+    def key(self) -> str:
+        return self.__key
+
+    @property
+    def released(self) -> bool:
+        return self.__released
+
+    @property
+    def file_path(self):
+        return self.__log.file_path
+
+    @property
+    def log_types(self) -> list:
+        return self.__log.log_types
+
+    @property
+    def start_time(self) -> pd.Timestamp:
+        return self.__log.start_time
+
+    def get_logs(self, log_type: str) -> pd.DataFrame:
+        return self.__log.get_logs(log_type).copy(deep=False)
+
+    @property
+    def master_df(self) -> pd.DataFrame:
+        return self.__log.master_df.copy(deep=False)
+
+    @property
+    def mission_info_df(self) -> pd.DataFrame:
+        return self.get_logs('MISSION_INFO')
+
+    @property
+    def spray_info_df(self) -> pd.DataFrame:
+        return self.get_logs('SPRAY_INFO')
+
+    @property
+    def segments(self) -> pd.DataFrame:
+        return self.__log.segments.copy(deep=False)
+
+    def between(self, start=None, end=None, types=None):
+        return self.__copy(self.__log.between(start, end, types))
+
+    def at(self, t, types=None, tolerance=None):
+        return self.__copy(self.__log.at(t, types, tolerance))
+
+    def align(self, streams, on: str | None = None, freq=None, start=None, end=None) -> pd.DataFrame:
+        return self.__log.align(streams, on, freq, start, end).copy(deep=False)
+
+    def decimate(self, column: str, log_type: str = 'MISSION_INFO', **kwargs) -> pd.DataFrame:
+        return self.__log.decimate(column, log_type, **kwargs)
+
+    def spatial_index(self, log_type: str = 'MISSION_INFO', cell_size: float | None = None):
+        return self.__log.spatial_index(log_type, cell_size)
+
+    @property
+    def anomalies(self) -> pd.DataFrame:
+        return self.__log.anomalies.copy(deep=False)
+
+    def coverage(self, **kwargs):
+        return self.__log.coverage(**kwargs)
+
+    def summary(self) -> dict:
+        return self.__log.summary()
+
+    def memory_usage(self) -> pd.DataFrame:
+        return self.__log.memory_usage()
+
+    def release(self) -> None:
+        """
+        Gives the flight back to the registry. The view can't be used
+        afterwards.
+        """
+        if not self.__released:
+            self.__released = True
+            self.__registry.release(self)
+            self.__log = None
+
+    def __enter__(self) -> 'LogView':
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.release()
+
+
+class _RegistryEntry(BaseClass):
+
+    def __init__(self, log_obj: Log):
+        """
+        A flight held by the registry, with its memory use and the views
+        handed out on it.
+        """
+        super().__init__()
+        self.log = log_obj
+        self.bytes = 0
+        self.views = weakref.WeakSet()
+        self.last_used = time.monotonic()
+
+    def measure(self) -> int:
+        self.bytes = int(self.log.memory_usage()['bytes'].sum())
+        return self.bytes
+
+
+class LogRegistry(BaseClass):
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Process-wide registry of the loaded flights, so that sessions opening
+        the same file share one Log instead of parsing it again. Flights are
+        keyed by the file fingerprint (path, size, modification time) and the
+        options changing the frames; concurrent loads of the same file are
+        coalesced into one.
+
+        When the frames of the held flights use more than `max_bytes`, the
+        least recently used flights without open views are evicted.
+
+        Parameters:
+            max_bytes (int): Memory budget of the held DataFrames.
+        """
+        super().__init__()
+        self.__max_bytes = max_bytes
+        # Least recently used first
+        self.__entries = collections.OrderedDict()
+        self.__lock = threading.RLock()
+        # Loads in flight: key -> task (async) or lock (threads)
+        self.__tasks = {}
+        self.__progress = {}
+        self.__key_locks = {}
+
+    @staticmethod
+    def key(file_path, timestamp_format: str | None = TIMESTAMP_FORMAT, compact: bool = False, **_) -> str:
+        """
+        Returns the registry key of `file_path` loaded with these options.
+        """
+        return file_fingerprint(file_path, timestamp_format, compact)
+
+    @property
+    def max_bytes(self) -> int:
+        return self.__max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes: int) -> None:
+        self.__max_bytes = max_bytes
+        self.__evict()
+
+    @property
+    def memory_bytes(self) -> int:
+        """
+        Returns the memory used by the frames of the held flights, as last
+        measured.
+        """
+        with self.__lock:
+            return sum(entry.bytes for entry in self.__entries.values())
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__entries
+
+    @staticmethod
+    def __check_options(log_kwargs: dict) -> None:
+        if log_kwargs.get('live'):
+            raise ValueError("Live logs change while they are read and can't be shared.")
+
+    async def load(self, file_path, on_progress: Callable[[dict], None] | None = None, **log_kwargs) -> LogView:
+        """
+        Returns a view on the flight of `file_path`, loading it in the
+        background pool (see `LogLoader`) unless it is held already. Callers
+        asking for a file that is being loaded wait for the same load and
+        all get its progress.
+
+        Parameters:
+            file_path (str): Path of the log file.
+            on_progress: Progress callback, see `LogLoader`.
+            **log_kwargs: Passed to `Log`.
+        """
+        self.__check_options(log_kwargs)
+        key = self.key(file_path, **log_kwargs)
+        view = self.__open(key)
+        if view is not None:
+            return view
+
+        task = self.__tasks.get(key)
+        if task is None:
+            self.__progress[key] = []
+            task = asyncio.ensure_future(self.__load(key, file_path, log_kwargs))
+            self.__tasks[key] = task
+        else:
+            log.d("Joining the load of %s in flight.", file_path)
+        if on_progress is not None:
+            self.__progress[key].append(on_progress)
+
+        # A cancelled caller doesn't cancel the load shared with the others
+        log_obj = await asyncio.shield(task)
+        return self.__open(key, log_obj)
+
+    async def __load(self, key: str, file_path, log_kwargs: dict) -> Log:
+        def report(progress):
+            for callback in list(self.__progress.get(key, ())):
+                try:
+                    callback(progress)
+                except Exception as e:
+                    log.e(f"Error in a progress callback of {file_path}", e)
+        try:
+            return await LogLoader(file_path, on_progress=report, **log_kwargs).load()
+        finally:
+            self.__tasks.pop(key, None)
+            self.__progress.pop(key, None)
+
+    def get(self, file_path, **log_kwargs) -> LogView:
+        """
+        Returns a view on the flight of `file_path`, loading it in the calling
+        thread unless it is held already. Threads asking for the same file
+        wait for one load.
+        """
+        self.__check_options(log_kwargs)
+        key = self.key(file_path, **log_kwargs)
+        view = self.__open(key)
+        if view is not None:
+            return view
+
+        with self.__lock:
+            key_lock = self.__key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            view = self.__open(key)
+            if view is None:
+                log_obj = Log(file_path, **log_kwargs)
+                log_obj.preload()
+                view = self.__open(key, log_obj)
+        with self.__lock:
+            self.__key_locks.pop(key, None)
+        return view
+
+    def find(self, file_path, **log_kwargs) -> LogView | None:
+        """
+        Returns a view on the flight of `file_path` if it is held, without
+        loading it, else None. Without options, the most recently used
+        flight of the file is returned, whatever options it was loaded with.
+        """
+        if log_kwargs:
+            try:
+                key = self.key(file_path, **log_kwargs)
+            except OSError:
+                return None
+        else:
+            path = os.path.abspath(file_path)
+            with self.__lock:
+                key = next((
+                    key for key, entry in reversed(self.__entries.items())
+                    if os.path.abspath(entry.log.file_path) == path
+                ), None)
+            if key is None:
+                return None
+        return self.__open(key)
+
+    def __open(self, key: str, log_obj: Log | None = None) -> LogView | None:
+        """
+        Returns a new view on the flight of `key`, adding `log_obj` if the
+        flight isn't held, or None if neither is available.
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                if log_obj is None:
+                    return None
+                entry = self.__entries[key] = _RegistryEntry(log_obj)
+                entry.measure()
+                # Measured again only when the views build more frames
+                log_obj.on_frames_built = lambda _: self.__frames_built(key, entry)
+                log.i(f"Registered {log_obj.file_path}.")
+            self.__entries.move_to_end(key)
+            entry.last_used = time.monotonic()
+            view = LogView(entry.log, self, key)
+            entry.views.add(view)
+        self.__evict()
+        return view
+
+    def __frames_built(self, key: str, entry: _RegistryEntry) -> None:
+        with self.__lock:
+            if self.__entries.get(key) is not entry:
+                return
+            entry.measure()
+        self.__evict()
+
+    def release(self, view: LogView) -> None:
+        """
+        Releases `view`, making its flight evictable once no view is left.
+        """
+        with self.__lock:
+            entry = self.__entries.get(view.key)
+            if entry is not None:
+                entry.views.discard(view)
+        self.__evict()
+
+    def __evict(self) -> None:
+        """
+        Evicts the least recently used flights without views until the held
+        frames fit in the memory budget.
+        """
+        with self.__lock:
+            total = sum(entry.bytes for entry in self.__entries.values())
+            for key, entry in list(self.__entries.items()):
+                if total <= self.__max_bytes:
+                    return
+                if len(entry.views):
+                    continue
+                del self.__entries[key]
+                entry.log.on_frames_built = None
+                total -= entry.bytes
+                log.i(f"Evicted {entry.log.file_path} ({entry.bytes / 1024 ** 2:.1f} MiB).")
+            if total > self.__max_bytes:
+                log.w(f"Shared flights use {total / 1024 ** 2:.1f} MiB, over the budget of "
+                      f"{self.__max_bytes / 1024 ** 2:.1f} MiB, but all of them are in use.")
+
+    def clear(self) -> None:
+        """
+        Drops the flights without open views.
+        """
+        with self.__lock:
+            for key, entry in list(self.__entries.items()):
+                if not len(entry.views):
+                    del self.__entries[key]
+                    entry.log.on_frames_built = None
+
+    def stats(self) -> pd.DataFrame:
+        """
+        Returns one row per held flight, least recently used first, with its
+        memory use and number of open views.
+        """
+        with self.__lock:
+            now = time.monotonic()
+            rows = [{
+                'file_path': str(entry.log.file_path),
+                'bytes': entry.bytes,
+                'views': len(entry.views),
+                'idle_s': now - entry.last_used
+            } for entry in self.__entries.values()]
+        return pd.DataFrame(rows, columns=['file_path', 'bytes', 'views', 'idle_s'])
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_log_registry() -> LogRegistry:
+    """
+    Returns the registry shared by all sessions of the process.
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = LogRegistry()
+        return _registry
@@ -0,0 +1,249 @@
+# app/core/log/schema.py
+
+import io
+import csv
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_integer_dtype, is_numeric_dtype, pandas_dtype
+from app._base.base_class import BaseClass
+from app.utils.logger import Logger
+from app.utils.profiling import span
+
+log = Logger(__name__)
+
+
+class LogTypeSchema(BaseClass):
+
+    def __init__(self,
+                 log_type: str,
+                 fields: list,
+                 sentinels: dict | None = None,
+                 drop_first_row: bool = True,
+                 compact_dtypes: dict | None = None):
+        """
+        Describes the comma separated `log_info` payload of a log type.
+
+        Parameters:
+            log_type (str): The log type the schema applies to.
+            fields (list): `(name, dtype)` pairs in payload order. `str`
+                fields are stripped, all others are parsed as numbers. Like
+                `pd.to_numeric`, 'int64' fields holding missing values are
+                kept as float64.
+            sentinels (dict | None): Field name -> value marking an invalid
+                sample. Rows holding a sentinel value are dropped.
+            drop_first_row (bool): If True, the first row of the log type is
+                dropped before decoding.
+            compact_dtypes (dict | None): Field name -> smaller dtype used
+                when decoding in compact mode, e.g. 'category' or 'float32'.
+        """
+        super().__init__()
+        self.__log_type = log_type
+        self.__fields = list(fields)
+        self.__sentinels = dict(sentinels or {})
+        self.__drop_first_row = drop_first_row
+        self.__compact_dtypes = dict(compact_dtypes or {})
+
+    @property
+    def log_type(self) -> str:
+        return self.__log_type
+
+    @property
+    def fields(self) -> list:
+        return self.__fields
+
+    @property
+    def field_names(self) -> list:
+        return [name for name, _ in self.__fields]
+
+    @property
+    def sentinels(self) -> dict:
+        return self.__sentinels
+
+    @property
+    def drop_first_row(self) -> bool:
+        return self.__drop_first_row
+
+    @property
+    def compact_dtypes(self) -> dict:
+        return self.__compact_dtypes
+
+    def decode(self, df: pd.DataFrame, compact: bool = False) -> pd.DataFrame:
+        """
+        Splits `log_info` of `df` into the typed schema fields, drops the rows
+        holding sentinel values and sorts the result by timestamp.
+
+        The payloads are decoded in one pass by the pandas C reader, so
+        numeric fields are parsed straight into numeric columns. If `compact`
+        is True, the fields listed in `compact_dtypes` use those dtypes.
+        """
+        if df.empty:
+            log.w(f"No {self.__log_type} logs to process.")
+            return self.__empty_frame(df, compact)
+
+        string_fields = [name for name, dtype in self.__fields if dtype is str]
+        numeric_fields = [name for name, dtype in self.__fields if dtype is not str]
+
+        with span('split_fields', len(df)) as record:
+            payload = "\n".join(df['log_info'].tolist()) + "\n"
+            fields = pd.read_csv(
+                io.StringIO(payload),
+                names=self.field_names,
+                usecols=range(len(self.__fields)),
+                header=None,
+                engine='c',
+                quoting=csv.QUOTE_NONE,
+                skipinitialspace=True,
+                skip_blank_lines=False,
+                keep_default_na=False,
+                na_values={name: [''] for name in numeric_fields},
+                dtype={name: str for name in string_fields}
+            )
+            if len(fields) != len(df):
+                raise ValueError(
+                    f"Decoded {len(fields)} {self.__log_type} rows from {len(df)} lines."
+                )
+            record.rows_out = len(fields)
+
+        with span('numeric', len(fields)) as record:
+            for name, dtype in self.__fields:
+                if dtype is str:
+                    fields[name] = fields[name].str.strip()
+                    continue
+                # Columns with malformed values are left as strings by the reader
+                if not is_numeric_dtype(fields[name]):
+                    fields[name] = pd.to_numeric(fields[name], errors='coerce')
+                fields[name] = self.__cast(name, fields[name], dtype)
+            record.rows_out = len(fields)
+
+        # Drop rows holding sentinel values
+        if self.__sentinels:
+            valid = pd.Series(True, index=fields.index)
+            for name, value in self.__sentinels.items():
+                valid &= fields[name] != value
+            df = df[valid.to_numpy()]
+            fields = fields[valid]
+
+        if compact:
+            for name, dtype in self.__compact_dtypes.items():
+                fields[name] = self.__cast(name, fields[name], dtype)
+
+        df = pd.concat(
+            [df.drop(columns=['log_info']).reset_index(drop=True), fields.reset_index(drop=True)],
+            axis=1
+        )
+        return df.sort_values('timestamp', kind='stable').reset_index(drop=True)
+
+    def __empty_frame(self, df: pd.DataFrame, compact: bool) -> pd.DataFrame:
+        """
+        Returns an empty frame with the decoded columns of the schema.
+        """
+        df = df.drop(columns=['log_info'], errors='ignore').reset_index(drop=True)
+        for name, dtype in self.__fields:
+            if compact:
+                dtype = self.__compact_dtypes.get(name, dtype)
+            df[name] = pd.Series(dtype=dtype)
+        return df
+
+    def __cast(self, name: str, values: pd.Series, dtype) -> pd.Series:
+        """
+        Casts `values` to `dtype`. Values that don't fit a numeric dtype are
+        kept as they are, or as float64 if they aren't numeric yet.
+        """
+        try:
+            target = pandas_dtype(dtype)
+            if isinstance(target, np.dtype) and is_integer_dtype(target) and values.hasnans:
+                # NumPy integers can't hold NaN
+                return values if is_numeric_dtype(values) else values.astype('float64')
+            if is_integer_dtype(target) and values.notna().any():
+                # Integer casts wrap around silently, check the range first
+                limits = np.iinfo(target.numpy_dtype if hasattr(target, 'numpy_dtype') else target)
+                if values.min() < limits.min or values.max() > limits.max:
+                    raise OverflowError(f"values out of the {dtype} range")
+            return values.astype(target)
+        except (TypeError, ValueError, OverflowError):
+            if is_numeric_dtype(values):
+                log.w(f"{self.__log_type}.{name} can't be stored as {dtype}, keeping {values.dtype}.")
+                return values
+            log.w(f"{self.__log_type}.{name} can't be stored as {dtype}, keeping float64.")
+            return values.astype('float64')
+
+
+SCHEMAS = {}
+
+
+def register_schema(schema: LogTypeSchema) -> LogTypeSchema:
+    """
+    Registers `schema` so that `Log` decodes its log type.
+    """
+    SCHEMAS[schema.log_type] = schema
+    return schema
+
+
+def get_schema(log_type: str) -> LogTypeSchema | None:
+    """
+    Returns the schema registered for `log_type`, or None.
+    """
+    return SCHEMAS.get(log_type)
+
+
+MISSION_INFO_SCHEMA = register_schema(LogTypeSchema(
+    'MISSION_INFO',
+    fields=[
+        ('flight_mode', str),
+        ('arm_status', str),
+        ('flight_status', str),
+        ('height', 'float64'),
+        ('speed', 'float64'),
+        ('climb_rate', 'float64'),
+        ('heading', 'float64'),
+        ('latitude', 'float64'),
+        ('longitude', 'float64')
+    ],
+    sentinels={
+        'height': -100.0,
+        'speed': -100.0,
+        'climb_rate': -100.0,
+        'heading': -100.0,
+        'latitude': -200.0,
+        'longitude': -200.0
+    },
+    compact_dtypes={
+        'flight_mode': 'category',
+        'arm_status': 'category',
+        'flight_status': 'category',
+        'height': 'float32',
+        'speed': 'float32',
+        'climb_rate': 'float32',
+        'heading': 'float32'
+    }
+))
+
+SPRAY_INFO_SCHEMA = register_schema(LogTypeSchema(
+    'SPRAY_INFO',
+    fields=[
+        ('spray_status', 'int64'),
+        ('pump_pwm', 'int64'),
+        ('nozzle_pwm', 'int64'),
+        ('req_flowrate', 'float64'),
+        ('actual_flowrate', 'float64'),
+        ('flowmeter_pulse', 'int64'),
+        ('payload_rem', 'float64'),
+        ('area_sprayed', 'float64'),
+        ('req_dosage', 'float64'),
+        ('actual_dosage', 'float64'),
+        ('prv_wp', 'int64'),
+        ('next_wp', 'int64')
+    ],
+    compact_dtypes={
+        'spray_status': 'Int8',
+        'pump_pwm': 'Int16',
+        'nozzle_pwm': 'Int16',
+        'req_flowrate': 'float32',
+        'actual_flowrate': 'float32',
+        'flowmeter_pulse': 'Int32',
+        'req_dosage': 'float32',
+        'actual_dosage': 'float32',
+        'prv_wp': 'Int16',
+        'next_wp': 'Int16'
+    }
+))
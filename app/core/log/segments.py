@@ -0,0 +1,175 @@
+# app/core/log/segments.py
+
+import numpy as np
+import pandas as pd
+from app.utils.logger import Logger
+from .alignment import AlignStream, align
+from .spatial import project
+
+log = Logger(__name__)
+
+# Phases of a flight, in the order of their codes
+PHASES = ['ground', 'takeoff', 'spraying', 'turn', 'landing']
+
+TAKEOFF_MODES = ['TAKEOFF']
+LANDING_MODES = ['LAND', 'RTL']
+
+# Spray samples further than this from a mission sample don't set its state
+SPRAY_STATE_TOLERANCE = pd.Timedelta('2s')
+
+SEGMENT_COLUMNS = [
+    'phase', 'flight_mode', 'prv_wp', 'next_wp', 'start', 'end', 'duration_s',
+    'start_row', 'end_row', 'samples', 'spray_samples', 'distance_m', 'mean_speed',
+    'area_sprayed', 'payload_used', 'dosage_error_pct'
+]
+
+
+def run_starts(*keys) -> np.ndarray:
+    """
+    Returns the positions where any of the equally long `keys` arrays
+    changes value, i.e. the starts of the runs of their run-length encoding.
+    The first position always starts a run.
+    """
+    n = len(keys[0])
+    if n == 0:
+        return np.empty(0, dtype=np.intp)
+    changed = np.zeros(n - 1, dtype=bool)
+    for key in keys:
+        changed |= key[1:] != key[:-1]
+    return np.concatenate(([0], np.flatnonzero(changed) + 1))
+
+
+def classify_phases(mission_df: pd.DataFrame, spray_status: np.ndarray) -> np.ndarray:
+    """
+    Returns the code of the phase (see PHASES) of every mission sample, from
+    its flight mode, arm and flight status and the spray status at its time.
+    """
+    in_air = (mission_df['arm_status'].isin(['ARMED']).to_numpy()
+              & mission_df['flight_status'].isin(['IN_AIR']).to_numpy())
+    phases = np.full(len(mission_df), PHASES.index('turn'), dtype=np.int8)
+    phases[spray_status > 0] = PHASES.index('spraying')
+    phases[mission_df['flight_mode'].isin(TAKEOFF_MODES).to_numpy()] = PHASES.index('takeoff')
+    phases[mission_df['flight_mode'].isin(LANDING_MODES).to_numpy()] = PHASES.index('landing')
+    phases[~in_air] = PHASES.index('ground')
+    return phases
+
+
+def to_float(values: pd.Series) -> np.ndarray:
+    return values.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def decrements(values: pd.Series) -> np.ndarray:
+    """
+    Returns how much `values` drops from each sample to the next, one value
+    fewer than `values`. Rises, e.g. payload refills, and steps from or to
+    a missing value count as 0.
+    """
+    return np.maximum(np.nan_to_num(-np.diff(to_float(values))), 0.0)
+
+
+def segment_flight(mission_df: pd.DataFrame, spray_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Splits the flight into segments of a single phase, flight mode and
+    waypoint leg, e.g. one segment per sprayed row and per turn between
+    rows. The mission samples are classified at once and the segments are
+    the runs of their state; the aggregates are reduced per segment with
+    `reduceat`/`bincount`, without looping over the rows.
+
+    Every segment covers the mission rows `start_row:end_row` and the spray
+    samples up to the next segment. Distance, area and payload are the
+    changes from the previous sample, so the segment totals add up to the
+    flight totals; payload refills are not counted as used.
+
+    Parameters:
+        mission_df (DataFrame): The processed MISSION_INFO frame.
+        spray_df (DataFrame): The processed SPRAY_INFO frame.
+
+    Returns one row per segment with the columns of SEGMENT_COLUMNS.
+    """
+    timestamps = mission_df['timestamp'].to_numpy()
+    n = np.count_nonzero(~np.isnat(timestamps))
+    if n == 0:
+        return pd.DataFrame(columns=SEGMENT_COLUMNS)
+    mission_df = mission_df.iloc[:n]
+    timestamps = timestamps[:n]
+
+    # Spray state of every mission sample, from the last spray sample before it
+    state = align(
+        timestamps,
+        {'SPRAY_INFO': spray_df},
+        [AlignStream('SPRAY_INFO', ['spray_status', 'prv_wp', 'next_wp'], 'backward',
+                     SPRAY_STATE_TOLERANCE, prefix='')]
+    )
+    spray_status = np.nan_to_num(to_float(state['spray_status']), nan=0.0)
+    prv_wp = np.nan_to_num(to_float(state['prv_wp']), nan=-1.0)
+    next_wp = np.nan_to_num(to_float(state['next_wp']), nan=-1.0)
+    phases = classify_phases(mission_df, spray_status)
+    modes = pd.factorize(mission_df['flight_mode'].astype(object), use_na_sentinel=True)[0]
+
+    # Waypoints only tell legs apart in the air
+    flying = np.isin(phases, [PHASES.index('spraying'), PHASES.index('turn')])
+    prv_wp = np.where(flying, prv_wp, -1.0)
+    next_wp = np.where(flying, next_wp, -1.0)
+
+    starts = run_starts(phases, modes, prv_wp, next_wp)
+    ends = np.append(starts[1:], n)
+    n_segments = len(starts)
+    # Segment of every mission row
+    segment_ids = np.repeat(np.arange(n_segments), ends - starts)
+
+    # Distance flown since the previous sample
+    latitude, longitude = to_float(mission_df['latitude']), to_float(mission_df['longitude'])
+    x, y = project(latitude, longitude, np.nanmean(latitude), np.nanmean(longitude))
+    steps = np.nan_to_num(np.hypot(np.diff(x), np.diff(y)))
+    distance = np.bincount(segment_ids[1:], weights=steps, minlength=n_segments)
+
+    speed = to_float(mission_df['speed'])
+    has_speed = ~np.isnan(speed)
+    speed_sum = np.add.reduceat(np.where(has_speed, speed, 0.0), starts)
+    speed_count = np.add.reduceat(has_speed.astype(np.int64), starts)
+
+    # Spray samples belong to the last segment starting at or before them
+    spray_times = spray_df['timestamp'].to_numpy()
+    spray_times = spray_times[:np.count_nonzero(~np.isnat(spray_times))]
+    spray_segments = np.searchsorted(timestamps[starts], spray_times, side='right') - 1
+    within = (spray_segments >= 0) & (spray_times <= timestamps[-1] + SPRAY_STATE_TOLERANCE)
+    spray = spray_df.iloc[:len(spray_times)][within]
+    spray_segments = spray_segments[within]
+    spray_samples = np.bincount(spray_segments, minlength=n_segments)
+
+    area_steps = np.nan_to_num(np.diff(to_float(spray['area_sprayed'])))
+    area = np.bincount(spray_segments[1:], weights=np.maximum(area_steps, 0.0), minlength=n_segments)
+    payload = np.bincount(spray_segments[1:], weights=decrements(spray['payload_rem']), minlength=n_segments)
+
+    req_dosage = to_float(spray['req_dosage'])
+    requested = req_dosage > 0
+    dosage_error = (to_float(spray['actual_dosage'])[requested] - req_dosage[requested]) / req_dosage[requested]
+    has_error = ~np.isnan(dosage_error)
+    error_sum = np.bincount(spray_segments[requested][has_error], weights=dosage_error[has_error],
+                            minlength=n_segments)
+    error_count = np.bincount(spray_segments[requested][has_error], minlength=n_segments)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_speed = speed_sum / speed_count
+        dosage_error_pct = error_sum / error_count * 100
+
+    segments = pd.DataFrame({
+        'phase': pd.Categorical.from_codes(phases[starts], categories=PHASES),
+        'flight_mode': mission_df['flight_mode'].iloc[starts].astype(object).to_numpy(),
+        'prv_wp': pd.array(np.where(prv_wp[starts] >= 0, prv_wp[starts], np.nan), dtype='Int64'),
+        'next_wp': pd.array(np.where(next_wp[starts] >= 0, next_wp[starts], np.nan), dtype='Int64'),
+        'start': timestamps[starts],
+        'end': timestamps[ends - 1],
+        'duration_s': (timestamps[ends - 1] - timestamps[starts]) / np.timedelta64(1, 's'),
+        'start_row': starts,
+        'end_row': ends,
+        'samples': ends - starts,
+        'spray_samples': spray_samples,
+        'distance_m': distance,
+        'mean_speed': mean_speed,
+        'area_sprayed': area,
+        'payload_used': payload,
+        'dosage_error_pct': dosage_error_pct
+    })
+    log.d("Segmented %d mission samples into %d segments.", n, n_segments)
+    return segments
@@ -0,0 +1,238 @@
+# app/core/log/spatial.py
+
+import numpy as np
+from app._base.base_class import BaseClass
+from app.utils.logger import Logger
+
+log = Logger(__name__)
+
+EARTH_RADIUS_M = 6371008.8
+
+# Average number of points per grid cell when the cell size is chosen automatically
+POINTS_PER_CELL = 16
+
+
+def project(latitude, longitude, origin_latitude: float, origin_longitude: float):
+    """
+    Projects latitude/longitude (degrees) to x/y metres east/north of the
+    origin with a local equirectangular projection, accurate over the extent
+    of a field or a flight.
+    """
+    latitude = np.asarray(latitude, dtype=np.float64)
+    longitude = np.asarray(longitude, dtype=np.float64)
+    x = np.radians(longitude - origin_longitude) * EARTH_RADIUS_M * np.cos(np.radians(origin_latitude))
+    y = np.radians(latitude - origin_latitude) * EARTH_RADIUS_M
+    return x, y
+
+
+def points_in_polygon(x, y, polygon_x, polygon_y) -> np.ndarray:
+    """
+    Returns a mask of the points (x, y) inside the polygon, by ray casting.
+    Vectorized over the points, looping over the polygon edges.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    inside = np.zeros(x.shape, dtype=bool)
+    n_vertices = len(polygon_x)
+    for i in range(n_vertices):
+        x1, y1 = polygon_x[i], polygon_y[i]
+        x2, y2 = polygon_x[(i + 1) % n_vertices], polygon_y[(i + 1) % n_vertices]
+        if y1 == y2:
+            continue
+        crosses = (y1 > y) != (y2 > y)
+        x_cross = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= crosses & (x < x_cross)
+    return inside
+
+
+class SpatialIndex(BaseClass):
+
+    def __init__(self, latitude, longitude, cell_size: float | None = None):
+        """
+        Grid index over latitude/longitude samples. The points are projected
+        to metres and bucketed into square cells; the row positions are kept
+        sorted by cell so that the points of a run of cells are one slice.
+
+        All queries return row positions (for `df.iloc`) in ascending order.
+
+        Parameters:
+            latitude, longitude: Coordinates of the samples, in degrees.
+            cell_size (float | None): Cell size in metres. By default it is
+                chosen to hold about `POINTS_PER_CELL` points per cell.
+        """
+        super().__init__()
+        latitude = np.asarray(latitude, dtype=np.float64)
+        longitude = np.asarray(longitude, dtype=np.float64)
+        valid = np.flatnonzero(np.isfinite(latitude) & np.isfinite(longitude))
+
+        self.__size = len(valid)
+        if self.__size == 0:
+            self.__origin = (0.0, 0.0)
+            self.__x = self.__y = np.empty(0)
+            self.__positions = np.empty(0, dtype=np.intp)
+            self.__cells = np.empty(0, dtype=np.int64)
+            self.__x0 = self.__y0 = 0.0
+            self.__cell_size = cell_size or 1.0
+            self.__n_columns = self.__n_rows = 1
+            return
+
+        self.__origin = (float(np.mean(latitude[valid])), float(np.mean(longitude[valid])))
+        x, y = project(latitude[valid], longitude[valid], *self.__origin)
+
+        self.__x0, self.__y0 = x.min(), y.min()
+        width, height = x.max() - self.__x0, y.max() - self.__y0
+        if cell_size is None:
+            cell_size = np.sqrt(max(width * height, 1.0) * POINTS_PER_CELL / self.__size)
+        self.__cell_size = max(float(cell_size), 1e-3)
+        self.__n_columns = int(width // self.__cell_size) + 1
+        self.__n_rows = int(height // self.__cell_size) + 1
+
+        cells = self.__cell_of(x, y)
+        order = np.argsort(cells, kind='stable')
+        self.__positions = valid[order]
+        self.__cells = cells[order]
+        self.__x = x[order]
+        self.__y = y[order]
+        log.d("Built spatial index of %d points in a %dx%d grid of %.1f m cells.",
+              self.__size, self.__n_columns, self.__n_rows, self.__cell_size)
+
+    def __len__(self) -> int:
+        return self.__size
+
+    @property
+    def cell_size(self) -> float:
+        return self.__cell_size
+
+    @property
+    def origin(self) -> tuple:
+        return self.__origin
+
+    def project(self, latitude, longitude):
+        """
+        Projects coordinates to the metric frame of the index.
+        """
+        return project(latitude, longitude, *self.__origin)
+
+    def __cell_of(self, x, y):
+        column = np.floor((x - self.__x0) / self.__cell_size).astype(np.int64)
+        row = np.floor((y - self.__y0) / self.__cell_size).astype(np.int64)
+        return row * self.__n_columns + column
+
+    def __candidates(self, min_x, min_y, max_x, max_y) -> np.ndarray:
+        """
+        Returns the indices (into the sorted arrays) of the points in the
+        cells overlapping the rectangle.
+        """
+        first_column = max(int(np.floor((min_x - self.__x0) / self.__cell_size)), 0)
+        last_column = min(int(np.floor((max_x - self.__x0) / self.__cell_size)), self.__n_columns - 1)
+        first_row = max(int(np.floor((min_y - self.__y0) / self.__cell_size)), 0)
+        last_row = min(int(np.floor((max_y - self.__y0) / self.__cell_size)), self.__n_rows - 1)
+        if self.__size == 0 or first_column > last_column or first_row > last_row:
+            return np.empty(0, dtype=np.intp)
+
+        # Each grid row of the rectangle is a contiguous run of cell ids
+        rows = np.arange(first_row, last_row + 1, dtype=np.int64) * self.__n_columns
+        starts = np.searchsorted(self.__cells, rows + first_column, side='left')
+        ends = np.searchsorted(self.__cells, rows + last_column, side='right')
+        lengths = ends - starts
+        if lengths.sum() == 0:
+            return np.empty(0, dtype=np.intp)
+        return np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+
+    def __result(self, candidates, mask) -> np.ndarray:
+        return np.sort(self.__positions[candidates[mask]])
+
+    def bbox(self, min_latitude: float, min_longitude: float,
+             max_latitude: float, max_longitude: float) -> np.ndarray:
+        """
+        Returns the positions of the points inside the bounding box.
+        """
+        (min_x, max_x), (min_y, max_y) = self.project(
+            [min_latitude, max_latitude], [min_longitude, max_longitude]
+        )
+        candidates = self.__candidates(min_x, min_y, max_x, max_y)
+        x, y = self.__x[candidates], self.__y[candidates]
+        return self.__result(candidates, (x >= min_x) & (x <= max_x) & (y >= min_y) & (y <= max_y))
+
+    def radius(self, latitude: float, longitude: float, metres: float) -> np.ndarray:
+        """
+        Returns the positions of the points within `metres` of the location.
+        """
+        cx, cy = self.project(latitude, longitude)
+        candidates = self.__candidates(cx - metres, cy - metres, cx + metres, cy + metres)
+        dx, dy = self.__x[candidates] - cx, self.__y[candidates] - cy
+        return self.__result(candidates, dx * dx + dy * dy <= metres * metres)
+
+    def polygon(self, vertices) -> np.ndarray:
+        """
+        Returns the positions of the points inside the polygon given as a
+        list of `(latitude, longitude)` vertices.
+        """
+        vertices = np.asarray(vertices, dtype=np.float64)
+        polygon_x, polygon_y = self.project(vertices[:, 0], vertices[:, 1])
+        candidates = self.__candidates(polygon_x.min(), polygon_y.min(), polygon_x.max(), polygon_y.max())
+        mask = points_in_polygon(self.__x[candidates], self.__y[candidates], polygon_x, polygon_y)
+        return self.__result(candidates, mask)
+
+    def __nearest_in_ring(self, cx, cy, column, row, ring, best, best_distance):
+        """
+        Searches the square of cells within `ring` cells of (column, row) for
+        a point closer to (cx, cy) than `best_distance`.
+        """
+        candidates = self.__candidates(
+            self.__x0 + (column - ring) * self.__cell_size,
+            self.__y0 + (row - ring) * self.__cell_size,
+            self.__x0 + (column + ring) * self.__cell_size,
+            self.__y0 + (row + ring) * self.__cell_size
+        )
+        if len(candidates):
+            distances = np.hypot(self.__x[candidates] - cx, self.__y[candidates] - cy)
+            i = np.argmin(distances)
+            if distances[i] < best_distance:
+                return candidates[i], distances[i]
+        return best, best_distance
+
+    def nearest(self, latitude: float, longitude: float, max_distance: float | None = None) -> int | None:
+        """
+        Returns the position of the point nearest to the location, or None if
+        the index is empty or no point is within `max_distance` metres.
+        Searches rings of cells around the location until no closer point
+        can exist.
+        """
+        if self.__size == 0:
+            return None
+
+        cx, cy = self.project(latitude, longitude)
+        column = int(np.floor((cx - self.__x0) / self.__cell_size))
+        row = int(np.floor((cy - self.__y0) / self.__cell_size))
+
+        # Distance from the location to the grid, for locations outside of it
+        outside = max(
+            self.__x0 - cx, cx - (self.__x0 + self.__n_columns * self.__cell_size),
+            self.__y0 - cy, cy - (self.__y0 + self.__n_rows * self.__cell_size),
+            0.0
+        )
+        ring = int(outside // self.__cell_size)
+        max_ring = max(self.__n_columns, self.__n_rows) + abs(column) + abs(row)
+
+        best, best_distance = None, np.inf
+        while ring <= max_ring:
+            if max_distance is not None and (ring - 1) * self.__cell_size > max_distance:
+                break
+
+            best, best_distance = self.__nearest_in_ring(cx, cy, column, row, ring, best, best_distance)
+            if best is not None:
+                # Points outside of the searched square are further than
+                # ring * cell_size, so one more search of the square holding
+                # the circle of radius best_distance is enough
+                final_ring = int(np.ceil(best_distance / self.__cell_size))
+                if final_ring > ring:
+                    best, best_distance = self.__nearest_in_ring(
+                        cx, cy, column, row, final_ring, best, best_distance
+                    )
+                break
+            ring += 1
+
+        if best is None or (max_distance is not None and best_distance > max_distance):
+            return None
+        return int(self.__positions[best])
@@ -0,0 +1,308 @@
+# app/core/log/spill.py
+
+import os
+import shutil
+import weakref
+import tempfile
+import numpy as np
+import pandas as pd
+from app._base.base_class import BaseClass
+from app.utils.logger import Logger
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+log = Logger(__name__)
+
+# Bytes of log text processed at a time in out-of-core mode
+SPILL_CHUNK_BYTES = 64 * 1024 * 1024
+
+
+class SpillDirectory(BaseClass):
+
+    def __init__(self, path=None):
+        """
+        Directory holding the spilled frames of an out-of-core Log. Without
+        `path`, a temporary directory is created and deleted once the object
+        is garbage collected (or at exit); a given directory is kept.
+
+        Pickling hands a temporary directory over to the unpickled copy, e.g.
+        from a `LogLoader` worker to the GUI process, so only that copy
+        deletes it.
+        """
+        super().__init__()
+        if path is None:
+            path = tempfile.mkdtemp(prefix='log-spill-')
+            self.__owned = True
+        else:
+            os.makedirs(path, exist_ok=True)
+            self.__owned = False
+        self.__path = str(path)
+        self.__finalizer = None
+        self.__watch()
+
+    def __watch(self) -> None:
+        if self.__owned:
+            self.__finalizer = weakref.finalize(self, shutil.rmtree, self.__path, True)
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    def file(self, name: str) -> str:
+        """
+        Returns the path of the spilled frame `name`.
+        """
+        return os.path.join(self.__path, f"{name}.arrow")
+
+    def cleanup(self) -> None:
+        """
+        Deletes a temporary directory now.
+        """
+        if self.__finalizer is not None:
+            self.__finalizer()
+
+    def __getstate__(self) -> dict:
+        if self.__finalizer is not None:
+            self.__finalizer.detach()
+            self.__finalizer = None
+        return {'path': self.__path, 'owned': self.__owned}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__path = state['path']
+        self.__owned = state['owned']
+        self.__finalizer = None
+        self.__watch()
+
+
+class SpilledFrame(BaseClass):
+
+    def __init__(self, path: str, sort_column: str | None = 'timestamp'):
+        """
+        Append-only frame stored in an Arrow IPC file, one record batch per
+        appended chunk, so that building it only holds one chunk in memory.
+        Once `close()`d, the file is memory mapped: `slice`, `column` and
+        `iter_frames` read only the rows or columns asked for, and `frame`
+        materializes the whole DataFrame on first use.
+
+        Categorical columns are stored as their values. Their categories are
+        merged across the chunks, sorted like those of `astype('category')`
+        when the chunks' categories differ, and restored on read with the
+        other pandas dtypes of the first chunk.
+
+        Parameters:
+            path (str): Path of the Arrow IPC file, overwritten.
+            sort_column (str | None): Column the frame is sorted by. If the
+                chunks aren't in its order, `frame` sorts the rows. None
+                keeps the rows in append order.
+        """
+        super().__init__()
+        if pa is None:
+            raise ImportError("pyarrow is required for the out-of-core mode")
+        self.__path = path
+        self.__sort_column = sort_column
+        self.__writer = None
+        self.__schema = None
+        self.__template = None
+        self.__length = 0
+        self.__last_value = None
+        self.__sorted = True
+        self.__table = None
+        self.__frame = None
+
+    def __len__(self) -> int:
+        return self.__length
+
+    @property
+    def path(self) -> str:
+        return self.__path
+
+    @property
+    def template(self) -> pd.DataFrame | None:
+        """
+        Returns an empty frame with the columns and dtypes of the frame.
+        """
+        return self.__template
+
+    @property
+    def sorted(self) -> bool:
+        """
+        Returns True if the chunks were appended in the order of the sort
+        column, with missing values only at the end, like the frames built in
+        memory.
+        """
+        return self.__sorted
+
+    @property
+    def loaded(self) -> bool:
+        """
+        Returns True once the whole frame has been materialized.
+        """
+        return self.__frame is not None
+
+    def append(self, df: pd.DataFrame) -> None:
+        """
+        Writes the rows of `df` as a record batch.
+        """
+        if self.__template is None:
+            self.__template = df.iloc[0:0].copy()
+        self.add_categories(df)
+        self.__promote(df)
+        if df.empty:
+            return
+
+        table = pa.Table.from_pandas(self.__plain(df), preserve_index=False)
+        if self.__writer is None:
+            self.__schema = table.schema.remove_metadata()
+            self.__writer = pa.ipc.new_file(self.__path, self.__schema)
+        table = table.replace_schema_metadata(None)
+        if not table.schema.equals(self.__schema):
+            table = table.cast(self.__schema)
+        self.__writer.write_table(table)
+
+        self.__track_order(df)
+        self.__length += len(df)
+
+    def add_categories(self, df: pd.DataFrame) -> None:
+        """
+        Adds the categories (or values) of the columns of `df` to those of the
+        categorical columns of the frame, so that values first seen in a
+        later chunk, or only in another frame, aren't lost on read.
+        """
+        if self.__template is None:
+            return
+        merged = {}
+        for column, dtype in self.__template.dtypes.items():
+            if not isinstance(dtype, pd.CategoricalDtype) or column not in df.columns:
+                continue
+            values = df[column]
+            categories = values.cat.categories if isinstance(values.dtype, pd.CategoricalDtype) \
+                else pd.Index(values.dropna().unique())
+            # Index.union keeps equal categories as they are and sorts otherwise
+            union = dtype.categories.union(categories)
+            if not union.equals(dtype.categories):
+                merged[column] = pd.CategoricalDtype(union, ordered=dtype.ordered)
+        if merged:
+            self.__template = self.__template.astype(merged)
+            if self.__frame is not None:
+                self.__frame = self.__frame.astype(merged)
+
+    def __promote(self, df: pd.DataFrame) -> None:
+        """
+        Widens the integer columns of the template that are float in `df`,
+        e.g. integer fields with missing values in some chunks, so that they
+        are read back as float64 like the frames built in memory.
+        """
+        promoted = {
+            column: np.result_type(dtype, df[column].dtype)
+            for column, dtype in self.__template.dtypes.items()
+            if isinstance(dtype, np.dtype) and dtype.kind in 'iu'
+            and column in df.columns and isinstance(df[column].dtype, np.dtype) and df[column].dtype.kind == 'f'
+        }
+        if promoted:
+            self.__template = self.__template.astype(promoted)
+
+    def __track_order(self, df: pd.DataFrame) -> None:
+        if self.__sort_column is None:
+            return
+        values = df[self.__sort_column]
+        if self.__last_value is not None and (pd.isna(self.__last_value) or values.iloc[0] < self.__last_value):
+            self.__sorted = False
+        self.__last_value = values.iloc[-1]
+
+    def close(self) -> None:
+        """
+        Finishes the file. Nothing can be appended afterwards.
+        """
+        if self.__writer is not None:
+            self.__writer.close()
+            self.__writer = None
+
+    @property
+    def table(self):
+        """
+        Returns the frame as an Arrow table memory mapped from the file.
+        """
+        if self.__table is None:
+            self.close()
+            if self.__schema is None:
+                self.__table = pa.Table.from_pandas(self.__plain(self.__template), preserve_index=False)
+            else:
+                # The table's buffers point into the mapping, which stays open
+                self.__table = pa.ipc.open_file(pa.memory_map(self.__path)).read_all()
+        return self.__table
+
+    @staticmethod
+    def __plain(df: pd.DataFrame | None) -> pd.DataFrame:
+        """
+        Returns `df` with its categorical columns as their values.
+        """
+        if df is None:
+            return pd.DataFrame()
+        return df.assign(**{
+            column: df[column].astype(dtype.categories.dtype)
+            for column, dtype in df.dtypes.items() if isinstance(dtype, pd.CategoricalDtype)
+        })
+
+    def __to_pandas(self, table) -> pd.DataFrame:
+        """
+        Converts `table` to a DataFrame with the dtypes of the template.
+        """
+        df = table.to_pandas()
+        if self.__template is not None:
+            for column, dtype in self.__template.dtypes.items():
+                if column in df.columns and df[column].dtype != dtype:
+                    df[column] = df[column].astype(dtype)
+        return df
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """
+        Returns the whole frame, materialized on first use and sorted if the
+        chunks weren't in order.
+        """
+        if self.__frame is None:
+            df = self.__to_pandas(self.table)
+            if not self.__sorted:
+                df = df.sort_values(self.__sort_column, kind='stable').reset_index(drop=True)
+            self.__frame = df
+        return self.__frame
+
+    def slice(self, start: int, stop: int, columns: list | None = None) -> pd.DataFrame:
+        """
+        Returns the rows `start:stop`, reading only them from the file.
+        """
+        if self.__frame is not None:
+            df = self.__frame.iloc[start:stop]
+            return df if columns is None else df[columns]
+        table = self.table.slice(start, max(0, stop - start))
+        if columns is not None:
+            table = table.select(columns)
+        df = self.__to_pandas(table)
+        df.index = pd.RangeIndex(start, start + len(df))
+        return df
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Returns one column as a NumPy array, reading only it from the file.
+        """
+        if self.__frame is not None:
+            return self.__frame[name].to_numpy()
+        return self.__to_pandas(self.table.select([name]))[name].to_numpy()
+
+    def iter_frames(self, columns: list | None = None):
+        """
+        Yields the frame one appended chunk at a time, in append order.
+        """
+        table = self.table if columns is None else self.table.select(columns)
+        for batch in table.to_batches():
+            yield self.__to_pandas(pa.Table.from_batches([batch]))
+
+    def __getstate__(self) -> dict:
+        # Memory maps can't be pickled; the file is mapped again on use
+        self.close()
+        state = self.__dict__.copy()
+        state['_SpilledFrame__table'] = None
+        return state
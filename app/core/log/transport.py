@@ -0,0 +1,156 @@
+# app/core/log/transport.py
+
+import json
+import struct
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_bool_dtype, is_datetime64_any_dtype, is_numeric_dtype
+from app.utils.logger import Logger
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+log = Logger(__name__)
+
+# Raw frame layout: magic, format version, header length, JSON header padded
+# to BUFFER_ALIGNMENT, then one buffer per column, each padded likewise, so
+# that the client can view every buffer as a typed array without copying
+RAW_MAGIC = b'LAFB'
+RAW_VERSION = 1
+RAW_PREAMBLE = struct.Struct('<4sB3xI')
+BUFFER_ALIGNMENT = 8
+
+# Dtypes sent as they are; other numeric columns are sent as float64
+RAW_DTYPES = ('int8', 'uint8', 'int16', 'uint16', 'int32', 'uint32', 'float32', 'float64')
+
+# Rows per Arrow record batch
+ARROW_BATCH_ROWS = 1_000_000
+
+ARROW_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+RAW_MEDIA_TYPE = 'application/octet-stream'
+
+
+def _padding(size: int) -> bytes:
+    return b'\0' * (-size % BUFFER_ALIGNMENT)
+
+
+def raw_column(values: pd.Series) -> tuple:
+    """
+    Returns the buffer of a column in the raw format and its description.
+    Contiguous columns of RAW_DTYPES are returned without copying;
+    timestamps are converted to float64 milliseconds since the epoch (the
+    unit of JavaScript dates), booleans to uint8 and integers with missing
+    values or of other widths to float64 with NaN.
+    """
+    if is_datetime64_any_dtype(values):
+        times = values.to_numpy(dtype='datetime64[ns]')
+        array = times.view(np.int64) / 1e6
+        array[np.isnat(times)] = np.nan
+        return array, {'dtype': 'float64', 'unit': 'ms'}
+    if is_bool_dtype(values) and not values.hasnans:
+        return values.to_numpy(dtype=bool).view(np.uint8), {'dtype': 'uint8'}
+    if not is_numeric_dtype(values):
+        raise TypeError(f"Column {values.name} of dtype {values.dtype} can't be sent as a typed array.")
+
+    array = values.to_numpy()
+    if array.dtype.name not in RAW_DTYPES:
+        array = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.ascontiguousarray(array), {'dtype': array.dtype.name}
+
+
+def raw_columns(df: pd.DataFrame) -> list:
+    """
+    Returns the columns of `df` that can be sent in the raw format: the
+    numeric, boolean and datetime ones.
+    """
+    return [
+        column for column, dtype in df.dtypes.items()
+        if is_datetime64_any_dtype(dtype) or is_bool_dtype(dtype) or is_numeric_dtype(dtype)
+    ]
+
+
+def iter_raw_frame(df: pd.DataFrame, columns: list | None = None):
+    """
+    Yields the columns of `df` in the raw typed-array format: the preamble
+    and JSON header, then the column buffers as memoryviews of the NumPy
+    arrays, so numeric columns are sent straight from the frame's memory.
+    Without `columns`, every column of `raw_columns` is sent.
+
+    The header lists `rows` and, per column, its `name`, `dtype`, `offset`
+    (from the start of the buffers) and `length` in bytes.
+    """
+    columns = raw_columns(df) if columns is None else columns
+    buffers, descriptions = [], []
+    offset = 0
+    for column in columns:
+        array, description = raw_column(df[column])
+        description.update({'name': column, 'offset': offset, 'length': array.nbytes})
+        buffers.append(array)
+        descriptions.append(description)
+        offset += array.nbytes + len(_padding(array.nbytes))
+
+    header = json.dumps({'rows': len(df), 'columns': descriptions}).encode()
+    header += b' ' * (-(RAW_PREAMBLE.size + len(header)) % BUFFER_ALIGNMENT)
+    yield RAW_PREAMBLE.pack(RAW_MAGIC, RAW_VERSION, len(header)) + header
+    for array in buffers:
+        if array.nbytes:
+            yield memoryview(array).cast('B')
+        if _padding(array.nbytes):
+            yield _padding(array.nbytes)
+
+
+def to_arrow_batch(df: pd.DataFrame, columns: list | None = None):
+    """
+    Returns the columns of `df` as an Arrow record batch. NumPy columns
+    without missing values and Arrow-backed string columns are wrapped
+    without copying.
+    """
+    if pa is None:
+        raise ImportError("pyarrow is required for the Arrow transport")
+    columns = list(df.columns) if columns is None else columns
+    return pa.RecordBatch.from_arrays(
+        [pa.Array.from_pandas(df[column]) for column in columns],
+        names=[str(column) for column in columns]
+    )
+
+
+class _ChunkSink:
+    """
+    File-like sink collecting what the Arrow writer writes, so that the
+    IPC stream can be sent batch by batch.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def take(self) -> bytes:
+        data, self.chunks = b''.join(self.chunks), []
+        return data
+
+
+def iter_arrow_stream(df: pd.DataFrame, columns: list | None = None, batch_rows: int = ARROW_BATCH_ROWS):
+    """
+    Yields the columns of `df` as an Arrow IPC stream, one record batch of
+    at most `batch_rows` rows at a time.
+    """
+    columns = list(df.columns) if columns is None else columns
+    schema = to_arrow_batch(df.iloc[:0], columns).schema
+    sink = _ChunkSink()
+    with pa.ipc.new_stream(pa.PythonFile(sink, mode='w'), schema) as writer:
+        for start in range(0, len(df), batch_rows):
+            writer.write_batch(to_arrow_batch(df.iloc[start:start + batch_rows], columns))
+            yield sink.take()
+    yield sink.take()
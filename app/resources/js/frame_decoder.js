@@ -0,0 +1,86 @@
+// app/resources/js/frame_decoder.js
+//
+// Decoder of the raw frames sent by /api/logs/frame?format=raw: every column
+// becomes a typed array viewing the response buffer, without copying.
+// Timestamps arrive as Float64Array milliseconds since the epoch.
+//
+//     import { fetchFrame, interleave } from '/static/js/frame_decoder.js';
+//     const frame = await fetchFrame(path, { columns: ['timestamp', 'height'] });
+//     chart.setOption({ dataset: { source: interleave(frame.columns.timestamp, frame.columns.height) } });
+//
+// Arrow responses (format=arrow) can be read with apache-arrow's tableFromIPC.
+
+const RAW_MAGIC = 'LAFB';
+const RAW_VERSION = 1;
+const PREAMBLE_BYTES = 12;
+
+const TYPED_ARRAYS = {
+    int8: Int8Array,
+    uint8: Uint8Array,
+    int16: Int16Array,
+    uint16: Uint16Array,
+    int32: Int32Array,
+    uint32: Uint32Array,
+    float32: Float32Array,
+    float64: Float64Array,
+};
+
+export function decodeFrame(buffer) {
+    const preamble = new DataView(buffer, 0, PREAMBLE_BYTES);
+    const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+    if (magic !== RAW_MAGIC) {
+        throw new Error('Not a raw frame');
+    }
+    if (preamble.getUint8(4) !== RAW_VERSION) {
+        throw new Error(`Unsupported raw frame version ${preamble.getUint8(4)}`);
+    }
+    const headerBytes = preamble.getUint32(8, true);
+    const header = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, PREAMBLE_BYTES, headerBytes)));
+
+    // Buffers are aligned to 8 bytes from here, so views need no copy
+    const base = PREAMBLE_BYTES + headerBytes;
+    const columns = {};
+    const units = {};
+    for (const column of header.columns) {
+        const TypedArray = TYPED_ARRAYS[column.dtype];
+        if (TypedArray === undefined) {
+            throw new Error(`Unsupported dtype ${column.dtype} of ${column.name}`);
+        }
+        columns[column.name] = new TypedArray(buffer, base + column.offset, column.length / TypedArray.BYTES_PER_ELEMENT);
+        if (column.unit) {
+            units[column.name] = column.unit;
+        }
+    }
+    return { rows: header.rows, columns, units };
+}
+
+export function frameUrl(path, { logType = 'MISSION_INFO', columns = null, start = null, end = null, format = 'raw' } = {}) {
+    const params = new URLSearchParams({ path, log_type: logType, format });
+    if (columns) {
+        params.set('columns', columns.join(','));
+    }
+    if (start !== null) {
+        params.set('start', start);
+    }
+    if (end !== null) {
+        params.set('end', end);
+    }
+    return `/api/logs/frame?${params}`;
+}
+
+export async function fetchFrame(path, options = {}) {
+    const response = await fetch(frameUrl(path, { ...options, format: 'raw' }));
+    if (!response.ok) {
+        throw new Error(`${response.status}: ${await response.text()}`);
+    }
+    return decodeFrame(await response.arrayBuffer());
+}
+
+export function interleave(x, y) {
+    // [[x0, y0], [x1, y1], ...] for chart series
+    const points = new Array(x.length);
+    for (let i = 0; i < x.length; i++) {
+        points[i] = [x[i], y[i]];
+    }
+    return points;
+}
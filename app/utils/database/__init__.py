@@ -0,0 +1,2 @@
+from .log_cache import LogCache, file_fingerprint
+from .flight_database import FlightDatabase
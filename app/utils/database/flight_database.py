@@ -0,0 +1,397 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING
+import numpy as np
+import pandas as pd
+from app._base.base_class import BaseClass
+from app.utils.logger import Logger
+from .log_cache import file_fingerprint
+
+if TYPE_CHECKING:
+    from app.core.log import Log
+
+log = Logger(__name__)
+
+# Tables of the processed log types: log type -> (table, columns after
+# flight_id and timestamp)
+FRAME_TABLES = {
+    'MISSION_INFO': ('mission_info', [
+        ('flight_mode', 'TEXT'),
+        ('arm_status', 'TEXT'),
+        ('flight_status', 'TEXT'),
+        ('height', 'REAL'),
+        ('speed', 'REAL'),
+        ('climb_rate', 'REAL'),
+        ('heading', 'REAL'),
+        ('latitude', 'REAL'),
+        ('longitude', 'REAL'),
+    ]),
+    'SPRAY_INFO': ('spray_info', [
+        ('spray_status', 'INTEGER'),
+        ('pump_pwm', 'INTEGER'),
+        ('nozzle_pwm', 'INTEGER'),
+        ('req_flowrate', 'REAL'),
+        ('actual_flowrate', 'REAL'),
+        ('flowmeter_pulse', 'INTEGER'),
+        ('payload_rem', 'REAL'),
+        ('area_sprayed', 'REAL'),
+        ('req_dosage', 'REAL'),
+        ('actual_dosage', 'REAL'),
+        ('prv_wp', 'INTEGER'),
+        ('next_wp', 'INTEGER'),
+        ('latitude', 'REAL'),
+        ('longitude', 'REAL'),
+        ('height', 'REAL'),
+    ]),
+}
+
+# Rows of the other log types are stored unsplit
+ENTRY_COLUMNS = [('module', 'TEXT'), ('severity', 'TEXT'), ('log_type', 'TEXT'), ('log_info', 'TEXT')]
+
+FLIGHT_COLUMNS = [
+    ('file_path', 'TEXT NOT NULL UNIQUE'),
+    ('fingerprint', 'TEXT'),
+    ('start', 'INTEGER'),
+    ('end', 'INTEGER'),
+    ('flight_time_s', 'REAL'),
+    ('lines', 'INTEGER'),
+    ('mission_samples', 'INTEGER'),
+    ('spray_samples', 'INTEGER'),
+    ('area_sprayed', 'REAL'),
+    ('payload_used', 'REAL'),
+    ('dosage_error_pct', 'REAL'),
+    ('ingested_at', 'TEXT'),
+]
+
+# Columns holding timestamps, stored as integer microseconds since the epoch
+TIMESTAMP_COLUMNS = ('timestamp', 'start', 'end')
+
+AGGREGATE_FUNCTIONS = ('count', 'sum', 'avg', 'min', 'max', 'total')
+
+# Rows inserted per executemany call
+INSERT_BATCH_ROWS = 100_000
+
+
+def quote(name: str) -> str:
+    """
+    Quotes a column name for SQL.
+    """
+    return '"' + name.replace('"', '""') + '"'
+
+
+def to_sql_timestamps(values) -> np.ndarray:
+    """
+    Converts timestamps to microseconds since the epoch as float64, NaT
+    becoming NaN. SQLite stores NaN as NULL and the INTEGER affinity of the
+    columns stores the other values as integers.
+    """
+    values = pd.to_datetime(pd.Series(values)).astype('datetime64[us]')
+    microseconds = values.to_numpy().view(np.int64).astype(np.float64)
+    microseconds[values.isna().to_numpy()] = np.nan
+    return microseconds
+
+
+def from_sql_timestamps(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converts the timestamp columns of a query result back to datetimes.
+    """
+    for column in TIMESTAMP_COLUMNS:
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], unit='us')
+    return df
+
+
+def to_sql_column(values: pd.Series) -> list:
+    """
+    Returns the values of a column as a list that sqlite3 can bind, with
+    None for missing values.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return to_sql_timestamps(values).tolist()
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        # Nullable integers as floats, NaN is stored as NULL
+        return values.to_numpy(dtype=np.float64, na_value=np.nan).tolist()
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+class FlightDatabase(BaseClass):
+
+    def __init__(self, db_path: str = "flights.db"):
+        """
+        SQLite store of processed flights for queries across flights. Every
+        ingested log gets a row in `flights` with its summary, and its
+        MISSION_INFO and SPRAY_INFO frames go to the `mission_info` and
+        `spray_info` tables; the rows of the other log types go to
+        `log_entries`. The database runs in WAL mode, so readers (e.g. the
+        GUI) are not blocked while a flight is being ingested.
+
+        Parameters:
+            db_path (str): Path of the database file.
+        """
+        super().__init__()
+        self.__db_path = db_path
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.execute("PRAGMA synchronous=NORMAL")
+        self.__connection.execute("PRAGMA foreign_keys=ON")
+        self.__create_tables()
+
+    @property
+    def db_path(self) -> str:
+        return self.__db_path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self) -> None:
+        """
+        Closes the connection.
+        """
+        self.__connection.close()
+
+    def __create_tables(self) -> None:
+        flight_columns = ", ".join(f'{quote(name)} {sql_type}' for name, sql_type in FLIGHT_COLUMNS)
+        statements = [
+            f"CREATE TABLE IF NOT EXISTS flights (flight_id INTEGER PRIMARY KEY, {flight_columns})"
+        ]
+        tables = [table for table, _ in FRAME_TABLES.values()] + ['log_entries']
+        columns = [columns for _, columns in FRAME_TABLES.values()] + [ENTRY_COLUMNS]
+        for table, table_columns in zip(tables, columns):
+            definitions = ", ".join(f'{quote(name)} {sql_type}' for name, sql_type in table_columns)
+            statements.append(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                f"flight_id INTEGER NOT NULL REFERENCES flights(flight_id) ON DELETE CASCADE, "
+                f"timestamp INTEGER, {definitions})"
+            )
+            statements.append(
+                f"CREATE INDEX IF NOT EXISTS {table}_flight_time ON {table}(flight_id, timestamp)"
+            )
+        statements.append(
+            "CREATE INDEX IF NOT EXISTS log_entries_type ON log_entries(log_type, flight_id, timestamp)"
+        )
+        statements.append("CREATE INDEX IF NOT EXISTS flights_start ON flights(start)")
+
+        with self.__lock, self.__connection:
+            for statement in statements:
+                self.__connection.execute(statement)
+
+    def __insert_frame(self, table: str, flight_id: int, df: pd.DataFrame, columns: list) -> None:
+        """
+        Bulk inserts the `columns` of `df` into `table` in batches.
+        """
+        names = ['flight_id', 'timestamp'] + [name for name, _ in columns]
+        statement = (
+            f"INSERT INTO {table} ({', '.join(map(quote, names))}) "
+            f"VALUES ({', '.join('?' * len(names))})"
+        )
+        for start in range(0, len(df), INSERT_BATCH_ROWS):
+            batch = df.iloc[start:start + INSERT_BATCH_ROWS]
+            values = [[flight_id] * len(batch), to_sql_column(batch['timestamp'])]
+            for name, _ in columns:
+                values.append(to_sql_column(batch[name]) if name in batch.columns else [None] * len(batch))
+            self.__connection.executemany(statement, zip(*values))
+
+    def ingest_frames(self, summary: dict, frames: dict, replace: bool = True) -> int:
+        """
+        Stores a processed flight and returns its flight_id.
+
+        Parameters:
+            summary (dict): The flight summary, as returned by `Log.summary()`.
+            frames (dict): Log type -> processed DataFrame. The frames of log
+                types without a table of their own are stored in
+                `log_entries` and need the `log_info` column.
+            replace (bool): If True, a flight already stored for the same
+                file is replaced, else its flight_id is returned as it is.
+        """
+        file_path = str(summary['file_path'])
+        fingerprint = file_fingerprint(file_path) if os.path.exists(file_path) else None
+        row = dict(summary, fingerprint=fingerprint,
+                   ingested_at=datetime.now(timezone.utc).isoformat(timespec='seconds'))
+        for column in ('start', 'end'):
+            row[column] = to_sql_timestamps([row.get(column)])[0]
+        names = [name for name, _ in FLIGHT_COLUMNS]
+        values = [None if pd.isna(row.get(name)) else row.get(name) for name in names]
+
+        with self.__lock, self.__connection:
+            existing = self.__connection.execute(
+                "SELECT flight_id FROM flights WHERE file_path = ?", (file_path,)
+            ).fetchone()
+            if existing is not None:
+                if not replace:
+                    return existing[0]
+                self.__connection.execute("DELETE FROM flights WHERE flight_id = ?", existing)
+
+            cursor = self.__connection.execute(
+                f"INSERT INTO flights ({', '.join(map(quote, names))}) "
+                f"VALUES ({', '.join('?' * len(names))})",
+                values
+            )
+            flight_id = cursor.lastrowid
+
+            for log_type, df in frames.items():
+                if df is None or df.empty:
+                    continue
+                if log_type in FRAME_TABLES:
+                    table, columns = FRAME_TABLES[log_type]
+                    self.__insert_frame(table, flight_id, df, columns)
+                elif 'log_info' in df.columns:
+                    self.__insert_frame('log_entries', flight_id, df, ENTRY_COLUMNS)
+
+        log.i(f"Stored flight {flight_id} ({file_path}).")
+        return flight_id
+
+    def ingest(self, log_obj: 'Log', log_types: list | None = None, replace: bool = True) -> int:
+        """
+        Stores the summary and the processed frames of `log_obj` and returns
+        the flight_id. By default all of its log types are stored.
+        """
+        log_types = log_obj.log_types if log_types is None else log_types
+        frames = {log_type: log_obj.get_logs(log_type) for log_type in log_types}
+        return self.ingest_frames(log_obj.summary(), frames, replace)
+
+    def is_stored(self, file_path) -> bool:
+        """
+        Returns True if the current contents of `file_path` are stored.
+        """
+        row = self.__connection.execute(
+            "SELECT fingerprint FROM flights WHERE file_path = ?", (str(file_path),)
+        ).fetchone()
+        return row is not None and os.path.exists(file_path) and row[0] == file_fingerprint(file_path)
+
+    def delete(self, flight_id: int) -> None:
+        """
+        Removes a flight and its rows.
+        """
+        with self.__lock, self.__connection:
+            self.__connection.execute("DELETE FROM flights WHERE flight_id = ?", (flight_id,))
+
+    def query(self, sql: str, params=()) -> pd.DataFrame:
+        """
+        Runs a SELECT statement and returns the result. Timestamp columns
+        are converted back to datetimes.
+        """
+        with self.__lock:
+            return from_sql_timestamps(pd.read_sql_query(sql, self.__connection, params=params))
+
+    def flights(self, where: str | None = None, params=()) -> pd.DataFrame:
+        """
+        Returns the stored flights, optionally filtered by a SQL condition on
+        the `flights` table, e.g. `flights("area_sprayed > ?", (10000,))`.
+        """
+        sql = "SELECT * FROM flights"
+        if where:
+            sql += f" WHERE {where}"
+        return self.query(sql + " ORDER BY start", params)
+
+    def frame(self, flight_id: int, log_type: str, start=None, end=None, columns: list | None = None) -> pd.DataFrame:
+        """
+        Returns the rows of `log_type` of one flight between `start` and
+        `end` (timestamps, None for open ends), read with the
+        (flight_id, timestamp) index.
+        """
+        table, table_columns = self.__table(log_type)
+        selected = ['timestamp'] + (columns or [name for name, _ in table_columns])
+        self.__check_columns(log_type, selected)
+
+        conditions, params = ["flight_id = ?"], [flight_id]
+        if table == 'log_entries':
+            conditions.append("log_type = ?")
+            params.append(log_type)
+        if start is not None:
+            conditions.append("timestamp >= ?")
+            params.append(to_sql_timestamps([start])[0])
+        if end is not None:
+            conditions.append("timestamp <= ?")
+            params.append(to_sql_timestamps([end])[0])
+        return self.query(
+            f"SELECT {', '.join(map(quote, selected))} FROM {table} "
+            f"WHERE {' AND '.join(conditions)} ORDER BY timestamp",
+            params
+        )
+
+    def aggregate(self,
+                  log_type: str,
+                  aggregates: dict,
+                  where: str | None = None,
+                  params=(),
+                  having: str | None = None) -> pd.DataFrame:
+        """
+        Computes aggregates per flight in SQL and returns one row per flight
+        with its file path.
+
+        Parameters:
+            log_type (str): The log type whose rows are aggregated.
+            aggregates (dict): Result column -> `(function, column)`, with a
+                function of AGGREGATE_FUNCTIONS, e.g.
+                `{'max_height': ('max', 'height')}`. `('count', '*')` counts
+                rows.
+            where (str | None): SQL condition on the rows, with `?`
+                placeholders bound to `params`.
+            having (str | None): SQL condition on the aggregates.
+        """
+        table, _ = self.__table(log_type)
+        expressions = []
+        for name, (function, column) in aggregates.items():
+            if function not in AGGREGATE_FUNCTIONS:
+                raise ValueError(f"Unknown aggregate function '{function}'. Available: {', '.join(AGGREGATE_FUNCTIONS)}")
+            if column != '*':
+                self.__check_columns(log_type, [column])
+                column = quote(column)
+            expressions.append(f'{function}({column}) AS {quote(name)}')
+
+        conditions = []
+        if table == 'log_entries':
+            conditions.append("t.log_type = ?")
+            params = (log_type, *params)
+        if where:
+            conditions.append(f"({where})")
+        sql = (
+            f"SELECT t.flight_id, f.file_path, {', '.join(expressions)} "
+            f"FROM {table} t JOIN flights f ON f.flight_id = t.flight_id "
+            + (f"WHERE {' AND '.join(conditions)} " if conditions else "")
+            + "GROUP BY t.flight_id"
+            + (f" HAVING {having}" if having else "")
+            + " ORDER BY f.start"
+        )
+        return self.query(sql, params)
+
+    def dosage_deviations(self, threshold: float = 0.10, min_samples: int = 1) -> pd.DataFrame:
+        """
+        Returns the flights with at least `min_samples` spray samples whose
+        actual dosage deviated from the requested dosage by more than
+        `threshold` (relative), with the number and share of such samples and
+        the worst deviation.
+        """
+        deviation = "abs(s.actual_dosage - s.req_dosage) / s.req_dosage"
+        df = self.query(
+            f"SELECT s.flight_id, f.file_path, count(*) AS samples, "
+            f"total({deviation} > ?) AS deviated_samples, max({deviation}) AS max_deviation "
+            f"FROM spray_info s JOIN flights f ON f.flight_id = s.flight_id "
+            f"WHERE s.req_dosage > 0 "
+            f"GROUP BY s.flight_id HAVING deviated_samples >= ? ORDER BY f.start",
+            (float(threshold), int(min_samples))
+        )
+        df['deviated_share'] = df['deviated_samples'] / df['samples']
+        return df
+
+    def __table(self, log_type: str) -> tuple:
+        return FRAME_TABLES.get(log_type, ('log_entries', ENTRY_COLUMNS))
+
+    def __check_columns(self, log_type: str, columns: list) -> None:
+        """
+        Only known column names are put in SQL statements.
+        """
+        _, table_columns = self.__table(log_type)
+        known = {'timestamp'} | {name for name, _ in table_columns}
+        unknown = [column for column in columns if column not in known]
+        if unknown:
+            raise ValueError(f"Unknown {log_type} columns: {', '.join(unknown)}")
@@ -0,0 +1,195 @@
+import os
+import json
+import shutil
+import hashlib
+import pandas as pd
+from app._base.base_class import BaseClass
+from app.utils.logger import Logger
+from app.utils.version import PARSER_VERSION
+
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+log = Logger(__name__)
+
+
+def file_fingerprint(file_path, *variant) -> str:
+    """
+    Returns a key identifying the current contents of `file_path` from its
+    absolute path, size and modification time. Any `variant` values (e.g.
+    parser options) are included in the key.
+    """
+    stat = os.stat(file_path)
+    parts = [
+        os.path.abspath(file_path),
+        str(stat.st_size),
+        str(stat.st_mtime_ns),
+        *[str(v) for v in variant]
+    ]
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+
+class LogCache(BaseClass):
+
+    META_FILE = "meta.json"
+
+    def __init__(self, cache_dir: str = "cache", max_size_bytes: int = 2 * 1024 ** 3):
+        """
+        Persistent cache of the frames built by `Log`, stored as Feather
+        (Arrow IPC) files. Entries are keyed by the log file fingerprint and
+        the parser version, and the least recently used entries are evicted
+        once the cache grows beyond `max_size_bytes`.
+
+        Parameters:
+            cache_dir (str): Directory holding the cache entries.
+            max_size_bytes (int): Maximum total size of the cache on disk.
+        """
+        super().__init__()
+        self.__cache_dir = cache_dir
+        self.__max_size_bytes = max_size_bytes
+        self.__enabled = feather is not None
+
+        if not self.__enabled:
+            log.w("pyarrow is not installed, the log cache is disabled.")
+            return
+
+        os.makedirs(self.__cache_dir, exist_ok=True)
+        self.__purge_stale_entries()
+
+    @property
+    def enabled(self) -> bool:
+        return self.__enabled
+
+    @property
+    def cache_dir(self) -> str:
+        return self.__cache_dir
+
+    def key(self, file_path, *variant) -> str:
+        """
+        Returns the cache key of `file_path` for the current parser version.
+        """
+        return file_fingerprint(file_path, PARSER_VERSION, *variant)
+
+    def load(self, key: str, name: str) -> pd.DataFrame | None:
+        """
+        Returns the frame `name` stored under `key`, or None on a cache miss.
+        """
+        if not self.__enabled:
+            return None
+
+        frame_path = self.__frame_path(key, name)
+        if not os.path.exists(frame_path):
+            return None
+
+        try:
+            df = feather.read_feather(frame_path)
+        except Exception as e:
+            log.w(f"Discarding unreadable cache entry {key}/{name}: {e}")
+            self.__remove_entry(key)
+            return None
+
+        # Mark the entry as recently used
+        os.utime(self.__entry_dir(key))
+        return df
+
+    def save(self, key: str, name: str, df: pd.DataFrame) -> None:
+        """
+        Stores the frame `name` under `key` and evicts old entries if the
+        cache is over its size limit.
+        """
+        if not self.__enabled:
+            return
+
+        entry_dir = self.__entry_dir(key)
+        try:
+            os.makedirs(entry_dir, exist_ok=True)
+            meta_path = os.path.join(entry_dir, LogCache.META_FILE)
+            if not os.path.exists(meta_path):
+                with open(meta_path, "w") as file:
+                    json.dump({"parser_version": PARSER_VERSION}, file)
+
+            # Write to a temporary file first so readers never see partial frames
+            frame_path = self.__frame_path(key, name)
+            tmp_path = frame_path + ".tmp"
+            feather.write_feather(df, tmp_path)
+            os.replace(tmp_path, frame_path)
+        except Exception as e:
+            log.e(f"Error saving {name} to the log cache: {e}")
+            return
+
+        self.__evict(keep=key)
+
+    def clear(self) -> None:
+        """
+        Removes every entry from the cache.
+        """
+        if not self.__enabled:
+            return
+        for key in self.__entries():
+            self.__remove_entry(key)
+
+    def size_bytes(self) -> int:
+        """
+        Returns the total size of the cache on disk.
+        """
+        if not self.__enabled:
+            return 0
+        return sum(self.__entry_size(key) for key in self.__entries())
+
+    def __entry_dir(self, key: str) -> str:
+        return os.path.join(self.__cache_dir, key)
+
+    def __frame_path(self, key: str, name: str) -> str:
+        return os.path.join(self.__entry_dir(key), f"{name}.feather")
+
+    def __entries(self) -> list:
+        return [
+            entry for entry in os.listdir(self.__cache_dir)
+            if os.path.isdir(self.__entry_dir(entry))
+        ]
+
+    def __entry_size(self, key: str) -> int:
+        entry_dir = self.__entry_dir(key)
+        return sum(
+            os.path.getsize(os.path.join(entry_dir, file))
+            for file in os.listdir(entry_dir)
+        )
+
+    def __remove_entry(self, key: str) -> None:
+        shutil.rmtree(self.__entry_dir(key), ignore_errors=True)
+
+    def __purge_stale_entries(self) -> None:
+        """
+        Removes the entries written by a different parser version.
+        """
+        for key in self.__entries():
+            meta_path = os.path.join(self.__entry_dir(key), LogCache.META_FILE)
+            try:
+                with open(meta_path) as file:
+                    parser_version = json.load(file).get("parser_version")
+            except (OSError, ValueError):
+                parser_version = None
+            if parser_version != PARSER_VERSION:
+                log.d("Removing stale log cache entry %s.", key)
+                self.__remove_entry(key)
+
+    def __evict(self, keep: str) -> None:
+        """
+        Removes the least recently used entries until the cache fits in
+        `max_size_bytes`. The entry `keep` is never removed.
+        """
+        entries = [
+            (os.path.getmtime(self.__entry_dir(key)), key, self.__entry_size(key))
+            for key in self.__entries()
+        ]
+        total = sum(size for _, _, size in entries)
+        for _, key, size in sorted(entries):
+            if total <= self.__max_size_bytes:
+                break
+            if key == keep:
+                continue
+            log.d("Evicting log cache entry %s.", key)
+            self.__remove_entry(key)
+            total -= size
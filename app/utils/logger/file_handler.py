@@ -1,32 +1,70 @@
 import os
+import time
 import logging
+import logging.handlers
 from datetime import datetime
 from .file_formatter import FileFormatter
 
-class FileHandler(logging.FileHandler):
+# Rotation defaults of the app log file
+MAX_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 5
+ROLLOVER_INTERVAL_S = 24 * 60 * 60
 
-    def __init__(self, 
-                 mode: str = "a", 
-                 encoding: str | None = None, 
-                 delay: bool = False, 
-                 errors: str | None = None
+
+class FileHandler(logging.handlers.RotatingFileHandler):
+
+    def __init__(self,
+                 mode: str = "a",
+                 encoding: str | None = None,
+                 delay: bool = True,
+                 errors: str | None = None,
+                 max_bytes: int = MAX_BYTES,
+                 backup_count: int = BACKUP_COUNT,
+                 rollover_interval: float | None = ROLLOVER_INTERVAL_S,
+                 file_path: str | None = None
                  ) -> None:
         """
+        App log file, rolled over to numbered backups when it grows beyond
+        `max_bytes` or after `rollover_interval` seconds, whichever comes
+        first. Only the latest `backup_count` backups are kept. A `max_bytes`
+        of 0 and no `rollover_interval` never roll the file over.
+
+        `file_path` defaults to a new file named after the current time in
+        the logs directory.
         """
-        self.__filename = 'App_{}-{}-{}_{}-{}.log'.format(
-            str(datetime.now().year),
-            str(datetime.now().month), 
-            str(datetime.now().day),
-            str(datetime.now().hour),
-            str(datetime.now().minute)
-            )
-        os.makedirs("logs", exist_ok=True)
-        self.__file_path = os.path.join("logs", self.__filename)
-        
-        super().__init__(self.__file_path, mode, encoding, delay, errors)
+        if file_path is None:
+            filename = 'App_{}-{}-{}_{}-{}.log'.format(
+                str(datetime.now().year),
+                str(datetime.now().month),
+                str(datetime.now().day),
+                str(datetime.now().hour),
+                str(datetime.now().minute)
+                )
+            os.makedirs("logs", exist_ok=True)
+            file_path = os.path.join("logs", filename)
+        self.__file_path = file_path
+
+        super().__init__(self.__file_path, mode, max_bytes, backup_count, encoding, delay, errors)
+
+        self.__rollover_interval = rollover_interval
+        self.__rollover_at = self.__next_rollover()
 
         self.__log_level = logging.DEBUG
         self.__format_str = '%(levelname)-8s, %(name)s, %(message)s'
         self.__formatter = FileFormatter(fmt=self.__format_str)
         self.setFormatter(self.__formatter)
         self.setLevel(self.__log_level)
+
+    def __next_rollover(self) -> float | None:
+        if not self.__rollover_interval:
+            return None
+        return time.time() + self.__rollover_interval
+
+    def shouldRollover(self, record) -> bool:
+        if self.__rollover_at is not None and time.time() >= self.__rollover_at:
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        self.__rollover_at = self.__next_rollover()
@@ -0,0 +1,119 @@
+import os
+import queue
+import atexit
+import logging
+import logging.handlers
+import threading
+
+from .file_handler import FileHandler
+from .stream_handler import StreamHandler
+
+_lock = threading.Lock()
+_listener = None
+_sinks = None
+_stream_level = None
+# Process whose exit flushes the queue, see `start_logging`
+_finalized_pid = None
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+
+    def __init__(self):
+        """
+        Process-wide handler shared by all Loggers. Records are put on an
+        in-memory queue as they are, and a single listener thread formats
+        and writes them to the stream and file sinks, so logging costs the
+        caller a queue put.
+        """
+        super().__init__(queue.SimpleQueue())
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The queue is in-process, the sinks format the record themselves
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        if _listener is None:
+            start_logging()
+        self.queue.put_nowait(record)
+
+
+_handler = QueueHandler()
+
+
+def get_queue_handler() -> QueueHandler:
+    """
+    Returns the handler shared by all Loggers.
+    """
+    return _handler
+
+
+def start_logging() -> None:
+    """
+    Starts the listener thread writing the queued records, creating the
+    stream and file sinks on first use. Called on the first record.
+    """
+    global _listener, _sinks, _finalized_pid
+    with _lock:
+        if _listener is not None:
+            return
+        if _sinks is None:
+            _sinks = (StreamHandler(), FileHandler())
+            if _stream_level is not None:
+                _sinks[0].setLevel(_stream_level)
+        _listener = logging.handlers.QueueListener(_handler.queue, *_sinks, respect_handler_level=True)
+        _listener.start()
+        if _finalized_pid != os.getpid():
+            # Pool workers leave through os._exit, skipping atexit, but
+            # run the multiprocessing finalizers first
+            import multiprocessing.util
+            multiprocessing.util.Finalize(None, stop_logging, exitpriority=0)
+            _finalized_pid = os.getpid()
+
+
+def set_stream_level(level: int | str) -> None:
+    """
+    Sets the level of the stream sink, e.g. to keep a command line tool
+    quiet. The file sink still gets every record.
+    """
+    global _stream_level
+    with _lock:
+        _stream_level = level
+        if _sinks is not None:
+            _sinks[0].setLevel(level)
+
+
+def stop_logging() -> None:
+    """
+    Writes the queued records and stops the listener thread. Logging again
+    restarts it.
+    """
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener = None
+        for sink in _sinks:
+            sink.flush()
+
+
+def _after_fork_in_child() -> None:
+    """
+    The listener thread doesn't survive a fork: give the child process its
+    own queue and sinks, its listener is started on its first record. The
+    child appends to the file of the parent without rotating it, which is
+    left to the parent.
+    """
+    global _lock, _listener, _sinks
+    _lock = threading.Lock()
+    _listener = None
+    _handler.queue = queue.SimpleQueue()
+    if _sinks is not None:
+        stream_level = _sinks[0].level
+        _sinks = (StreamHandler(), FileHandler(file_path=_sinks[1].baseFilename, max_bytes=0, rollover_interval=None))
+        _sinks[0].setLevel(stream_level)
+
+
+atexit.register(stop_logging)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
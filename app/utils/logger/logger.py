@@ -1,9 +1,8 @@
 import logging
 import traceback
 
-# Import Custom Handlers
-from .file_handler import FileHandler
-from .stream_handler import StreamHandler
+# Process-wide handler writing through the logging queue
+from .log_queue import get_queue_handler
 
 def     format_traceback(e: Exception):
     """
@@ -17,14 +16,10 @@ class Logger(logging.Logger):
         """Class for Logging service for this app."""
         super().__init__(name, level)
 
-        # Handlers
-        # Stream
-        self.__stream_handler = StreamHandler()
-        self.addHandler(self.__stream_handler)
-
-        # File
-        self.__file_handler = FileHandler()
-        self.addHandler(self.__file_handler)
+        # All Loggers share one queue handler, the stream and file sinks are
+        # written by its listener thread
+        self.__queue_handler = get_queue_handler()
+        self.addHandler(self.__queue_handler)
 
     def d(self, msg, *args, **kwargs):
         """
@@ -66,16 +61,16 @@ class Logger(logging.Logger):
     def e(self, *args):
         """
         Convenience method for logging an Exception.
+
+        The exception is passed on as exc_info, so its traceback is only
+        formatted by the sinks.
         """
-        msg = ""
-        e = list(filter(lambda arg: isinstance(arg, Exception), args))
-        strings = list(filter(lambda arg: isinstance(arg, str), args))
-        if strings:
-            msg += ", ".join(strings)
-        if e:
-            msg += format_traceback(e=e[0])
-        if self.isEnabledFor(logging.ERROR):
-            self._log(logging.ERROR, msg, args[1:])
+        if not self.isEnabledFor(logging.ERROR):
+            return
+        e = [arg for arg in args if isinstance(arg, BaseException)]
+        msg = ", ".join(arg for arg in args if isinstance(arg, str))
+        exc_info = (type(e[0]), e[0], e[0].__traceback__) if e else None
+        self._log(logging.ERROR, msg, (), exc_info=exc_info)
             
     def c(self, msg, *args, **kwargs):
         """
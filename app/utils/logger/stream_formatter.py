@@ -21,8 +21,11 @@ class StreamFormatter(logging.Formatter):
         return super().formatMessage(record)
     
     def format(self, record):
+        # The short exception text must not be cached for the file sink
+        exc_text = record.exc_text
         s = super(StreamFormatter, self).format(record)
         if record.exc_text:
             s = s.replace('\n', ', ').strip()
+        record.exc_text = exc_text
         s = s.replace("\nNoneType: None", "")
         return s
@@ -0,0 +1,217 @@
+import io
+import time
+import pstats
+import cProfile
+import functools
+import threading
+import collections
+import tracemalloc
+import contextvars
+from contextlib import contextmanager
+import pandas as pd
+from app._base.base_class import BaseClass
+from app.utils.logger import Logger
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+log = Logger(__name__)
+
+# Spans kept per profiler, the oldest are dropped first (live logs keep
+# adding update spans)
+MAX_SPANS = 10000
+
+SPAN_COLUMNS = ['stage', 'depth', 'wall_s', 'rows_in', 'rows_out', 'rss_peak_delta', 'traced_peak_delta']
+
+# Profiler collecting the spans of the current context
+_current = contextvars.ContextVar('profiler', default=None)
+
+# Outermost deep spans open in the process, and whether they started
+# tracemalloc, which is then stopped once the last of them closes
+_tracing_lock = threading.Lock()
+_tracing_spans = 0
+_tracing_started = False
+
+
+def _start_tracing() -> None:
+    global _tracing_spans, _tracing_started
+    with _tracing_lock:
+        if _tracing_spans == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+        _tracing_spans += 1
+
+
+def _stop_tracing() -> None:
+    global _tracing_spans, _tracing_started
+    with _tracing_lock:
+        _tracing_spans -= 1
+        if _tracing_spans == 0 and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
+
+
+def _max_rss_bytes() -> int:
+    """
+    Returns the peak resident set size of the process, 0 if unknown.
+    """
+    if resource is None:
+        return 0
+    # Linux reports kilobytes
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class Span(BaseClass):
+
+    def __init__(self, stage: str, depth: int, rows_in: int | None = None):
+        """
+        Timing record of one stage, filled in by `Profiler.span`. Set
+        `rows_out` inside the `with` block to record the output size.
+        """
+        super().__init__()
+        self.stage = stage
+        self.depth = depth
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.wall_s = None
+        self.rss_peak_delta = None
+        self.traced_peak_delta = None
+        # Traced memory at the start of the span and the highest seen while
+        # it is open (deep mode)
+        self.traced_start = 0
+        self.traced_peak = 0
+
+    def to_dict(self) -> dict:
+        return {column: getattr(self, column) for column in SPAN_COLUMNS}
+
+
+class Profiler(BaseClass):
+
+    def __init__(self, name: str, deep: bool = False):
+        """
+        Collects timing spans of a pipeline. Every span records its wall
+        time, the rows in and out and the growth of the peak RSS of the
+        process.
+
+        While a span is open the profiler is the current one of the context,
+        so code called from it (parsers, schemas) can open nested spans with
+        the module level `span()` without having the profiler passed in.
+
+        Parameters:
+            name (str): Name used in the log messages, e.g. the file path.
+            deep (bool): If True, the spans also run under cProfile and
+                record their peak traced memory with tracemalloc. Both slow
+                the pipeline down noticeably, so tracemalloc is only
+                started while a span is open, unless it was already
+                tracing.
+        """
+        super().__init__()
+        self.__name = name
+        self.__deep = deep
+        self.__spans = collections.deque(maxlen=MAX_SPANS)
+        self.__open = []
+        self.__cprofile = cProfile.Profile() if deep else None
+
+    @property
+    def deep(self) -> bool:
+        return self.__deep
+
+    def __getstate__(self):
+        # cProfile can't be pickled, e.g. when a Log is sent back by a worker
+        state = self.__dict__.copy()
+        state['_Profiler__cprofile'] = None
+        return state
+
+    @contextmanager
+    def span(self, stage: str, rows_in: int | None = None):
+        """
+        Times the `with` block as `stage`, yielding its `Span`.
+        """
+        record = Span(stage, len(self.__open), rows_in)
+        self.__spans.append(record)
+        token = _current.set(self)
+        self.__enter(record)
+        rss_before = _max_rss_bytes()
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.wall_s = time.perf_counter() - started
+            record.rss_peak_delta = _max_rss_bytes() - rss_before
+            self.__exit(record)
+            _current.reset(token)
+            log.d("%s: %s took %.3f s (%s -> %s rows).",
+                  self.__name, stage, record.wall_s, record.rows_in, record.rows_out)
+
+    def __enter(self, record: Span):
+        if self.__deep:
+            if not self.__open:
+                _start_tracing()
+            current, peak = tracemalloc.get_traced_memory()
+            if self.__open:
+                self.__open[-1].traced_peak = max(self.__open[-1].traced_peak, peak)
+            elif self.__cprofile is not None:
+                self.__cprofile.enable()
+            tracemalloc.reset_peak()
+            record.traced_start = current
+            record.traced_peak = current
+        self.__open.append(record)
+
+    def __exit(self, record: Span):
+        self.__open.pop()
+        if self.__deep:
+            peak = max(record.traced_peak, tracemalloc.get_traced_memory()[1])
+            record.traced_peak_delta = peak - record.traced_start
+            if self.__open:
+                self.__open[-1].traced_peak = max(self.__open[-1].traced_peak, peak)
+                tracemalloc.reset_peak()
+            else:
+                if self.__cprofile is not None:
+                    self.__cprofile.disable()
+                _stop_tracing()
+
+    def timed(self, stage: str):
+        """
+        Decorator timing every call of the function as `stage`.
+        """
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def report(self) -> pd.DataFrame:
+        """
+        Returns one row per span in the order they started. `depth` is the
+        nesting level; `traced_peak_delta` is only set in deep mode.
+        """
+        return pd.DataFrame([record.to_dict() for record in self.__spans], columns=SPAN_COLUMNS)
+
+    def stats(self, limit: int = 25, sort: str = 'cumulative') -> str | None:
+        """
+        Returns the cProfile statistics of the spans in deep mode, else None
+        (also once the profiler has been pickled).
+        """
+        if self.__cprofile is None:
+            return None
+        output = io.StringIO()
+        pstats.Stats(self.__cprofile, stream=output).sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+
+@contextmanager
+def span(stage: str, rows_in: int | None = None):
+    """
+    Opens a span of the current profiler, if any. Without a profiler it only
+    yields a detached `Span`, so instrumented code costs next to nothing.
+    """
+    profiler = _current.get()
+    if profiler is None:
+        yield Span(stage, 0, rows_in)
+        return
+    with profiler.span(stage, rows_in) as record:
+        yield record
@@ -1,8 +1,12 @@
 VERSION = "v0.0.1"
 
+# Version of the log parsing/processing output. Bump it whenever a change
+# alters the frames produced by `Log`, so that cached frames are invalidated.
+PARSER_VERSION = "7"
+
 CHANGELOG = """
 #[v0.0.0]
 
 ##Initial development
 
-"""
\ No newline at end of file
+"""
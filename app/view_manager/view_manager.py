@@ -4,6 +4,7 @@ from typing_extensions import Self
 if TYPE_CHECKING:
     from app import App
     from app._base.base_view import BaseView
+    from app.core.log.registry import LogRegistry
 
 from app._base.base_gui_element import BaseGUIElement
 from app.utils.logger import Logger
@@ -61,6 +62,24 @@ class ViewManager(BaseGUIElement):
         self.__all_views[view.tag()] = view
         # with ui.tab
 
+    def remove_view(self, view: 'BaseView'):
+        """Removes a View from the ViewManager and destroys it, along with
+        its ViewModel, releasing the flights it opened from the log registry.
+
+        Args:
+            view (BaseView): The View to be removed.
+        """
+        self.__all_views.pop(view.tag(), None)
+        view.destroy()
+
+    @property
+    def log_registry(self) -> 'LogRegistry':
+        """The process-wide registry of loaded flights, shared by all
+        sessions so that a flight opened in several tabs is parsed once.
+        """
+        from app.core.log.registry import get_log_registry
+        return get_log_registry()
+
     def __enter__(self) -> Self:
         if self.__layout_manager is not None:
             self.__layout_manager.__enter__()
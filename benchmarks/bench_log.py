@@ -0,0 +1,238 @@
+# benchmarks/bench_log.py
+#
+# Usage: python -m benchmarks.bench_log [--sizes 10k 100k 1M] [--output results.json]
+#                                       [--compare baseline.json] [--threshold 0.1]
+#
+# Every run loads a generated log in a fresh process, builds the MISSION_INFO
+# and SPRAY_INFO frames and records the total time, the peak RSS and the
+# per-stage spans of `Log.profile`. Results are written as JSON; with
+# --compare, stages slower than the baseline by more than the threshold are
+# reported as regressions and the exit code is 1.
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from .generator import generate_log, parse_size
+
+DEFAULT_SIZES = ['10k', '100k', '1M']
+DEFAULT_DATA_DIR = os.path.join('benchmarks', 'data')
+
+# Relative slowdown reported as a regression
+DEFAULT_THRESHOLD = 0.10
+
+# Times below this are too noisy to flag
+MIN_COMPARED_S = 0.01
+
+
+def run_once(file_path, log_kwargs: dict) -> dict:
+    """
+    Loads `file_path` and builds the processed frames, returning the timings.
+    Runs in the benchmark worker process.
+    """
+    import resource
+    from app.core.log import Log
+
+    started = time.perf_counter()
+    log_obj = Log(file_path, **log_kwargs)
+    log_obj.mission_info_df
+    log_obj.spray_info_df
+    load_s = time.perf_counter() - started
+
+    profile = log_obj.profile.fillna({'rows_in': 0, 'rows_out': 0})
+    stages = {}
+    for span in profile.to_dict('records'):
+        stage = stages.setdefault(span['stage'], {'wall_s': 0.0, 'rows_in': 0, 'rows_out': 0})
+        stage['wall_s'] += span['wall_s']
+        stage['rows_in'] += int(span['rows_in'])
+        stage['rows_out'] += int(span['rows_out'])
+    return {
+        'load_s': load_s,
+        # Linux reports kilobytes
+        'peak_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        'master_rows': len(log_obj.master_df),
+        'stages': stages
+    }
+
+
+def run_in_subprocess(file_path, log_kwargs: dict) -> dict:
+    """
+    Runs `run_once` in a new interpreter, so that the peak RSS and the
+    caches of one run don't leak into the next.
+    """
+    process = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_log', '--worker', file_path, json.dumps(log_kwargs)],
+        capture_output=True, text=True
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"Benchmark run of {file_path} failed:\n{process.stderr[-2000:]}")
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def benchmark_size(size: str, repeats: int, data_dir: str, seed: int, log_kwargs: dict) -> dict:
+    """
+    Benchmarks the log of `size` lines, generating it first if needed, and
+    returns the median of the repeated runs.
+    """
+    n_lines = parse_size(size)
+    os.makedirs(data_dir, exist_ok=True)
+    file_path = os.path.join(data_dir, f"synthetic_{n_lines}_{seed}.log")
+    if not os.path.exists(file_path):
+        print(f"Generating {file_path}...", file=sys.stderr)
+        generate_log(file_path, n_lines, seed)
+
+    runs = [run_in_subprocess(file_path, log_kwargs) for _ in range(repeats)]
+    load_s = statistics.median(run['load_s'] for run in runs)
+
+    stages = {}
+    for stage in runs[0]['stages']:
+        wall_s = statistics.median(run['stages'][stage]['wall_s'] for run in runs)
+        rows_in = runs[0]['stages'][stage]['rows_in']
+        rows_out = runs[0]['stages'][stage]['rows_out']
+        # Stages that create their rows (read, build) are rated on their output
+        rows = rows_in or rows_out
+        stages[stage] = {
+            'wall_s': wall_s,
+            'rows_in': rows_in,
+            'rows_out': rows_out,
+            'rows_per_s': rows / wall_s if rows and wall_s > 0 else None
+        }
+
+    return {
+        'size': size,
+        'lines': n_lines,
+        'file_bytes': os.path.getsize(file_path),
+        'master_rows': runs[0]['master_rows'],
+        'repeats': repeats,
+        'load_s': load_s,
+        'load_s_runs': [run['load_s'] for run in runs],
+        'lines_per_s': n_lines / load_s if load_s > 0 else None,
+        'peak_rss_bytes': max(run['peak_rss_bytes'] for run in runs),
+        'stages': stages
+    }
+
+
+def environment() -> dict:
+    """
+    Returns the versions and machine details stored with the results.
+    """
+    import pandas as pd
+    from app.utils.version import PARSER_VERSION
+    try:
+        import pyarrow
+        pyarrow_version = pyarrow.__version__
+    except ImportError:
+        pyarrow_version = None
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'pyarrow': pyarrow_version,
+        'parser_version': PARSER_VERSION,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Returns the regressions of `results` against `baseline`: one message per
+    size whose load time or stage time grew by more than `threshold`.
+    """
+    baseline_sizes = {result['lines']: result for result in baseline['results']}
+    regressions = []
+    for result in results['results']:
+        reference = baseline_sizes.get(result['lines'])
+        if reference is None:
+            continue
+        timings = [('load', result['load_s'], reference['load_s'])]
+        timings += [
+            (stage, timing['wall_s'], reference['stages'][stage]['wall_s'])
+            for stage, timing in result['stages'].items()
+            if stage in reference['stages']
+        ]
+        for name, current, previous in timings:
+            if max(current, previous) < MIN_COMPARED_S:
+                continue
+            change = (current - previous) / previous if previous > 0 else float('inf')
+            if change > threshold:
+                regressions.append(
+                    f"{result['size']} {name}: {previous:.3f} s -> {current:.3f} s (+{change:.0%})"
+                )
+    return regressions
+
+
+def print_results(results: dict) -> None:
+    for result in results['results']:
+        print(f"{result['size']:>6} lines: {result['load_s']:.3f} s, "
+              f"{result['lines_per_s'] or 0:,.0f} lines/s, "
+              f"peak RSS {result['peak_rss_bytes'] / 1024 ** 2:,.0f} MiB")
+        for stage, timing in result['stages'].items():
+            rate = f", {timing['rows_per_s']:,.0f} rows/s" if timing['rows_per_s'] else ""
+            print(f"        {stage:<20} {timing['wall_s']:.3f} s{rate}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.bench_log",
+        description="Benchmark Log loading on synthetic flight logs."
+    )
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, help="Log sizes, e.g. 10k 1M 50M.")
+    parser.add_argument("-r", "--repeats", type=int, default=3, help="Runs per size, the median is kept.")
+    parser.add_argument("-o", "--output", default=None, help="Write the results to this JSON file.")
+    parser.add_argument("-c", "--compare", default=None, help="Baseline JSON results to compare with.")
+    parser.add_argument("-t", "--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative slowdown reported as a regression.")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR, help="Directory of the generated logs.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generated logs.")
+    parser.add_argument("--parser", default="auto", help="Parser backend passed to Log.")
+    parser.add_argument("--parse-workers", type=int, default=1, help="parse_workers passed to Log.")
+    parser.add_argument("--compact", action="store_true", help="Load the logs in compact mode.")
+    parser.add_argument("--worker", nargs=2, metavar=("LOG", "KWARGS"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        file_path, log_kwargs = args.worker
+        print(json.dumps(run_once(file_path, json.loads(log_kwargs))))
+        return 0
+
+    log_kwargs = {'parser': args.parser, 'parse_workers': args.parse_workers, 'compact': args.compact}
+    results = {
+        'environment': environment(),
+        'config': log_kwargs,
+        'results': [
+            benchmark_size(size, args.repeats, args.data_dir, args.seed, log_kwargs)
+            for size in args.sizes
+        ]
+    }
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print("No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+# benchmarks/bench_startup.py
+#
+# Usage: python -m benchmarks.bench_startup [--budget-ms 100] [--repeats 10]
+#
+# Measures the start-up time of the headless CLI (`python -m app.cli --help`)
+# in fresh interpreters and checks it against the budget. Also checks that
+# importing the CLI loads none of the heavy modules; the exit code is 1 if
+# either check fails.
+
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+DEFAULT_BUDGET_MS = 100.0
+
+# Modules the CLI must only import once a command runs
+HEAVY_MODULES = ('nicegui', 'pandas', 'numpy', 'pyarrow')
+
+
+def time_command(command: list, repeats: int) -> list:
+    """
+    Returns the wall time of every run of `command`, in milliseconds.
+    """
+    times = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        times.append((time.perf_counter() - started) * 1000)
+    return times
+
+
+def heavy_imports() -> list:
+    """
+    Returns the heavy modules loaded by importing the CLI.
+    """
+    code = f"import sys, app.cli; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    process = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True)
+    return process.stdout.split()
+
+
+def slowest_imports(limit: int) -> list:
+    """
+    Returns the `limit` slowest modules imported by `--help`, from
+    `-X importtime`, as `(cumulative_us, module)` pairs.
+    """
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'app.cli', '--help'],
+        check=True, capture_output=True, text=True
+    )
+    imports = []
+    for line in process.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            imports.append((int(parts[1]), parts[2].strip()))
+    return sorted(imports, reverse=True)[:limit]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.bench_startup",
+        description="Check the start-up time of the headless CLI."
+    )
+    parser.add_argument("-b", "--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Budget of `--help`.")
+    parser.add_argument("-r", "--repeats", type=int, default=10, help="Runs, the median is kept.")
+    args = parser.parse_args(argv)
+
+    baseline = statistics.median(time_command([sys.executable, '-c', 'pass'], args.repeats))
+    median = statistics.median(time_command([sys.executable, '-m', 'app.cli', '--help'], args.repeats))
+    print(f"{'python -c pass':<26} {baseline:.1f} ms")
+    print(f"{'python -m app.cli --help':<26} {median:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    for cumulative_us, module in slowest_imports(5):
+        print(f"    {module:<40} {cumulative_us / 1000:.1f} ms")
+
+    failed = False
+    if median > args.budget_ms:
+        print("OVER BUDGET")
+        failed = True
+    loaded = heavy_imports()
+    if loaded:
+        print(f"Importing app.cli loads {', '.join(loaded)}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
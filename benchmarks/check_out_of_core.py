@@ -0,0 +1,95 @@
+# benchmarks/check_out_of_core.py
+#
+# Usage: python -m benchmarks.check_out_of_core [--lines 5k] [--chunk-bytes 20000]
+#
+# Loads a generated log (plain and gzip compressed) and an empty log both in
+# memory and out of core, in chunks small enough that log types, categories
+# and malformed lines first appear in later chunks, and checks that every
+# frame is equal. The exit code is 1 if any frame differs.
+
+import os
+import sys
+import gzip
+import shutil
+import argparse
+import tempfile
+import pandas as pd
+from .generator import generate_log, parse_size
+
+DEFAULT_CHUNK_BYTES = 20_000
+
+
+def compare_logs(file_path, chunk_bytes: int, compact: bool) -> list:
+    """
+    Returns the differences between `file_path` loaded in memory and out of
+    core, as `(frame, message)` pairs.
+    """
+    from app.core.log import Log
+
+    in_memory = Log(file_path, compact=compact)
+    out_of_core = Log(file_path, compact=compact, chunk_bytes=chunk_bytes)
+    # Build every type first, so that compact mode drops log_info in memory too
+    in_memory.preload()
+
+    differences = []
+
+    def compare(name: str, expected: pd.DataFrame, actual: pd.DataFrame) -> None:
+        if expected.empty:
+            # Frames without rows only need the same columns: an empty log
+            # loaded in memory has object and float64 placeholder columns
+            if not actual.empty or list(expected.columns) != list(actual.columns):
+                differences.append((name, f"{len(actual)} rows of {list(actual.columns)}"))
+            return
+        try:
+            pd.testing.assert_frame_equal(expected, actual)
+        except AssertionError as e:
+            differences.append((name, str(e).strip().splitlines()[0]))
+
+    if in_memory.log_types != out_of_core.log_types:
+        differences.append(('log_types', f"{in_memory.log_types} != {out_of_core.log_types}"))
+    master_df = out_of_core.master_df
+    compare('master_df', in_memory.master_df[master_df.columns], master_df)
+    for log_type in in_memory.log_types:
+        compare(log_type, in_memory.between(None, None, log_type), out_of_core.between(None, None, log_type))
+    compare('mission_info_df', in_memory.mission_info_df, out_of_core.mission_info_df)
+    compare('spray_info_df', in_memory.spray_info_df, out_of_core.spray_info_df)
+    compare('segments', in_memory.segments, out_of_core.segments)
+    compare('anomalies', in_memory.anomalies, out_of_core.anomalies)
+    return differences
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.check_out_of_core",
+        description="Check that out-of-core logs give the same frames as logs loaded in memory."
+    )
+    parser.add_argument("-n", "--lines", default="5k", help="Lines of the generated log.")
+    parser.add_argument("-b", "--chunk-bytes", type=int, default=DEFAULT_CHUNK_BYTES, help="chunk_bytes passed to Log.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the generated log.")
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp(prefix='check-out-of-core-')
+    try:
+        plain = generate_log(os.path.join(directory, 'flight.log'), parse_size(args.lines), args.seed)
+        compressed = plain + '.gz'
+        with open(plain, 'rb') as source, gzip.open(compressed, 'wb') as target:
+            shutil.copyfileobj(source, target)
+        empty = os.path.join(directory, 'empty.log')
+        open(empty, 'w').close()
+
+        failed = False
+        for file_path in (plain, compressed, empty):
+            for compact in (False, True):
+                differences = compare_logs(file_path, args.chunk_bytes, compact)
+                label = f"{os.path.basename(file_path)}{' (compact)' if compact else ''}"
+                print(f"{label:<28} {'FAILED' if differences else 'ok'}")
+                for name, message in differences:
+                    print(f"    {name}: {message}")
+                failed = failed or bool(differences)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
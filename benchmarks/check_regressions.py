@@ -0,0 +1,244 @@
+# benchmarks/check_regressions.py
+#
+# Usage: python -m benchmarks.check_regressions [CHECK...]
+#
+# Runs small end-to-end checks of behaviour that broke before, each on a log
+# written for it, and prints one line per check. The exit code is 1 if any
+# check fails.
+
+import io
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+import contextlib
+import traceback
+from datetime import datetime, timedelta
+
+START = '2024-05-01 10:00:00'
+
+CHECKS = {}
+
+
+def check(function):
+    """
+    Registers `function(directory)` as a check. It fails by raising.
+    """
+    CHECKS[function.__name__.removeprefix('check_')] = function
+    return function
+
+
+def write_log(directory: str, name: str, lines: list) -> str:
+    path = os.path.join(directory, name)
+    with open(path, 'w') as file:
+        file.write("".join(line + "\n" for line in lines))
+    return path
+
+
+def timestamp(second: float) -> str:
+    return (datetime.fromisoformat(START) + timedelta(seconds=second)).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+
+
+def mission_line(second: float, latitude: float = 10.0, longitude: float = 20.0) -> str:
+    return (f"{timestamp(second)}, FC, INFO, MISSION_INFO, AUTO, ARMED, IN_AIR,"
+            f" 5.0, 4.0, 0.0, 90.0, {latitude}, {longitude}")
+
+
+def spray_line(second: float, payload_rem: float, area_sprayed: float = 0.0) -> str:
+    return (f"{timestamp(second)}, SPRAY, INFO, SPRAY_INFO, 1, 1500, 1500, 1.0, 1.0, 10,"
+            f" {payload_rem}, {area_sprayed}, 1.0, 1.0, 1, 2")
+
+
+@check
+def check_payload_refill(directory: str) -> None:
+    from app.core.log import Log
+
+    # The first spray row is dropped; 10 -> 8 (2 L), refill to 10, -> 9 (1 L)
+    payloads = [10.0, 10.0, 9.0, 8.0, 10.0, 9.0]
+    lines = []
+    for i, payload in enumerate(payloads):
+        lines.append(mission_line(i))
+        lines.append(spray_line(i + 0.5, payload))
+    flight = Log(write_log(directory, 'refill.log', lines))
+    summary = flight.summary()
+    assert summary['payload_used'] == 3.0, summary['payload_used']
+    assert flight.segments['payload_used'].sum() == 3.0, flight.segments['payload_used'].sum()
+
+
+@check
+def check_empty_fleet(directory: str) -> None:
+    from app.core.fleet import analyse_fleet
+    from app.core.fleet.__main__ import main as fleet_main
+
+    totals = analyse_fleet(directory, max_workers=1).totals()
+    assert totals['flights'] == 0 and totals['failed'] == 0, totals
+    with contextlib.redirect_stdout(io.StringIO()):
+        fleet_main([directory, '--workers', '1'])
+
+
+@check
+def check_view_at_unmatched(directory: str) -> None:
+    import pandas as pd
+    from app.core.log import LogRegistry
+
+    lines = [mission_line(i) for i in range(5)]
+    with LogRegistry().get(write_log(directory, 'at.log', lines)) as view:
+        t = view.start_time
+        rows = view.at(t, ['MISSION_INFO', 'SPRAY_INFO'])
+        assert rows['MISSION_INFO'] is not None and rows['SPRAY_INFO'] is None, rows
+        assert view.at(t, 'SPRAY_INFO') is None
+        # No row within the tolerance
+        assert view.at(t + pd.Timedelta(hours=1), 'MISSION_INFO', tolerance='1s') is None
+
+
+@check
+def check_registry_measure(directory: str) -> None:
+    from app.core.log import LogRegistry
+
+    lines = []
+    for i in range(50):
+        lines.append(mission_line(i))
+        lines.append(spray_line(i + 0.5, 10.0 - i * 0.1))
+    registry = LogRegistry()
+    # Out of core, the frames are only read into memory when used
+    with registry.get(write_log(directory, 'measure.log', lines), chunk_bytes=2000) as view:
+        before = registry.memory_bytes
+        assert not view.mission_info_df.empty
+        assert registry.memory_bytes > before, (registry.memory_bytes, before)
+
+
+@check
+def check_view_destroy(directory: str) -> None:
+    import asyncio
+    from app._base.base_view import BaseView
+    from app._base.base_view_model import BaseViewModel
+
+    view_model = BaseViewModel()
+    log_view = asyncio.run(view_model.open_log(write_log(directory, 'destroy.log', [mission_line(0)])))
+    BaseView(None, view_model).destroy()
+    assert log_view.released
+
+
+@check
+def check_decimation_points(directory: str) -> None:
+    import numpy as np
+    from app.core.log.decimation import DecimatedSeries
+
+    x = np.arange(100)
+    for points in (0, 1):
+        try:
+            DecimatedSeries(x, np.sin(x), points=points)
+        except ValueError:
+            continue
+        raise AssertionError(f"points={points} was accepted")
+    series = DecimatedSeries(x, np.sin(x), points=2)
+    assert len(series.window(points=2)) <= 2
+
+
+@check
+def check_empty_frame_dtypes(directory: str) -> None:
+    import gzip
+    import pandas as pd
+    from app.core.log import Log
+
+    compressed = os.path.join(directory, 'empty.log.gz')
+    with gzip.open(compressed, 'wb'):
+        pass
+    # An empty compressed log, and a file that can't be read
+    for file_path in (compressed, os.path.join(directory, 'missing.log')):
+        master_df = Log(file_path).master_df
+        assert master_df.empty, file_path
+        assert pd.api.types.is_datetime64_dtype(master_df['timestamp']), (file_path, master_df.dtypes)
+
+
+def log_in_worker(message: str) -> None:
+    from app.utils.logger import Logger
+    from app.utils.logger.log_queue import set_stream_level
+    set_stream_level('WARNING')
+    logger = Logger(__name__)
+    # Enough records that the worker exits before they are all written
+    for i in range(5000):
+        logger.d("Record %d of a worker.", i)
+    logger.i(message)
+
+
+@check
+def check_worker_logging(directory: str) -> None:
+    from concurrent.futures import ProcessPoolExecutor
+    from app.utils.logger import Logger
+    from app.utils.logger import log_queue
+
+    Logger(__name__).i("Checking the logs of pool workers.")
+    message = f"Logged from a worker of {directory}."
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        executor.submit(log_in_worker, message).result()
+    log_queue.stop_logging()
+    with open(log_queue._sinks[1].baseFilename) as file:
+        assert message in file.read(), "The record of the worker was lost"
+
+
+@check
+def check_loader_out_of_core(directory: str) -> None:
+    from app.core.log import LogLoader
+
+    file_path = write_log(directory, 'loader.log', [mission_line(0)])
+    for options in ({'chunk_bytes': 2000}, {'spill_dir': directory}):
+        try:
+            LogLoader(file_path, **options)
+        except ValueError:
+            continue
+        raise AssertionError(f"LogLoader accepted {options}")
+
+
+@check
+def check_frame_endpoint(directory: str) -> None:
+    import warnings
+    from fastapi import FastAPI
+    from app.api.frames import FRAME_ROUTE, register_frame_routes
+    from app.core.log import get_log_registry
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        from fastapi.testclient import TestClient
+
+    file_path = write_log(directory, 'frame.log', [mission_line(i) for i in range(5)])
+    view = get_log_registry().get(file_path)
+    fastapi_app = FastAPI()
+    register_frame_routes(fastapi_app)
+    try:
+        with TestClient(fastapi_app) as client:
+            response = client.get(FRAME_ROUTE, params={'path': file_path, 'columns': 'timestamp,height'})
+            assert response.status_code == 200, response.text
+            assert response.headers['X-Rows'] == str(len(view.mission_info_df)), response.headers
+            # Raw frames can't hold strings, the request fails before streaming
+            response = client.get(FRAME_ROUTE, params={'path': file_path, 'columns': 'log_info'})
+            assert response.status_code == 400, response.text
+    finally:
+        view.release()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.check_regressions",
+        description="Run end-to-end regression checks."
+    )
+    parser.add_argument("checks", nargs="*", help=f"Checks to run, default all: {', '.join(CHECKS)}.")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for name in args.checks or CHECKS:
+        directory = tempfile.mkdtemp(prefix='check-')
+        try:
+            CHECKS[name](directory)
+            print(f"{name:<32} ok")
+        except Exception:
+            print(f"{name:<32} FAILED")
+            print(traceback.format_exc())
+            failed = True
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+# benchmarks/generator.py
+#
+# Usage: python -m benchmarks.generator LINES OUTPUT [--seed N]
+
+import argparse
+import numpy as np
+
+# Lines generated per chunk. The output only depends on the seed and the
+# number of lines, the chunks just bound the memory used.
+CHUNK_LINES = 500_000
+
+START_TIME = np.datetime64('2024-05-01T06:00:00', 'ms')
+HOME_LATITUDE, HOME_LONGITUDE = 12.9716, 77.5946
+METRES_PER_DEGREE = 111_320.0
+
+# Field pattern flown by the simulated drone: parallel rows joined by turns
+ROW_LENGTH_M = 200.0
+ROW_SPACING_M = 5.0
+SPEED_M_S = 5.0
+TAKEOFF_S = 20.0
+CRUISE_HEIGHT_M = 3.0
+
+# Spray system
+TANK_L = 10.0
+FLOW_L_MIN = 1.2
+DOSAGE_L_HA = 10.0
+
+# Share of each kind of line; the rest are MISSION_INFO lines
+LINE_KINDS = {
+    'spray': 0.42,
+    'battery': 0.05,
+    'status': 0.03,
+    'blank': 0.01,
+    'garbage': 0.005,
+    'truncated': 0.005,
+    'bad_value': 0.002,
+}
+# Share of MISSION_INFO lines holding the -100/-200 sentinel values
+SENTINEL_SHARE = 0.01
+
+
+def format_timestamps(times) -> list:
+    """
+    Formats datetime64[ms] values like the flight controller does.
+    """
+    return [value.replace('T', ' ') for value in np.datetime_as_string(times, unit='ms').tolist()]
+
+
+def flight_state(seconds: np.ndarray) -> dict:
+    """
+    Returns the simulated state of the flight at `seconds` after take-off:
+    location, height, heading, whether the drone is over a row (spraying),
+    the row number and the area sprayed so far.
+    """
+    cruising = np.maximum(seconds - TAKEOFF_S, 0.0)
+    distance = cruising * SPEED_M_S
+    leg_length = ROW_LENGTH_M + ROW_SPACING_M
+    leg, along = np.divmod(distance, leg_length)
+    on_row = (along < ROW_LENGTH_M) & (seconds > TAKEOFF_S)
+
+    # Odd rows are flown back, turns move across to the next row
+    forward = leg % 2 == 0
+    along_row = np.minimum(along, ROW_LENGTH_M)
+    x = np.where(forward, along_row, ROW_LENGTH_M - along_row)
+    y = leg * ROW_SPACING_M + np.maximum(along - ROW_LENGTH_M, 0.0)
+    heading = np.where(on_row, np.where(forward, 90.0, 270.0), 0.0)
+
+    height = np.where(
+        seconds < TAKEOFF_S,
+        CRUISE_HEIGHT_M * seconds / TAKEOFF_S,
+        CRUISE_HEIGHT_M
+    )
+    sprayed_m = leg * ROW_LENGTH_M + np.minimum(along, ROW_LENGTH_M)
+    sprayed_m = np.where(seconds > TAKEOFF_S, sprayed_m, 0.0)
+    return {
+        'latitude': HOME_LATITUDE + y / METRES_PER_DEGREE,
+        'longitude': HOME_LONGITUDE + x / (METRES_PER_DEGREE * np.cos(np.radians(HOME_LATITUDE))),
+        'height': height,
+        'heading': heading,
+        'on_row': on_row,
+        'row': leg.astype(np.int64),
+        'area_sprayed': sprayed_m * ROW_SPACING_M,
+    }
+
+
+def mission_lines(rng, timestamps, seconds) -> list:
+    state = flight_state(seconds)
+    n = len(seconds)
+    height = state['height'] + rng.normal(0, 0.05, n)
+    speed = np.where(seconds > TAKEOFF_S, SPEED_M_S, 0.0) + rng.normal(0, 0.1, n)
+    climb_rate = np.where(seconds < TAKEOFF_S, CRUISE_HEIGHT_M / TAKEOFF_S, 0.0) + rng.normal(0, 0.02, n)
+    heading = state['heading'] + rng.normal(0, 0.5, n)
+    latitude, longitude = state['latitude'], state['longitude']
+
+    # Invalid samples written with sentinel values
+    sentinel = rng.random(n) < SENTINEL_SHARE
+    height[sentinel], speed[sentinel], climb_rate[sentinel], heading[sentinel] = -100, -100, -100, -100
+    gps_lost = sentinel & (rng.random(n) < 0.5)
+    latitude = np.where(gps_lost, -200.0, latitude)
+    longitude = np.where(gps_lost, -200.0, longitude)
+
+    modes = np.where(seconds < TAKEOFF_S, 'TAKEOFF', 'AUTO').tolist()
+    return [
+        f"{ts}, FC, INFO, MISSION_INFO, {mode}, ARMED, IN_AIR, {h:.2f}, {s:.2f}, {c:.2f}, {hd:.1f}, {lat:.7f}, {lon:.7f}\n"
+        for ts, mode, h, s, c, hd, lat, lon in zip(
+            timestamps, modes, height.tolist(), speed.tolist(), climb_rate.tolist(),
+            heading.tolist(), latitude.tolist(), longitude.tolist()
+        )
+    ]
+
+
+def spray_lines(rng, timestamps, seconds) -> list:
+    state = flight_state(seconds)
+    n = len(seconds)
+    spraying = state['on_row']
+    req_flowrate = np.where(spraying, FLOW_L_MIN, 0.0)
+    actual_flowrate = np.maximum(req_flowrate + np.where(spraying, rng.normal(0, 0.05, n), 0.0), 0.0)
+    # Litres used so far, the tank is refilled whenever it runs empty
+    used = state['area_sprayed'] / 10_000 * DOSAGE_L_HA
+    payload_rem = TANK_L - np.mod(used, TANK_L)
+    req_dosage = np.where(spraying, DOSAGE_L_HA, 0.0)
+    actual_dosage = np.where(spraying, DOSAGE_L_HA * actual_flowrate / FLOW_L_MIN, 0.0)
+    pulses = (actual_flowrate * 250).astype(np.int64)
+    row = state['row']
+
+    return [
+        f"{ts}, SPRAY, INFO, SPRAY_INFO, {int(on)}, {1500 if on else 1000}, {1600 if on else 1000}, "
+        f"{rq:.2f}, {ac:.2f}, {p}, {pay:.3f}, {area:.1f}, {rd:.1f}, {ad:.2f}, {wp}, {wp + 1}\n"
+        for ts, on, rq, ac, p, pay, area, rd, ad, wp in zip(
+            timestamps, spraying.tolist(), req_flowrate.tolist(), actual_flowrate.tolist(),
+            pulses.tolist(), payload_rem.tolist(), state['area_sprayed'].tolist(),
+            req_dosage.tolist(), actual_dosage.tolist(), row.tolist()
+        )
+    ]
+
+
+def battery_lines(rng, timestamps, seconds) -> list:
+    n = len(seconds)
+    voltage = 25.2 - seconds * 0.0005 + rng.normal(0, 0.02, n)
+    current = 18.0 + rng.normal(0, 0.5, n)
+    remaining = np.clip(100 - seconds / 36, 0, 100).astype(np.int64)
+    return [
+        f"{ts}, BAT, INFO, BATTERY_INFO, {v:.2f}, {c:.2f}, {r}\n"
+        for ts, v, c, r in zip(timestamps, voltage.tolist(), current.tolist(), remaining.tolist())
+    ]
+
+
+def status_lines(rng, timestamps, seconds) -> list:
+    severities = rng.choice(['INFO', 'WARN', 'ERROR'], len(seconds), p=[0.8, 0.15, 0.05]).tolist()
+    return [f"{ts}, FC, {severity}, STATUS\n" for ts, severity in zip(timestamps, severities)]
+
+
+def malformed_lines(rng, kind: str, timestamps, seconds) -> list:
+    if kind == 'blank':
+        return ["\n"] * len(timestamps)
+    if kind == 'garbage':
+        return ["garbage line without fields\n"] * len(timestamps)
+    if kind == 'truncated':
+        # Lines cut short by a power loss
+        return [line[:len(line) // 3] + "\n" for line in mission_lines(rng, timestamps, seconds)]
+    # Non-numeric value in a numeric field
+    return [
+        line.replace(", 1500,", ", ERR,").replace(", 1000,", ", ERR,")
+        for line in spray_lines(rng, timestamps, seconds)
+    ]
+
+
+def generate_chunk(rng, first_line: int, n_lines: int) -> str:
+    """
+    Returns `n_lines` log lines, starting at line `first_line` of the flight.
+    Lines are written every 50 ms on average, with jitter.
+    """
+    offsets_ms = (np.arange(first_line, first_line + n_lines) * 50
+                  + rng.integers(0, 50, n_lines))
+    times = START_TIME + offsets_ms.astype('timedelta64[ms]')
+    seconds = offsets_ms / 1000.0
+
+    kinds = np.array(['mission', *LINE_KINDS])
+    probabilities = np.array([1 - sum(LINE_KINDS.values()), *LINE_KINDS.values()])
+    line_kinds = rng.choice(len(kinds), n_lines, p=probabilities)
+
+    lines = np.empty(n_lines, dtype=object)
+    for i, kind in enumerate(kinds):
+        positions = np.flatnonzero(line_kinds == i)
+        if len(positions) == 0:
+            continue
+        timestamps = format_timestamps(times[positions])
+        if kind == 'mission':
+            kind_lines = mission_lines(rng, timestamps, seconds[positions])
+        elif kind == 'spray':
+            kind_lines = spray_lines(rng, timestamps, seconds[positions])
+        elif kind == 'battery':
+            kind_lines = battery_lines(rng, timestamps, seconds[positions])
+        elif kind == 'status':
+            kind_lines = status_lines(rng, timestamps, seconds[positions])
+        else:
+            kind_lines = malformed_lines(rng, kind, timestamps, seconds[positions])
+        lines[positions] = kind_lines
+    return "".join(lines.tolist())
+
+
+def generate_log(file_path, n_lines: int, seed: int = 0) -> str:
+    """
+    Writes a synthetic flight log of `n_lines` lines to `file_path`. The same
+    seed and size always give the same file.
+
+    The log holds MISSION_INFO and SPRAY_INFO lines of a drone spraying a
+    field row by row, BATTERY_INFO and STATUS lines, sentinel samples and
+    malformed lines (blank, garbage, truncated and non-numeric values).
+    """
+    rng = np.random.default_rng(seed)
+    with open(file_path, 'w') as file:
+        for first_line in range(0, n_lines, CHUNK_LINES):
+            file.write(generate_chunk(rng, first_line, min(CHUNK_LINES, n_lines - first_line)))
+    return file_path
+
+
+def parse_size(value: str) -> int:
+    """
+    Parses a line count such as 10000, 10k, 2.5M or 50M.
+    """
+    value = value.strip().lower()
+    multipliers = {'k': 1_000, 'm': 1_000_000}
+    if value and value[-1] in multipliers:
+        return int(float(value[:-1]) * multipliers[value[-1]])
+    return int(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.generator",
+        description="Write a deterministic synthetic flight log."
+    )
+    parser.add_argument("lines", type=parse_size, help="Number of lines, e.g. 10k, 1M or 50M.")
+    parser.add_argument("output", help="Path of the log file to write.")
+    parser.add_argument("-s", "--seed", type=int, default=0, help="Random seed.")
+    args = parser.parse_args(argv)
+    generate_log(args.output, args.lines, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,14 @@
+import sys
+
+if len(sys.argv) > 1:
+    # Headless commands, e.g. `python main.py summarize flight.log`, don't
+    # load the GUI
+    from app.cli import main
+    sys.exit(main())
+
 from app import App
 from app.utils.logger import Logger
 
 log = Logger(__name__)
 
-App().run()
\ No newline at end of file
+App().run()